@@ -0,0 +1,103 @@
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Type
+
+from app.calculation import Calculation, CalculationFactory
+from app.calculator import try_parse_input
+from app.precision import typecode
+from app.units import Quantity
+
+OK = 0
+PARSE_ERROR = 1
+UNSUPPORTED_OPERATION = 2
+INVALID_OPERANDS = 3
+CALCULATION_ERROR = 4
+
+_NAN = float('nan')
+
+
+def column_value(result: object) -> float:
+    # The float column would call __float__ on anything but a number, so a modular result would be stored
+    # as its bare residue and a quantity as its SI value. Exact integers are stored, or fail, as floats.
+    if type(result) is float or type(result) is int:
+        return result
+    if type(result) is Quantity:
+        raise ValueError(f"Cannot store the result {result} in a float column: results with units are not "
+                         f"supported here.")
+    raise ValueError(f"Cannot store the result {result} in a float column.")
+
+
+class BatchResult:
+
+    def __init__(self, precision: str = 'float64') -> None:
+        # float32 results take half the memory; see app.precision for what the rounding costs.
+        self.results: array = array(typecode(precision))
+        self.status: array = array('B')
+        self.errors: List[Optional[str]] = []
+
+    def _append(self, result: float, status: int, error: Optional[str]) -> None:
+        self.results.append(result)
+        self.status.append(status)
+        self.errors.append(error)
+
+    @property
+    def ok(self) -> List[bool]:
+        return [status == OK for status in self.status]
+
+    def failures(self) -> List[int]:
+        return [index for index, status in enumerate(self.status) if status != OK]
+
+    def __len__(self) -> int:
+        return len(self.status)
+
+
+class _Evaluator:
+
+    def __init__(self, batch: BatchResult) -> None:
+        self.batch = batch
+        self.classes: Dict[str, Optional[Type[Calculation]]] = {}
+
+    def calculation_class(self, calculation_type: str) -> Optional[Type[Calculation]]:
+        if calculation_type not in self.classes:
+            self.classes[calculation_type] = CalculationFactory.find_calculation(calculation_type)
+        return self.classes[calculation_type]
+
+    def evaluate(self, calculation_type: str, a: float, b: float) -> None:
+        calculation_class = self.calculation_class(calculation_type)
+        if calculation_class is None:
+            self.batch._append(_NAN, UNSUPPORTED_OPERATION, f"Unsupported calculation type: '{calculation_type}'.")
+            return
+        error = calculation_class.validate(a, b)
+        if error is not None:
+            self.batch._append(_NAN, INVALID_OPERANDS, error)
+            return
+        try:
+            # Storing is part of the attempt: an exact integer result may not fit the float column.
+            self.batch.results.append(column_value(calculation_class(a, b).exec()))
+        except Exception as e:  # Not expected for validated operands; keeps one bad row from aborting the batch.
+            self.batch._append(_NAN, CALCULATION_ERROR, str(e))
+        else:
+            self.batch.status.append(OK)
+            self.batch.errors.append(None)
+
+
+def evaluate_expressions(expressions: Iterable[str], precision: str = 'float64') -> BatchResult:
+    batch = BatchResult(precision)
+    evaluator = _Evaluator(batch)
+    for expression in expressions:
+        parsed, error = try_parse_input(expression)
+        if error is not None:
+            batch._append(_NAN, PARSE_ERROR, error)
+        else:
+            evaluator.evaluate(*parsed)
+    return batch
+
+
+def evaluate_columns(calculation_types: Sequence[str], a_values: Sequence[float],
+                     b_values: Sequence[float], precision: str = 'float64') -> BatchResult:
+    if not len(calculation_types) == len(a_values) == len(b_values):
+        raise ValueError("Columns must have the same length.")
+    batch = BatchResult(precision)
+    evaluate = _Evaluator(batch).evaluate
+    for calculation_type, a, b in zip(calculation_types, a_values, b_values):
+        evaluate(calculation_type, a, b)
+    return batch
@@ -0,0 +1,214 @@
+import itertools
+import random
+import time
+from array import array
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from app.calculation import Calculation, CalculationFactory
+from app.history import History
+from app.prepared import _PRECEDENCE, Binary, Node, Number, Parser
+
+STAGES = ('parse', 'factory', 'exec', 'history', 'total')
+DISTRIBUTIONS = ('uniform', 'int', 'lognormal')
+# Results stay comparable with earlier runs as operations are added; others are opted into with mix=.
+DEFAULT_MIX = ('+', '-', '*', '/')
+
+
+class Workload:
+
+    def __init__(self, count: int = 100_000, seed: int = 0, mix: Optional[Dict[str, float]] = None,
+                 operands: str = 'uniform', low: float = -1000.0, high: float = 1000.0,
+                 error_rate: float = 0.0, depth: int = 1, history_limit: int = 100_000) -> None:
+        mix = mix if mix is not None else {symbol: 1.0 for symbol in DEFAULT_MIX}
+        unknown = [symbol for symbol in mix if symbol not in CalculationFactory._symbols]
+        if unknown:
+            raise ValueError(f"Unknown operation in mix: '{unknown[0]}'.")
+        flat = [symbol for symbol in mix if symbol not in _PRECEDENCE]
+        if depth > 1 and flat:
+            raise ValueError(f"Operation '{flat[0]}' cannot be nested; use depth=1.")
+        if operands not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown operand distribution: '{operands}'. Available: {', '.join(DISTRIBUTIONS)}")
+        if count < 1 or depth < 1 or not 0.0 <= error_rate <= 1.0:
+            raise ValueError("count and depth must be positive and error rate between 0 and 1.")
+        self.count: int = count
+        self.seed: int = seed
+        self.mix: Dict[str, float] = mix
+        self.operands: str = operands
+        self.low: float = low
+        self.high: float = high
+        self.error_rate: float = error_rate
+        self.depth: int = depth
+        self.history_limit: int = history_limit
+
+    def __repr__(self) -> str:
+        mix = ','.join(f"{symbol}:{weight:g}" for symbol, weight in self.mix.items())
+        return (f"count={self.count} seed={self.seed} mix={mix} operands={self.operands} low={self.low:g} "
+                f"high={self.high:g} errors={self.error_rate:g} depth={self.depth}")
+
+
+def parse_workload(arguments: Sequence[str]) -> Workload:
+    # "key=value" words, e.g. count=50000 mix=+:4,*:1 operands=lognormal errors=0.01 depth=3
+    options: Dict[str, object] = {}
+    converters = {'count': lambda text: int(float(text)), 'seed': int, 'operands': str, 'low': float,
+                  'high': float, 'errors': float, 'depth': int}
+    for argument in arguments:
+        key, separator, value = argument.partition('=')
+        key = key.lower()
+        if not separator or key not in converters and key != 'mix':
+            raise ValueError(f"Unknown bench option: '{argument}'. Use key=value with keys: "
+                             f"{', '.join(list(converters) + ['mix'])}")
+        if key == 'mix':
+            mix = {}
+            for item in value.split(','):
+                symbol, _, weight = item.partition(':')
+                mix[symbol] = float(weight) if weight else 1.0
+            options['mix'] = mix
+        else:
+            options['error_rate' if key == 'errors' else key] = converters[key](value)
+    return Workload(**options)
+
+
+def generate(workload: Workload) -> Iterator[str]:
+    rng = random.Random(workload.seed)
+    symbols = list(workload.mix)
+    weights = list(itertools.accumulate(workload.mix.values()))
+    low, high = workload.low, workload.high
+
+    if workload.operands == 'int':
+        low_int, high_int = int(low), int(high)
+        operand = lambda: str(rng.randint(low_int, high_int))  # noqa: E731
+    elif workload.operands == 'lognormal':
+        operand = lambda: repr(round(rng.lognormvariate(0.0, 2.0), 6))  # noqa: E731
+    else:
+        operand = lambda: repr(round(rng.uniform(low, high), 6))  # noqa: E731
+
+    def expression(depth: int) -> str:
+        if depth == 0:
+            return operand()
+        symbol = rng.choices(symbols, cum_weights=weights)[0]
+        # One side keeps the full depth so every expression really is that deep.
+        left, right = depth - 1, rng.randint(0, depth - 1)
+        if rng.random() < 0.5:
+            left, right = right, left
+        text = f"{expression(left)} {symbol} {expression(right)}"
+        return f"({text})" if depth < workload.depth else text
+
+    for _ in range(workload.count):
+        line = expression(workload.depth)
+        if workload.error_rate and rng.random() < workload.error_rate:
+            # Half malformed input, half a failing calculation.
+            if rng.random() < 0.5:
+                line = f"{line} ?"
+            else:
+                line = f"{line if workload.depth > 1 else operand()} / 0"
+        yield line
+
+
+def percentile(ordered: Sequence[int], fraction: float) -> int:
+    # Nearest-rank percentile of an already sorted sequence.
+    if not ordered:
+        return 0
+    return ordered[min(len(ordered) - 1, max(0, int(fraction * len(ordered) + 0.5) - 1))]
+
+
+class BenchReport:
+
+    def __init__(self, workload: Workload) -> None:
+        self.workload: Workload = workload
+        self.latencies: Dict[str, array] = {stage: array('q') for stage in STAGES}
+        self.operations: int = 0
+        self.errors: Dict[str, int] = {'parse': 0, 'calculation': 0}
+        self.elapsed: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        return self.operations / self.elapsed if self.elapsed else 0.0
+
+    def summary(self, stage: str) -> Dict[str, float]:
+        ordered = sorted(self.latencies[stage])
+        count = len(ordered)
+        return {'count': count, 'mean': sum(ordered) / count / 1000 if count else 0.0,
+                'p50': percentile(ordered, 0.50) / 1000, 'p99': percentile(ordered, 0.99) / 1000,
+                'p999': percentile(ordered, 0.999) / 1000}
+
+    def __str__(self) -> str:
+        lines = [f"Workload: {self.workload!r}",
+                 f"{self.operations} inputs in {self.elapsed:.3f}s: {self.throughput:,.0f} ops/sec, "
+                 f"{self.errors['parse']} parse errors, {self.errors['calculation']} calculation errors",
+                 f"{'stage':<8} {'count':>9} {'mean us':>9} {'p50 us':>9} {'p99 us':>9} {'p999 us':>9}"]
+        for stage in STAGES:
+            summary = self.summary(stage)
+            lines.append(f"{stage:<8} {summary['count']:>9} {summary['mean']:>9.2f} {summary['p50']:>9.2f} "
+                         f"{summary['p99']:>9.2f} {summary['p999']:>9.2f}")
+        return '\n'.join(lines)
+
+
+def _evaluate_tree(node: Node, create_ns: List[int], exec_ns: List[int]) -> Tuple[Calculation, float]:
+    # Builds and runs one calculation per operator, charging each to its stage.
+    clock = time.perf_counter_ns
+    left = node.left.value if isinstance(node.left, Number) else _evaluate_tree(node.left, create_ns, exec_ns)[1]
+    right = node.right.value if isinstance(node.right, Number) else _evaluate_tree(node.right, create_ns, exec_ns)[1]
+    start = clock()
+    calculation = CalculationFactory.create_calculation(node.calculation_class.calculation_type, left, right)
+    created = clock()
+    result = calculation.exec()
+    create_ns[0] += created - start
+    exec_ns[0] += clock() - created
+    return calculation, result
+
+
+def run(workload: Workload, lines: Optional[Sequence[str]] = None) -> BenchReport:
+    from app.calculator import parse_input  # The REPL imports this module for its bench command.
+
+    report = BenchReport(workload)
+    latencies = report.latencies
+    parse_latency, factory_latency = latencies['parse'], latencies['factory']
+    exec_latency, history_latency, total_latency = latencies['exec'], latencies['history'], latencies['total']
+    history = History(max_entries=workload.history_limit)
+    clock = time.perf_counter_ns
+    nested = workload.depth > 1
+    lines = list(generate(workload)) if lines is None else lines
+
+    started = time.perf_counter()
+    for line in lines:
+        start = clock()
+        try:
+            if nested:
+                parser = Parser(line)
+                tree = parser.parse()
+                if parser.parameters or not isinstance(tree, Binary):
+                    raise ValueError("Benchmark expressions need an operation and no parameters.")
+            else:
+                operation, a, b = parse_input(line)
+        except ValueError:
+            report.errors['parse'] += 1
+            total_latency.append(clock() - start)
+            continue
+        parsed = clock()
+        parse_latency.append(parsed - start)
+
+        try:
+            if nested:
+                create_ns, exec_ns = [0], [0]
+                calculation, _ = _evaluate_tree(tree, create_ns, exec_ns)
+                factory_latency.append(create_ns[0])
+                exec_latency.append(exec_ns[0])
+            else:
+                calculation = CalculationFactory.create_calculation(operation, a, b)
+                created = clock()
+                calculation.exec()
+                exec_latency.append(clock() - created)
+                factory_latency.append(created - parsed)
+        except (ArithmeticError, ValueError):
+            report.errors['calculation'] += 1
+            total_latency.append(clock() - start)
+            continue
+
+        appended = clock()
+        history.append(calculation)
+        end = clock()
+        history_latency.append(end - appended)
+        total_latency.append(end - start)
+    report.elapsed = time.perf_counter() - started
+    report.operations = len(lines)
+    return report
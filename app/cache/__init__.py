@@ -0,0 +1,186 @@
+import math
+import sqlite3
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.memory import BoundedStore
+
+CacheKey = Tuple[str, float, float, str]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    calculation_type TEXT NOT NULL,
+    a REAL NOT NULL,
+    b REAL NOT NULL,
+    backend TEXT NOT NULL,
+    result REAL NOT NULL,
+    created REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (calculation_type, a, b, backend)
+)
+"""
+
+
+def _storable(value: float) -> bool:
+    # SQLite stores NaN as NULL and writes integral reals, -0.0 included, as integers, so those values would
+    # fail the NOT NULL constraint or come back as 0.0; they bypass the cache instead of sharing 0.0's row.
+    return math.isfinite(value) and not (value == 0 and math.copysign(1.0, value) < 0)
+
+
+class CacheStats:
+
+    def __init__(self) -> None:
+        self.memory_hits: int = 0
+        self.disk_hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.lookup_seconds: float = 0.0
+
+    @property
+    def lookups(self) -> int:
+        return self.memory_hits + self.disk_hits + self.misses
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_ratio(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    @property
+    def mean_latency(self) -> float:
+        return self.lookup_seconds / self.lookups if self.lookups else 0.0
+
+    def __str__(self) -> str:
+        return (f"lookups={self.lookups} hits={self.hits} (memory={self.memory_hits}, disk={self.disk_hits}) "
+                f"misses={self.misses} evictions={self.evictions} hit_ratio={self.hit_ratio:.2%} "
+                f"mean_latency={self.mean_latency * 1e6:.1f}us")
+
+
+class ResultCache:
+
+    def __init__(self, path: str = ':memory:', max_entries: int = 100_000, ttl: Optional[float] = None,
+                 memory_entries: int = 1024, warm_entries: int = 256, memory_policy: str = 'lru',
+                 clock: Callable[[], float] = time.time) -> None:
+        if max_entries < 1 or memory_entries < 0:
+            raise ValueError("Cache sizes must be positive.")
+        self.path: str = path
+        self.max_entries: int = max_entries
+        self.ttl: Optional[float] = ttl
+        self.stats: CacheStats = CacheStats()
+        self._clock = clock
+        self.memory: BoundedStore = BoundedStore(max_entries=memory_entries, policy=memory_policy)
+        self._pending_hits: Dict[CacheKey, int] = {}
+        self._connection = sqlite3.connect(path, timeout=30.0, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(_SCHEMA)
+        self._entries: int = self._count()
+        self.warm_up(warm_entries)
+
+    def _count(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl is not None and self._clock() - created > self.ttl
+
+    def _remember(self, key: CacheKey, result: float, created: float) -> None:
+        if self.memory.max_entries != 0:
+            self.memory[key] = (result, created)
+
+    def warm_up(self, limit: int) -> int:
+        capacity = self.memory.max_entries
+        rows = self._connection.execute(
+            "SELECT calculation_type, a, b, backend, result, created FROM results ORDER BY hits DESC LIMIT ?",
+            (limit if capacity is None else min(limit, capacity),)).fetchall()
+        loaded = 0
+        for calculation_type, a, b, backend, result, created in reversed(rows):
+            if not self._expired(created):
+                self._remember((calculation_type, a, b, backend), result, created)
+                loaded += 1
+        return loaded
+
+    def get(self, key: CacheKey) -> Optional[float]:
+        start = time.perf_counter()
+        try:
+            entry = self.memory.get(key)
+            if entry is not None:
+                if not self._expired(entry[1]):
+                    self._pending_hits[key] = self._pending_hits.get(key, 0) + 1
+                    self.stats.memory_hits += 1
+                    return entry[0]
+                del self.memory[key]
+
+            row = self._connection.execute(
+                "SELECT result, created FROM results WHERE calculation_type=? AND a=? AND b=? AND backend=?",
+                key).fetchone()
+            if row is None or self._expired(row[1]):
+                self.stats.misses += 1
+                return None
+            self._connection.execute(
+                "UPDATE results SET hits = hits + 1 WHERE calculation_type=? AND a=? AND b=? AND backend=?", key)
+            self._remember(key, row[0], row[1])
+            self.stats.disk_hits += 1
+            return row[0]
+        finally:
+            self.stats.lookup_seconds += time.perf_counter() - start
+
+    def put(self, key: CacheKey, result: float) -> None:
+        if not (_storable(key[1]) and _storable(key[2]) and _storable(result)):
+            return
+        created = self._clock()
+        inserted = self._connection.execute(
+            "INSERT OR IGNORE INTO results (calculation_type, a, b, backend, result, created, hits) "
+            "VALUES (?, ?, ?, ?, ?, ?, 0)", key + (result, created)).rowcount
+        if not inserted:
+            # Replacing a row keeps the entry count, so it must not bring eviction forward.
+            self._connection.execute(
+                "UPDATE results SET result=?, created=?, hits=0 WHERE calculation_type=? AND a=? AND b=? "
+                "AND backend=?", (result, created) + key)
+        self._remember(key, result, created)
+        self._entries += inserted
+        if self._entries > self.max_entries:
+            self.evict()
+
+    def get_or_compute(self, calculation_type: str, a: float, b: float, compute: Callable[[], float],
+                       backend: str = 'float') -> float:
+        if not (_storable(a) and _storable(b)):
+            return compute()
+        key = (calculation_type, a, b, backend)
+        result = self.get(key)
+        if result is None:
+            result = compute()
+            self.put(key, result)
+        return result
+
+    def evict(self) -> int:
+        connection = self._connection
+        removed = 0
+        if self.ttl is not None:
+            removed += connection.execute("DELETE FROM results WHERE created < ?",
+                                          (self._clock() - self.ttl,)).rowcount
+        excess = self._count() - self.max_entries * 9 // 10
+        if excess > 0:
+            removed += connection.execute(
+                "DELETE FROM results WHERE rowid IN (SELECT rowid FROM results ORDER BY hits, created LIMIT ?)",
+                (excess,)).rowcount
+        self._entries = self._count()
+        self.stats.evictions += removed
+        return removed
+
+    def flush(self) -> None:
+        pending: List[Tuple[int, str, float, float, str]] = [
+            (hits,) + key for key, hits in self._pending_hits.items()]
+        self._pending_hits.clear()
+        if pending:
+            self._connection.executemany(
+                "UPDATE results SET hits = hits + ? WHERE calculation_type=? AND a=? AND b=? AND backend=?",
+                pending)
+
+    def close(self) -> None:
+        self.flush()
+        self._connection.close()
+
+    def __len__(self) -> int:
+        return self._count()
@@ -1,8 +1,21 @@
 from abc import ABC, abstractmethod
+from typing import Callable, Dict, Hashable, List, Optional, Type
+from weakref import WeakValueDictionary
+from app import integers
+from app.integers import format_value
 from app.operation import Operation
 
 class Calculation(ABC):
 
+    calculation_type: str = ''
+    opcode: int = -1
+    # Rough relative price of one exec(); schedulers only hand work to a pool when it outweighs dispatch.
+    cost: int = 1
+    # Second operand assumed when the input leaves it out, which makes the operation postfix ("5 !").
+    default_b: Optional[int] = None
+    # Plain function of (a, b) computing what exec() does, so bulk callers can skip the instance.
+    function: Optional[Callable[[float, float], float]] = None
+
     def __init__(self, a: float, b: float) -> None:
         self.a: float = a
         self.b: float = b
@@ -11,63 +24,256 @@ class Calculation(ABC):
     def exec(self) -> float:
         pass # pragma: no cover
 
+    @classmethod
+    def validate(cls, a: float, b: float) -> Optional[str]:
+        # Lets bulk callers reject operands up front instead of catching exec() errors per row.
+        return None
+
     def __str__(self) -> str:
         result = self.exec()  # Run the calculation to get the result.
         operation_name = self.__class__.__name__.replace('Calculation', '')  # Derive operation name.
-        return f"{self.__class__.__name__}: {self.a} {operation_name} {self.b} = {result}"
+        return f"{self.__class__.__name__}: {format_value(self.a)} {operation_name} {format_value(self.b)} = " \
+               f"{format_value(result)}"
 
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(a={self.a}, b={self.b})"
 
 
+class AsyncCalculation(Calculation):
+    # Results depend on a value fetched from a named source. A lookup engine gathers the keys of
+    # many pending calculations and resolves them in bulk; exec() only combines the fetched value.
+
+    source: str = ''
+
+    def __init__(self, a: float, b: float) -> None:
+        super().__init__(a, b)
+        self.value: Optional[float] = None
+
+    @classmethod
+    def validate(cls, a: float, b: float) -> Optional[str]:
+        return f"'{cls.calculation_type}' needs a '{cls.source}' lookup and cannot run in bulk."
+
+    def lookup_key(self) -> Hashable:
+        return self.b
+
+    @abstractmethod
+    def combine(self, value: float) -> float:
+        pass # pragma: no cover
+
+    def exec(self) -> float:
+        if self.value is None:
+            raise ValueError(f"No '{self.source}' value for {self.lookup_key()!r}.")
+        return self.combine(self.value)
+
+
+def _immutable(self, *args) -> None:
+    raise AttributeError("Interned calculations are immutable.")
+
+
+def _reduce_interned(self):
+    return (CalculationFactory.create_calculation, (self.calculation_type, self.a, self.b, True))
+
+
+# Methods of the frozen variant of each calculation class. Interned instances are shared by everyone who
+# asked for the same (operation, a, b), so none of them may change it.
+_FROZEN_METHODS = {'__setattr__': _immutable, '__delattr__': _immutable, '__reduce__': _reduce_interned}
+
+
+def _internable(operand: object) -> bool:
+    # 0.0 and -0.0 are equal keys but different operands, and other operand types may not be hashable.
+    return type(operand) is int or type(operand) is float and operand != 0.0
+
+
 class CalculationFactory:
 
     _calculations ={}
+    _symbols = {}
+    _opcodes = []
+    # Interned calculations by (class, operand types, operands); an entry goes away with its last user.
+    _interned: "WeakValueDictionary[tuple, Calculation]" = WeakValueDictionary()
+    # Frozen variant of each calculation class, or None for classes that are never interned.
+    _frozen: Dict[type, Optional[type]] = {}
 
     @classmethod
-    def register_calculation(cls, calculation_type: str):
+    def register_calculation(cls, calculation_type: str, symbol: Optional[str] = None):
 
         def decorator(subclass):
             calculation_type_lower = calculation_type.lower()
 
             if calculation_type_lower in cls._calculations:
                 raise ValueError(f"Calculation type '{calculation_type_lower}' is already registered.")
+            if symbol is not None and symbol in cls._symbols:
+                raise ValueError(f"Symbol '{symbol}' is already registered.")
             cls._calculations[calculation_type_lower] = subclass
+            subclass.calculation_type = calculation_type_lower
+            subclass.opcode = len(cls._opcodes)
+            cls._opcodes.append(calculation_type_lower)
+            if symbol is not None:
+                cls._symbols[symbol] = calculation_type_lower
             return subclass
         return decorator
 
     @classmethod
-    def create_calculation(cls, calculation_type: str, a: float, b: float) -> Calculation:
-        calculation_type_lower = calculation_type.lower()
-        calculation_class = cls._calculations.get(calculation_type_lower)
+    def type_for_symbol(cls, symbol: str) -> str:
+        calculation_type = cls._symbols.get(symbol)
+
+        if calculation_type is None:
+            raise ValueError("Unsupported operation.")
+        return calculation_type
+
+    @classmethod
+    def calculation_types(cls) -> List[str]:
+        return list(cls._opcodes)
+
+    @classmethod
+    def type_for_opcode(cls, opcode: int) -> str:
+        if not 0 <= opcode < len(cls._opcodes):
+            raise ValueError(f"Unknown opcode: {opcode}.")
+        return cls._opcodes[opcode]
+
+    @classmethod
+    def find_calculation(cls, calculation_type: str) -> Optional[Type[Calculation]]:
+        return cls._calculations.get(calculation_type.lower())
+
+    @classmethod
+    def get_calculation(cls, calculation_type: str) -> Type[Calculation]:
+        calculation_class = cls.find_calculation(calculation_type)
 
         if not calculation_class:
             available_types = ', '.join(cls._calculations.keys())
             raise ValueError(f"Unsupported calculation type: '{calculation_type}'. Available types: {available_types}")
-        return calculation_class(a, b)
+        return calculation_class
+
+    @classmethod
+    def create_calculation(cls, calculation_type: str, a: float, b: float, intern: bool = False) -> Calculation:
+        calculation_class = cls.get_calculation(calculation_type)
+        if not intern:
+            return calculation_class(a, b)
+        try:
+            frozen = cls._frozen[calculation_class]
+        except KeyError:
+            frozen = cls._frozen[calculation_class] = _freeze(calculation_class)
+        if frozen is None or not (_internable(a) and _internable(b)):
+            return calculation_class(a, b)
+
+        # Operand types are part of the key because 2 == 2.0, but exact and float results differ.
+        key = (calculation_class, type(a), a, type(b), b)
+        calculation = cls._interned.get(key)
+        if calculation is None:
+            calculation = calculation_class(a, b)
+            calculation.__class__ = frozen
+            cls._interned[key] = calculation
+        return calculation
 
-@CalculationFactory.register_calculation('add')
+def _freeze(calculation_class: Type[Calculation]) -> Optional[type]:
+    # Looked-up calculations are filled in after creation, so they are never shared.
+    if issubclass(calculation_class, AsyncCalculation):
+        return None
+    return type(calculation_class.__name__, (calculation_class,),
+                dict(_FROZEN_METHODS, __module__=calculation_class.__module__,
+                     __qualname__=calculation_class.__qualname__))
+
+@CalculationFactory.register_calculation('add', symbol='+')
 class AddCalculation(Calculation):
 
+    function = staticmethod(Operation.add)
+
     def exec(self) -> float:
         return Operation.add(self.a, self.b)
 
-@CalculationFactory.register_calculation('sub')
+@CalculationFactory.register_calculation('sub', symbol='-')
 class SubCalculation(Calculation):
 
+    function = staticmethod(Operation.sub)
+
     def exec(self) -> float:
         return Operation.sub(self.a, self.b)
 
-@CalculationFactory.register_calculation('mul')
+@CalculationFactory.register_calculation('mul', symbol='*')
 class MulCalculation(Calculation):
 
+    function = staticmethod(Operation.mul)
+
     def exec(self) -> float:
         return Operation.mul(self.a, self.b)
 
-@CalculationFactory.register_calculation('div')
+@CalculationFactory.register_calculation('div', symbol='/')
 class DivCalculation(Calculation):
 
+    function = staticmethod(Operation.div)
+
+    @classmethod
+    def validate(cls, a: float, b: float) -> Optional[str]:
+        if b == 0:
+            return "Division by zero not allowed."
+        return None
+
     def exec(self) -> float:
         if self.b == 0:
             raise ZeroDivisionError("Division by zero not allowed.")
-        return Operation.div(self.a, self.b)
\ No newline at end of file
+        return Operation.div(self.a, self.b)
+
+@CalculationFactory.register_calculation('fx')
+class FxCalculation(AsyncCalculation):
+    # a is an amount, b a numeric ISO 4217 currency code (840 USD, 978 EUR, ...).
+
+    source = 'fx'
+
+    def lookup_key(self) -> Hashable:
+        return int(self.b)
+
+    def combine(self, value: float) -> float:
+        return Operation.mul(self.a, value)
+
+@CalculationFactory.register_calculation('pow', symbol='**')
+class PowCalculation(Calculation):
+
+    function = staticmethod(Operation.pow)
+    cost = 10
+
+    @classmethod
+    def validate(cls, a: float, b: float) -> Optional[str]:
+        return integers.power_error(a, b)
+
+    def exec(self) -> float:
+        return Operation.pow(self.a, self.b)
+
+@CalculationFactory.register_calculation('fact', symbol='!')
+class FactorialCalculation(Calculation):
+    # "n !" is n!; "n ! k" steps by k instead of 1 (n!! for k = 2).
+
+    function = staticmethod(Operation.factorial)
+    cost = 10
+    default_b = 1
+
+    @classmethod
+    def validate(cls, a: float, b: float) -> Optional[str]:
+        return integers.factorial_error(a, b)
+
+    def exec(self) -> float:
+        return Operation.factorial(self.a, self.b)
+
+@CalculationFactory.register_calculation('gcd')
+class GcdCalculation(Calculation):
+
+    function = staticmethod(Operation.gcd)
+
+    @classmethod
+    def validate(cls, a: float, b: float) -> Optional[str]:
+        return integers.gcd_error(a, b)
+
+    def exec(self) -> float:
+        return Operation.gcd(self.a, self.b)
+
+@CalculationFactory.register_calculation('choose')
+class BinomialCalculation(Calculation):
+
+    function = staticmethod(Operation.binomial)
+    cost = 10
+
+    @classmethod
+    def validate(cls, a: float, b: float) -> Optional[str]:
+        return integers.binomial_error(a, b)
+
+    def exec(self) -> float:
+        return Operation.binomial(self.a, self.b)
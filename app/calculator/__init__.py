@@ -1,7 +1,24 @@
+import re
 import sys
 
-from app.calculation import CalculationFactory, Calculation
-from typing import List
+from app.bench import parse_workload, run as run_bench
+from app.cache import ResultCache
+from app.calculation import AsyncCalculation, CalculationFactory, Calculation
+from app.checkpoint import load_session, save_session
+from app.completion import Completer, install as install_completion
+from app.export import export_history
+from app.history import History
+from app.integers import Mod, format_value
+from app.lookup import LookupEngine
+from app.memory import format_bytes, parse_bytes
+from app.precision import PRECISIONS
+from app.profiling import Profiler
+from app.script import load_script
+from app.session import Session
+from app.tokenizer import Token, is_number, to_integer, to_number, tokenize
+from app.tracing import Tracer
+from app.units import Quantity, find_unit
+from typing import Iterable, List, Optional, Tuple
 
 def display_help():
     help_message = """
@@ -15,10 +32,30 @@ Usage:
         -       : Subtracts the second number from the first.
         *       : Multiplies two numbers.
         /       : Divides the first number by the second.
+        **      : Raises the first number to the power of the second.
+        !       : Factorial ("5 !"), or a multifactorial stepping by the second number ("9 ! 2").
+        gcd     : Greatest common divisor of two integers.
+        choose  : Binomial coefficient ("52 choose 5").
+    - Append "mod <m>" to work modulo m, e.g. "3 ** 1000 mod 7".
 
 Special Commands:
     help      : Display this help message.
     history   : Show the history of calculations.
+    undo      : Remove the last calculation from the history.
+    redo      : Restore the last undone calculation.
+    snapshot <name> : Save the current history under a name.
+    restore <name>  : Return the history to a named snapshot.
+    export <file> [binary|csv|ndjson] [float32] : Write the history to a file.
+    cache     : Show result cache statistics.
+    profile on [memory] | off | dump <file> : Profile calculations (and allocations).
+    memory    : Show memory held by history, cache and variables.
+    bench [count=N seed=N mix=+:4,*:1 operands=uniform|int|lognormal errors=R depth=N] : Run a synthetic load.
+    memory limit <history|cache|variables> <entries|size|none> [fifo|lru|size] : Cap memory use.
+    mode [int|float] : Parse integers exactly (int) or as floating point (float).
+    stats [results] | stats reset : Show (or clear) running statistics of the results.
+    run <file> : Run a script of calculations and "name = expression" assignments.
+    trace on [rate] | off | dump <file> | clear : Sample evaluations and record a span per stage.
+    save <file> | load <file> : Checkpoint the session (history, variables, settings) or restore one.
     exit      : Exit the calculator.
 
 Examples:
@@ -29,7 +66,7 @@ Examples:
 """
     print(help_message)
 
-def display_history(history: List[Calculation]) -> None:
+def display_history(history: Iterable[Calculation]) -> None:
     if not history:
         print("No calculations performed yet.")
     else:
@@ -37,38 +74,379 @@ def display_history(history: List[Calculation]) -> None:
         for idx, calculation in enumerate(history, start=1):
             print(f"{idx}. {calculation}")
 
-def parse_input(expression: str):
-    
-        parts = expression.split()
-        
-        if len(parts) != 3:
-            raise ValueError("Wrong expression format.")
+_SYMBOLS = CalculationFactory._symbols
+
+# A unit separator written without spaces joins the unit part after it: "MB/s", "kg*m", "s^2".
+_UNIT_SEPARATORS = {'/': 'name', '*': 'name', '^': 'number'}
+# Two operands with compound units plus one token to report as unexpected; junk past that is never scanned.
+_MAX_TOKENS = 32
 
+_NUMBER = r"[+-]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?"
+_SIMPLE_EXPRESSION = re.compile(rf"\s*({_NUMBER})\s+(\S+)\s+({_NUMBER})\s*")
+
+def _literal(token: Token, exact: bool) -> Tuple[object, Optional[str]]:
+    # In integer mode integer literals keep their exact value; other literals are floats either way.
+    if exact:
         try:
-            num1 = float(parts[0])
-            op = parts[1]
-            num2 = float(parts[2])
+            value = to_integer(token.text)
+        except ValueError:  # More digits than int() converts; see sys.set_int_max_str_digits().
+            return None, f"Wrong expression format: integer literal too long at position {token.position}."
+        if value is not None:
+            return value, None
+    return to_number(token.text), None
+
+def _operand(tokens: List[Token], index: int, exact: bool = False) -> Tuple[object, int, Optional[str]]:
+    # A number, optionally followed by a unit written without spaces ("5 km", "10 MB/s", "9.8 m/s^2").
+    value, error = _literal(tokens[index], exact)
+    index += 1
+    if error is not None or index == len(tokens) or tokens[index].kind != 'name' \
+            or CalculationFactory.find_calculation(tokens[index].text) is not None:
+        return value, index, error
+
+    start = tokens[index]
+    text, end = start.text, start.position + len(start.text)
+    index += 1
+    while index + 1 < len(tokens) and tokens[index].text in _UNIT_SEPARATORS and tokens[index].position == end:
+        following = tokens[index + 1]
+        if following.position != end + 1 or following.kind != _UNIT_SEPARATORS[tokens[index].text]:
+            break
+        text += tokens[index].text + following.text
+        end = following.position + len(following.text)
+        index += 2
+
+    unit = find_unit(text)
+    if unit is None:
+        if text == start.text:
+            # Not a unit; whatever follows the number decides the error.
+            return value, index - 1, None
+        return None, index, f"Wrong expression format: unknown unit '{text}' at position {start.position}."
+    if unit.dimensionless:
+        return value * unit.scale, index, None
+    return Quantity(value, unit), index, None
+
+def _modulus(a: object, tokens: List[Token], index: int) -> Tuple[object, Optional[str]]:
+    # A trailing "mod m" makes the first operand an integer modulo m: "3 ** 1000 mod 7" is a modular power.
+    modulus, error = _literal(tokens[index + 1], True)
+    if error is not None:
+        return None, error
+    if type(modulus) is not int or modulus < 1:
+        position = tokens[index + 1].position
+        return None, f"Wrong expression format: expected a positive integer modulus at position {position}."
+    if type(a) is float and a.is_integer():
+        a = int(a)
+    if type(a) is not int:
+        return None, f"Wrong expression format: 'mod' needs an integer at position {tokens[0].position}."
+    return Mod(a, modulus), None
+
+def _parse_tokens(expression: str, tokens: List[Token],
+                  exact: bool = False) -> Tuple[Optional[tuple], Optional[str]]:
+    incomplete = f"Wrong expression format: incomplete expression at position {len(expression.rstrip())}."
+    if len(tokens) < 2:
+        return None, incomplete
+
+    first = tokens[0]
+    if not is_number(first):
+        return None, f"Wrong expression format: expected a number at position {first.position}."
+    a, index, error = _operand(tokens, 0, exact)
+    if error is not None:
+        return None, error
+    if index == len(tokens):
+        return None, incomplete
+
+    operator = tokens[index]
+    if operator.kind == 'name' and CalculationFactory.find_calculation(operator.text) is not None:
+        op = operator.text.lower()
+    elif operator.kind != 'symbol':
+        return None, f"Wrong expression format: expected an operation at position {operator.position}."
+    else:
+        op = _SYMBOLS.get(operator.text)
+    if op is None:
+        return None, "Unsupported operation."
+    if index + 1 == len(tokens):
+        default_b = CalculationFactory.get_calculation(op).default_b
+        if default_b is None:
+            return None, incomplete
+        return (op, a, default_b if exact else float(default_b)), None
+
+    second = tokens[index + 1]
+    if not is_number(second):
+        return None, f"Wrong expression format: expected a number at position {second.position}."
+    b, index, error = _operand(tokens, index + 1, exact)
+    if error is not None:
+        return None, error
+    if index + 2 == len(tokens) and tokens[index].text.lower() == 'mod' and is_number(tokens[index + 1]):
+        a, error = _modulus(a, tokens, index)
+        if error is not None:
+            return None, error
+        index += 2
+    if index < len(tokens):
+        return None, f"Wrong expression format: unexpected '{tokens[index].text}' at position {tokens[index].position}."
+
+    return (op, a, b), None
+
+def try_parse_input(expression: str, exact: bool = False) -> Tuple[Optional[tuple], Optional[str]]:
+
+        # Same grammar as parse_input, but failures are returned as a message instead of raised.
+        # Only a hit returns early; everything else gets the scanner's error, the same one parse_input raises.
+        match = None if exact else _SIMPLE_EXPRESSION.fullmatch(expression)
+        if match is not None:
+            op = _SYMBOLS.get(match.group(2))
+            if op is not None:
+                return (op, float(match.group(1)), float(match.group(3))), None
+
+        return _parse_tokens(expression, tokenize(expression, _MAX_TOKENS), exact)
+
+def parse_input(expression: str, exact: bool = False):
+
+        # Fast path for the common "<number> <operation> <number>" form; anything else goes through the scanner.
+        # In integer mode (exact) literals are not floats, so it is skipped.
+        parts = () if exact else expression.split()
+        if len(parts) == 3:
+            op = _SYMBOLS.get(parts[1])
+            if op is not None:
+                try:
+                    return (op, float(parts[0]), float(parts[2]))
+                except ValueError:
+                    pass
+
+        parsed, error = _parse_tokens(expression, tokenize(expression, _MAX_TOKENS), exact)
+        if error is not None:
+            raise ValueError(error)
+        return parsed
+
+def evaluate_input(user_input: str, history: History, cache: Optional[ResultCache] = None,
+                   lookups: Optional[LookupEngine] = None, exact: bool = False,
+                   tracer: Optional[Tracer] = None) -> None:
+
+        # A sampled evaluation records one span per stage; the rest only pay for the sampling decision.
+        trace = tracer.trace(user_input) if tracer is not None else None
+        try:
+            operation, a, b = parse_input(user_input, exact)
         except ValueError as e:
-            raise ValueError(e)
-
-        if op == '+':
-            op = "add"
-        elif op == '-':
-          op = "sub"
-        elif op == '*':
-           op = "mul"
-        elif op == '/':
-            op = "div"
-        else:
-            raise ValueError("Unsupported operation.")
+            print("ERROR: ", e)
+            if trace is not None:
+                trace.span('parse_input')
+                trace.finish(str(e))
+            return
+        if trace is not None:
+            trace.span('parse_input')
         
-        return(op, num1, num2)
+        try:
+            calculation = CalculationFactory.create_calculation(operation, a, b, intern=True)
+        except ValueError as e: # pragma: no cover
+            print("ERROR: ", e) # pragma: no cover
+            return # pragma: no cover
+        if trace is not None:
+            trace.span('create_calculation')
 
-def Calculator() -> None:
-    
-    history: List[Calculation] = []
+        if type(a) is not float or type(b) is not float:
+            # The cache stores plain floats and would drop units, moduli and exact integers.
+            cache = None
+
+        if isinstance(calculation, AsyncCalculation):
+            try:
+                if lookups is None:
+                    raise ValueError(f"No rate source named '{calculation.source}' is configured.")
+                lookups.resolve([calculation])
+            except (OSError, ValueError) as e:
+                print("ERROR: ", e)
+                if trace is not None:
+                    trace.span('lookup')
+                    trace.finish(str(e))
+                return
+            if trace is not None:
+                trace.span('lookup')
+            # Looked-up values change over time, so they bypass the result cache.
+            cache = None
+
+        try:
+            if cache is not None:
+                result = cache.get_or_compute(operation, a, b, calculation.exec)
+            else:
+                result = calculation.exec()
+            if trace is not None:
+                trace.span('exec')
+            print(format_value(result))
+        except ZeroDivisionError:
+            print("Cannot divide by zero.")
+            if trace is not None:
+                trace.span('exec')
+                trace.finish("Cannot divide by zero.")
+            return
+        except Exception as e:
+            print(f"An error occurred during calculation: {e}")
+            print("Please try again.\n")
+            if trace is not None:
+                trace.span('exec')
+                trace.finish(str(e))
+            return
+
+        if trace is not None:
+            trace.skip()
+        history.append(calculation, result)
+        if trace is not None:
+            trace.span('history.append')
+            trace.finish()
 
+def profile_command(profiler: Profiler, arguments: List[str]) -> None:
+    action = arguments[0].lower() if arguments else 'report'
+    try:
+        if action == 'on':
+            profiler.start(memory=arguments[1:2] == ['memory'])
+            print("Profiling on." + (" Tracing memory allocations." if profiler.memory else ""))
+        elif action == 'off':
+            profiler.stop()
+            print(profiler.report())
+        elif action == 'dump' and len(arguments) == 2:
+            profiler.dump(arguments[1])
+            print(f"Profile written to '{arguments[1]}'.")
+        elif action == 'report':
+            print(profiler.report())
+        else:
+            print("Usage: profile on [memory] | profile off | profile dump <file>")
+    except (OSError, ValueError) as e:
+        print("ERROR: ", e)
+
+def trace_command(tracer: Tracer, arguments: List[str]) -> None:
+    action = arguments[0].lower() if arguments else 'status'
+    try:
+        if action == 'on' and len(arguments) <= 2:
+            tracer.start(float(arguments[1]) if len(arguments) == 2 else None)
+            print(tracer)
+        elif action == 'off':
+            tracer.stop()
+            print(tracer)
+        elif action == 'dump' and len(arguments) == 2:
+            traces = tracer.export(arguments[1])
+            print(f"Wrote {traces} traces to '{arguments[1]}'.")
+        elif action == 'clear':
+            tracer.clear()
+            print(tracer)
+        elif action == 'status':
+            print(tracer)
+        else:
+            print("Usage: trace on [rate] | trace off | trace dump <file> | trace clear")
+    except (OSError, ValueError) as e:
+        print("ERROR: ", e)
+
+def bench_command(arguments: List[str]) -> None:
+    try:
+        workload = parse_workload(arguments)
+    except ValueError as e:
+        print("ERROR: ", e)
+        return
+    print(run_bench(workload))
+
+def run_script(path: str, session: Session) -> bool:
+    # Prints each result like the REPL would and records it in the history; assigned variables are kept.
+    history = session.history
+
+    def emit(line: int, calculation: Optional[Calculation], result: object) -> None:
+        print(format_value(result))
+        if calculation is not None:
+            history.append(calculation, result)
+
+    try:
+        program = load_script(path, exact=session.exact)
+        session.variables.update(program.run(emit, session.variables))
+    except (OSError, ValueError) as e:
+        print("ERROR: ", e)
+        return False
+    return True
+
+def stats_command(history: History, arguments: List[str]) -> None:
+    action = arguments[0].lower() if arguments else 'results'
+    if action == 'results' and len(arguments) < 2:
+        print(history.stats)
+    elif action == 'reset' and len(arguments) == 1:
+        history.stats.reset()
+        print("Statistics reset.")
+    else:
+        print("Usage: stats [results] | stats reset")
+
+def mode_command(session: Session, arguments: List[str]) -> None:
+    if arguments and arguments[0].lower() in ('int', 'float') and len(arguments) == 1:
+        session.exact = arguments[0].lower() == 'int'
+    elif arguments:
+        print("Usage: mode [int|float]")
+        return
+    print("Integer mode: integers are exact." if session.exact else "Float mode: numbers are floating point.")
+
+def _describe_limit(max_entries: Optional[int], max_bytes: Optional[int] = None) -> str:
+    limits = []
+    if max_entries is not None:
+        limits.append(f"{max_entries} entries")
+    if max_bytes is not None:
+        limits.append(format_bytes(max_bytes))
+    return "limit " + ", ".join(limits) if limits else "no limit"
+
+def memory_command(session: Session, arguments: List[str]) -> None:
+    if not arguments:
+        usage = session.memory_usage()
+        history, cache, variables = session.history, session.cache, session.variables
+        print("Memory usage:")
+        print(f"    history   : {format_bytes(usage['history'])} ({len(history)} calculations, "
+              f"{_describe_limit(history.max_entries)}, {history.evictions} evicted)")
+        if cache is not None:
+            print(f"    cache     : {format_bytes(usage['cache'])} ({len(cache.memory)} entries, "
+                  f"{cache.memory.policy.name}, {_describe_limit(cache.memory.max_entries, cache.memory.max_bytes)}, "
+                  f"{cache.memory.evictions} evicted)")
+        print(f"    variables : {format_bytes(usage['variables'])} ({len(variables)} entries, "
+              f"{variables.policy.name}, {_describe_limit(variables.max_entries, variables.max_bytes)}, "
+              f"{variables.evictions} evicted)")
+        print(f"    total     : {format_bytes(sum(usage.values()))}")
+        return
+
+    if arguments[0].lower() != 'limit' or len(arguments) not in (3, 4):
+        print("Usage: memory | memory limit <history|cache|variables> <entries|size|none> [fifo|lru|size]")
+        return
+    target, value = arguments[1].lower(), arguments[2]
+    policy = arguments[3] if len(arguments) == 4 else None
+    try:
+        max_entries = max_bytes = None
+        if value.lower() != 'none':
+            if value.isdigit():
+                max_entries = int(value)
+            else:
+                max_bytes = parse_bytes(value)
+        if target == 'history':
+            if max_bytes is not None or policy not in (None, 'fifo'):
+                raise ValueError("History can only be limited by entries, oldest first.")
+            session.history.set_limit(max_entries)
+        elif target == 'variables':
+            session.variables.configure(max_entries, max_bytes, policy)
+        elif target == 'cache' and session.cache is not None:
+            session.cache.memory.configure(max_entries, max_bytes, policy)
+        elif target == 'cache':
+            raise ValueError("Result cache is disabled.")
+        else:
+            raise ValueError(f"Unknown memory target: '{target}'.")
+        print(f"Updated {target} limit.")
+    except ValueError as e:
+        print("ERROR: ", e)
+
+def checkpoint_command(session: Session, action: str, path: str) -> None:
+    try:
+        if action == 'save':
+            rows = save_session(session, path)
+            print(f"Saved {rows} calculations to '{path}'.")
+        else:
+            rows = load_session(session, path)
+            print(f"Loaded {rows} calculations from '{path}'.")
+    except (OSError, ValueError) as e:
+        print("ERROR: ", e)
+
+# Names offered by tab completion besides previously entered lines.
+COMMANDS = ('help', 'history', 'undo', 'redo', 'snapshot', 'restore', 'export', 'cache', 'profile', 'memory',
+            'bench', 'mode', 'stats', 'run', 'trace', 'save', 'load', 'exit')
+
+def Calculator(cache: Optional[ResultCache] = None, profiler: Optional[Profiler] = None,
+               session: Optional[Session] = None) -> None:
     
+    session = session if session is not None else Session(cache=cache, profiler=profiler)
+    history, cache, profiler = session.history, session.cache, session.profiler
+    completer = Completer(COMMANDS + tuple(CalculationFactory.calculation_types()) + ('mod',))
+    install_completion(completer)
 
     print("Basic Calculator")
     print("Available commands are help, history, exit")
@@ -78,10 +456,21 @@ def Calculator() -> None:
 
         if not user_input:
             continue # pragma: no cover
+        completer.add(user_input)
 
         command = user_input.lower()
         
         if command == 'exit':
+            if profiler.enabled:
+                profiler.stop()
+                print(profiler.report())
+            if cache is not None:
+                cache.close()
+            if session.tracer.path is not None:
+                session.tracer.export(session.tracer.path)
+            if session.checkpoint is not None:
+                checkpoint_command(session, 'save', session.checkpoint)
+            session.lookups.close()
             print("Good-bye")
             sys.exit(0)
         elif command == 'help':
@@ -90,28 +479,65 @@ def Calculator() -> None:
         elif command == 'history':
             display_history(history)
             continue # pragma: no cover
-
-        try:
-            operation, a, b = parse_input(user_input)
-        except ValueError as e:
-            print("ERROR: ", e)
+        elif command == 'undo':
+            calculation = history.undo()
+            print(f"Undid: {calculation}" if calculation is not None else "Nothing to undo.")
             continue # pragma: no cover
-        
-        try:
-            calculation = CalculationFactory.create_calculation(operation, a, b)
-        except ValueError as e: # pragma: no cover
-            print("ERROR: ", e) # pragma: no cover
+        elif command == 'redo':
+            calculation = history.redo()
+            print(f"Redid: {calculation}" if calculation is not None else "Nothing to redo.")
             continue # pragma: no cover
-
-        try:
-            print(calculation.exec())
-        except ZeroDivisionError:
-            print("Cannot divide by zero.")
+        elif command.startswith('snapshot ') or command.startswith('restore '):
+            action, name = user_input.split(maxsplit=1)
+            try:
+                if action.lower() == 'snapshot':
+                    history.snapshot(name)
+                    print(f"Saved snapshot '{name}' ({len(history)} calculations).")
+                else:
+                    history.restore(name)
+                    print(f"Restored snapshot '{name}' ({len(history)} calculations).")
+            except ValueError as e:
+                print("ERROR: ", e)
             continue # pragma: no cover
-        except Exception as e:
-            print(f"An error occurred during calculation: {e}")
-            print("Please try again.\n")
+        elif command.startswith('export '):
+            arguments = user_input.split()[1:]
+            precision = arguments.pop().lower() if len(arguments) > 1 and arguments[-1].lower() in PRECISIONS \
+                else 'float64'
+            try:
+                rows = export_history(history, arguments[0], arguments[1].lower() if len(arguments) > 1 else None,
+                                      precision)
+                print(f"Exported {rows} calculations to '{arguments[0]}'.")
+            except (OSError, ValueError) as e:
+                print("ERROR: ", e)
+            continue # pragma: no cover
+        elif command.startswith('save ') or command.startswith('load '):
+            checkpoint_command(session, command[:4], user_input[5:].strip())
+            continue # pragma: no cover
+        elif command == 'profile' or command.startswith('profile '):
+            profile_command(profiler, user_input.split()[1:])
+            continue # pragma: no cover
+        elif command == 'memory' or command.startswith('memory '):
+            memory_command(session, user_input.split()[1:])
+            continue # pragma: no cover
+        elif command == 'bench' or command.startswith('bench '):
+            with profiler:
+                bench_command(user_input.split()[1:])
+            continue # pragma: no cover
+        elif command == 'cache':
+            print(cache.stats if cache is not None else "Result cache is disabled.")
+            continue # pragma: no cover
+        elif command.startswith('run '):
+            run_script(user_input.split(maxsplit=1)[1], session)
+            continue # pragma: no cover
+        elif command == 'stats' or command.startswith('stats '):
+            stats_command(history, user_input.split()[1:])
+            continue # pragma: no cover
+        elif command == 'mode' or command.startswith('mode '):
+            mode_command(session, user_input.split()[1:])
+            continue # pragma: no cover
+        elif command == 'trace' or command.startswith('trace '):
+            trace_command(session.tracer, user_input.split()[1:])
             continue # pragma: no cover
 
-        history.append(calculation)
-        
+        with profiler:
+            evaluate_input(user_input, history, cache, session.lookups, session.exact, session.tracer)
@@ -0,0 +1,310 @@
+import json
+import struct
+import sys
+from array import array
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from app.calculation import AsyncCalculation, Calculation, CalculationFactory
+from app.history import History, HistoryNode, HistoryState, LazyNode, Node
+from app.integers import Mod
+from app.memory import BoundedStore
+from app.session import Session
+from app.stats import ResultStats
+from app.units import Quantity, compose_unit
+
+_MAGIC = b'CALCSESS'
+# Version 1 kept the state as a pickle; it is JSON now, so loading a file never runs code from it.
+_VERSION = 2
+# magic, version, size of the JSON state, history rows, float calculations
+_HEADER = struct.Struct('<8sHxxIQQ')
+_SWAP = sys.byteorder != 'little'
+
+
+def _padding(size: int) -> bytes:
+    return b'\0' * (-size % 8)
+
+
+def _encode(value: object) -> Any:
+    # Floats are JSON numbers (with Infinity and NaN); other values are tagged. Integers are written in
+    # hex, which int() reads back at any length.
+    if type(value) is float:
+        return value
+    if type(value) is int:
+        return {'int': format(value, 'x')}
+    if type(value) is Mod:
+        return {'mod': [format(value.value, 'x'), format(value.modulus, 'x')]}
+    if type(value) is Quantity:
+        return {'quantity': [_encode(value.value), value.unit.units]}
+    raise ValueError(f"Cannot save a value of type '{type(value).__name__}'.")
+
+
+def _decode(value: Any) -> object:
+    if type(value) is float:
+        return value
+    if 'int' in value:
+        return int(value['int'], 16)
+    if 'mod' in value:
+        number, modulus = value['mod']
+        return Mod(int(number, 16), int(modulus, 16))
+    number, units = value['quantity']
+    return Quantity(_decode(number), compose_unit(tuple((name, exponent) for name, exponent in units)))
+
+
+def _encode_calculation(calculation: Calculation) -> Dict[str, Any]:
+    encoded = {'type': calculation.calculation_type, 'a': _encode(calculation.a), 'b': _encode(calculation.b)}
+    if isinstance(calculation, AsyncCalculation) and calculation.value is not None:
+        encoded['value'] = _encode(calculation.value)
+    return encoded
+
+
+def _decode_calculation(encoded: Dict[str, Any]) -> Calculation:
+    calculation = CalculationFactory.create_calculation(encoded['type'], _decode(encoded['a']),
+                                                        _decode(encoded['b']), intern=True)
+    if 'value' in encoded:
+        calculation.value = _decode(encoded['value'])
+    return calculation
+
+
+class _Rows:
+    # The history of a loaded checkpoint, still in the file's columns. Row i names a calculation: k >= 0 is
+    # entry k of the float table (opcode, a, b), built and interned on first use; ~k is an object from the
+    # JSON state for everything else (exact integers, units, moduli, looked-up values).
+
+    def __init__(self, names: List[str], index: array, opcodes: array, a: array, b: array,
+                 objects: List[Calculation]) -> None:
+        self.names: List[str] = names
+        self.index: array = index
+        self.opcodes: array = opcodes
+        self.a: array = a
+        self.b: array = b
+        self.objects: List[Calculation] = objects
+        self._calculations: List[Optional[Calculation]] = [None] * len(opcodes)
+
+    def entry(self, k: int) -> Calculation:
+        if k < 0:
+            return self.objects[~k]
+        calculation = self._calculations[k]
+        if calculation is None:
+            calculation = CalculationFactory.create_calculation(self.names[self.opcodes[k]], self.a[k], self.b[k],
+                                                                intern=True)
+            self._calculations[k] = calculation
+        return calculation
+
+    def __getitem__(self, row: int) -> Calculation:
+        return self.entry(self.index[row])
+
+
+class _Writer:
+
+    def __init__(self) -> None:
+        self.names: List[str] = CalculationFactory.calculation_types()
+        self.index: array = array('i')
+        self.opcodes: array = array('B')
+        self.a: array = array('d')
+        self.b: array = array('d')
+        self.objects: List[Calculation] = []
+        self._seen: Dict[int, int] = {}
+
+    def add(self, calculation: Calculation) -> int:
+        # Each distinct calculation is written once however many entries share it.
+        k = self._seen.get(id(calculation))
+        if k is None:
+            if type(calculation.a) is float and type(calculation.b) is float \
+                    and not isinstance(calculation, AsyncCalculation):
+                k = len(self.opcodes)
+                self.opcodes.append(calculation.opcode)
+                self.a.append(calculation.a)
+                self.b.append(calculation.b)
+            else:
+                k = ~len(self.objects)
+                self.objects.append(calculation)
+            self._seen[id(calculation)] = k
+        return k
+
+    def extend(self, rows: _Rows, length: int) -> None:
+        # Called first, on an empty writer: rows loaded earlier are copied column by column, without building
+        # them, as long as their opcodes still mean the same (registration only ever appends types).
+        if self.names[:len(rows.names)] == rows.names:
+            self.opcodes.extend(rows.opcodes)
+            self.a.extend(rows.a)
+            self.b.extend(rows.b)
+            self.objects.extend(rows.objects)
+            self.index.extend(rows.index[:length])
+        else:
+            for row in range(length):
+                self.index.append(self.add(rows[row]))
+
+
+def _loaded(node: Optional[HistoryNode]) -> bool:
+    return isinstance(node, LazyNode) and isinstance(node.entries, _Rows)
+
+
+def _head_rows(writer: _Writer, head: Optional[HistoryNode]) -> Tuple[Dict[int, int], Optional[LazyNode]]:
+    # Writes the current history oldest first. Returns the row of each in-memory node on it, and the
+    # newest loaded row it still starts with, if any.
+    nodes = []
+    while head is not None and not _loaded(head):
+        nodes.append(head)
+        head = head.previous
+    if head is not None:
+        writer.extend(head.entries, head.length)
+    rows = {}
+    for node in reversed(nodes):
+        rows[id(node)] = len(writer.index)
+        writer.index.append(writer.add(node.calculation))
+    return rows, head
+
+
+def _node_key(node: HistoryNode) -> Hashable:
+    # Lazy nodes are built on every read, so two of them for the same row are the same node.
+    return (id(node.entries), node.length) if isinstance(node, LazyNode) else id(node)
+
+
+def _reference(writer: _Writer, node: Optional[HistoryNode], head_rows: Dict[int, int], base: Optional[LazyNode],
+               extras: List[Tuple[int, int]], extra_ids: Dict[Hashable, Tuple[HistoryNode, int]]) -> int:
+    # Undone entries and snapshots that left the current history are written as extra nodes, each naming
+    # its parent: -1 for none, r < rows for history row r, rows + i for extra node i.
+    path = []
+    while node is not None:
+        if id(node) in head_rows:
+            parent = head_rows[id(node)]
+            break
+        if _node_key(node) in extra_ids:
+            parent = extra_ids[_node_key(node)][1]
+            break
+        if isinstance(node, LazyNode) and base is not None and node.entries is base.entries \
+                and node.length <= base.length:
+            parent = node.length - 1
+            break
+        path.append(node)
+        node = node.previous
+    else:
+        parent = -1
+    for node in reversed(path):
+        extras.append((parent, writer.add(node.calculation)))
+        parent = len(writer.index) + len(extras) - 1
+        # Holding the node keeps its id from being reused by a row node built later.
+        extra_ids[_node_key(node)] = (node, parent)
+    return parent
+
+
+def save_session(session: Session, path: str) -> int:
+    history = session.history
+    history_state = history.state()
+    writer = _Writer()
+    head_rows, base = _head_rows(writer, history_state.head)
+    extras: List[Tuple[int, int]] = []
+    extra_ids: Dict[Hashable, Tuple[HistoryNode, int]] = {}
+    redo = _reference(writer, history_state.redo, head_rows, base, extras, extra_ids)
+    snapshots = {name: _reference(writer, snapshot, head_rows, base, extras, extra_ids)
+                 for name, snapshot in history_state.snapshots.items()}
+
+    variables = session.variables
+    state = {
+        'names': writer.names,
+        'objects': [_encode_calculation(calculation) for calculation in writer.objects],
+        'extras': extras,
+        'redo': redo,
+        'snapshots': snapshots,
+        'exact': session.exact,
+        'max_history': history.max_entries,
+        'evictions': history.evictions,
+        'stats': history.stats.to_dict(),
+        'variables': [variables.max_entries, variables.max_bytes, variables.policy.name,
+                      [[key, _encode(value)] for key, value in variables.ordered_items()], variables.evictions],
+        'tracing': [session.tracer.enabled, session.tracer.sample_rate],
+    }
+    blob = json.dumps(state, separators=(',', ':')).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSION, len(blob), len(writer.index), len(writer.opcodes)))
+        f.write(blob + _padding(len(blob)))
+        for column in (writer.index, writer.opcodes, writer.a, writer.b):
+            if _SWAP:  # pragma: no cover
+                column = array(column.typecode, column)
+                column.byteswap()
+            f.write(memoryview(column).cast('B'))
+            f.write(_padding(len(column) * column.itemsize))
+    return len(writer.index)
+
+
+def _read_column(data: memoryview, offset: int, typecode: str, count: int) -> Tuple[array, int]:
+    column = array(typecode)
+    size = column.itemsize * count
+    column.frombytes(data[offset:offset + size])
+    if _SWAP:  # pragma: no cover
+        column.byteswap()
+    return column, offset + size + len(_padding(size))
+
+
+def load_session(session: Session, path: str) -> int:
+    with open(path, 'rb') as f:
+        data = memoryview(f.read())
+
+    if len(data) < _HEADER.size:
+        raise ValueError(f"'{path}' is not a calculator checkpoint.")
+    magic, version, state_size, count, table_size = _HEADER.unpack_from(data)
+    if magic != _MAGIC:
+        raise ValueError(f"'{path}' is not a calculator checkpoint.")
+    if version != _VERSION:
+        raise ValueError(f"Unsupported checkpoint version: {version}.")
+    offset = _HEADER.size + state_size + len(_padding(state_size))
+    expected = offset + 4 * count + len(_padding(4 * count)) + table_size + len(_padding(table_size)) \
+        + 2 * 8 * table_size
+    if len(data) < expected:
+        raise ValueError(f"'{path}' is truncated or corrupt.")
+    try:
+        state = json.loads(bytes(data[_HEADER.size:_HEADER.size + state_size]))
+        names = state['names']
+    except (ValueError, TypeError, KeyError):
+        raise ValueError(f"'{path}' is truncated or corrupt.") from None
+    for name in names:
+        if CalculationFactory.find_calculation(name) is None:
+            raise ValueError(f"'{path}' uses an unknown calculation type: '{name}'.")
+    try:
+        objects = [_decode_calculation(encoded) for encoded in state['objects']]
+        stats = ResultStats.from_dict(state['stats'])
+        max_entries, max_bytes, policy, items, evictions = state['variables']
+        values = [(key, _decode(value)) for key, value in items]
+        extras, redo, snapshots = state['extras'], state['redo'], state['snapshots']
+        enabled, sample_rate = state['tracing']
+        max_history, history_evictions, exact = state['max_history'], state['evictions'], state['exact']
+        if max_history is not None and (type(max_history) is not int or max_history < 1) \
+                or type(history_evictions) is not int or type(exact) is not bool:
+            raise ValueError
+    except (ValueError, TypeError, KeyError, IndexError, ArithmeticError):
+        raise ValueError(f"'{path}' is truncated or corrupt.") from None
+
+    index, offset = _read_column(data, offset, 'i', count)
+    opcodes, offset = _read_column(data, offset, 'B', table_size)
+    a, offset = _read_column(data, offset, 'd', table_size)
+    b, offset = _read_column(data, offset, 'd', table_size)
+    rows = _Rows(names, index, opcodes, a, b, objects)
+
+    nodes: List[Node] = []
+
+    def node(reference: int) -> Optional[HistoryNode]:
+        if reference < 0:
+            return None
+        if reference < count:
+            return LazyNode(rows, reference + 1)
+        return nodes[reference - count]
+
+    for parent, k in extras:
+        nodes.append(Node(rows.entry(k), node(parent)))
+
+    history: History = session.history
+    history.restore_state(HistoryState(node(count - 1), node(redo),
+                                       {name: node(reference) for name, reference in snapshots.items()}))
+    history.set_limit(max_history)
+    history.evictions = history_evictions
+    history.stats = stats
+
+    variables = BoundedStore(max_entries, max_bytes, policy)
+    for key, value in values:
+        variables[key] = value
+    variables.evictions = evictions
+    session.variables = variables
+    session.exact = exact
+    session.tracer.sample_rate = sample_rate
+    session.tracer.enabled = enabled
+    return count
@@ -0,0 +1,159 @@
+import sys
+from typing import Dict, Iterable, List, Optional
+
+# readline is not available on every platform (Windows, for one); completion is then simply off.
+try:
+    import readline
+except ImportError: # pragma: no cover
+    readline = None # pragma: no cover
+
+# Completions offered per prefix. Every trie node keeps this many lines, so a lookup never looks past them.
+MAX_MATCHES = 10
+# Distinct lines kept for completion; past this the least recently entered line is dropped.
+MAX_LINES = 10_000
+
+
+class _Node:
+    __slots__ = ('label', 'children', 'top')
+
+    def __init__(self, label: str, children: Optional[Dict[str, "_Node"]], top: List[str]) -> None:
+        self.label: str = label
+        self.children: Optional[Dict[str, _Node]] = children
+        # The most recently entered lines below this node, newest first.
+        self.top: List[str] = top
+
+
+def _common_length(a: str, b: str) -> int:
+    length = min(len(a), len(b))
+    for i in range(length):
+        if a[i] != b[i]:
+            return i
+    return length
+
+
+class PrefixTrie:
+    # A radix trie (one node per branching point, edges labelled with whole substrings) over entered lines.
+    # Each node caches the newest lines in its subtree, so completing a prefix costs one walk down the
+    # prefix and a copy of at most max_matches lines, however many lines have been added.
+
+    def __init__(self, max_matches: int = MAX_MATCHES, max_lines: Optional[int] = MAX_LINES) -> None:
+        self.max_matches: int = max_matches
+        self.max_lines: Optional[int] = max_lines
+        self._root: _Node = _Node('', None, [])
+        # Every line in the trie, least recently entered first.
+        self._lines: Dict[str, None] = {}
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def _touch(self, top: List[str], line: str) -> None:
+        if line in top:
+            top.remove(line)
+        top.insert(0, line)
+        del top[self.max_matches:]
+
+    @staticmethod
+    def _discard(top: List[str], line: str) -> None:
+        if line in top:
+            top.remove(line)
+
+    def add(self, line: str) -> None:
+        self._lines.pop(line, None)
+        self._lines[line] = None
+        self._insert(line)
+        if self.max_lines is not None and len(self._lines) > self.max_lines:
+            oldest = next(iter(self._lines))
+            del self._lines[oldest]
+            self._remove(oldest)
+
+    def _insert(self, line: str) -> None:
+        node, rest = self._root, line
+        self._touch(node.top, line)
+        while rest:
+            child = node.children.get(rest[0]) if node.children is not None else None
+            if child is None:
+                if node.children is None:
+                    node.children = {}
+                node.children[rest[0]] = _Node(rest, None, [line])
+                return
+            common = _common_length(child.label, rest)
+            if common < len(child.label):
+                # The new line leaves this edge part way along; split it at the branching point.
+                middle = _Node(child.label[:common], {child.label[common]: child}, list(child.top))
+                child.label = child.label[common:]
+                node.children[rest[0]] = middle
+                child = middle
+            self._touch(child.top, line)
+            node, rest = child, rest[common:]
+
+    def _remove(self, line: str) -> None:
+        # Only for the least recently entered line: a node lists it only when its subtree holds no more than
+        # max_matches lines, so dropping it leaves every list exact. A node left without lines has none below
+        # it and goes with its subtree.
+        node, rest = self._root, line
+        self._discard(node.top, line)
+        while rest:
+            child = node.children[rest[0]]
+            self._discard(child.top, line)
+            if not child.top:
+                del node.children[rest[0]]
+                return
+            node, rest = child, rest[len(child.label):]
+
+    def complete(self, prefix: str) -> List[str]:
+        node, rest = self._root, prefix
+        while rest:
+            child = node.children.get(rest[0]) if node.children is not None else None
+            if child is None:
+                return []
+            label = child.label
+            if rest.startswith(label):
+                node, rest = child, rest[len(label):]
+            elif label.startswith(rest):
+                return list(child.top)
+            else:
+                return []
+        return list(node.top)
+
+
+class Completer:
+    # Tab completion for the REPL: whole previously entered lines that start with what has been typed,
+    # newest first, then command and operation names for the word under the cursor.
+
+    def __init__(self, words: Iterable[str] = (), max_matches: int = MAX_MATCHES,
+                 max_lines: Optional[int] = MAX_LINES) -> None:
+        self.lines: PrefixTrie = PrefixTrie(max_matches, max_lines)
+        self.words: List[str] = sorted(set(words))
+        self._matches: List[str] = []
+
+    def add(self, line: str) -> None:
+        self.lines.add(line)
+
+    def complete(self, text: str) -> List[str]:
+        matches = [line for line in self.lines.complete(text) if line != text]
+        start = text.rfind(' ') + 1
+        word = text[start:]
+        if word:
+            matches.extend(text[:start] + name for name in self.words if name.startswith(word) and name != word)
+        return list(dict.fromkeys(matches))
+
+    def readline_complete(self, text: str, state: int) -> Optional[str]:
+        # readline asks for match 0, 1, 2, ... until it gets None.
+        if state == 0:
+            self._matches = self.complete(text)
+        return self._matches[state] if state < len(self._matches) else None
+
+
+def install(completer: Completer) -> bool:
+    # Only an interactive terminal gets line editing; piped input is read as is.
+    if readline is None or not sys.stdin.isatty():
+        return False
+    # No delimiters: the completer sees the whole line typed so far, not just its last word.
+    readline.set_completer_delims('')
+    readline.set_completer(completer.readline_complete)
+    if 'libedit' in (readline.__doc__ or ''):
+        # The system Python on macOS links libedit, which has its own binding syntax.
+        readline.parse_and_bind('bind ^I rl_complete') # pragma: no cover
+    else:
+        readline.parse_and_bind('tab: complete')
+    return True
@@ -0,0 +1,144 @@
+import random
+import re
+import time
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+# parse_input only ever rejects input with a ValueError carrying one of these messages.
+DOCUMENTED_ERRORS = re.compile(r"Wrong expression format: |Unsupported operation\.")
+
+_SYMBOLS = ('+', '-', '*', '/')
+_JUNK = '+-*/()^%!?.,;:=<>&|~#$@_eExX \t' + 'αé€✓'
+
+
+def _number(rng: random.Random) -> str:
+    form = rng.randrange(8)
+    if form == 0:
+        return str(rng.randint(-10 ** 6, 10 ** 6))
+    if form == 1:
+        return f"{rng.uniform(-1e3, 1e3):.{rng.randint(0, 8)}f}"
+    if form == 2:
+        return f"{rng.uniform(-10, 10):.3f}e{rng.randint(-320, 320)}"
+    if form == 3:
+        return hex(rng.randint(0, 2 ** 32))
+    if form == 4:
+        return f"{rng.randint(1, 999)}_{rng.randint(0, 999):03d}"
+    if form == 5:
+        return rng.choice(('inf', '-inf', 'nan', 'Infinity', '.5', '5.', '-.25'))
+    if form == 6:
+        return '9' * rng.randint(20, 400)
+    return str(rng.randint(0, 9))
+
+
+def valid_line(rng: random.Random) -> str:
+    a, symbol, b = _number(rng), rng.choice(_SYMBOLS), _number(rng)
+    if rng.random() < 0.7:
+        space = ' ' * rng.randint(1, 3)
+        return f"{space[1:]}{a}{space}{symbol}{space}{b}"
+    # The unspaced form only needs a separator where a sign would otherwise join the number.
+    return f"{a}{symbol}{' ' if b[0] in '+-' and not a[-1].isalnum() else ''}{b}"
+
+
+def malformed_line(rng: random.Random) -> str:
+    line = valid_line(rng)
+    mutation = rng.randrange(9)
+    position = rng.randint(0, len(line))
+    if mutation == 0:
+        return line[:position]
+    if mutation == 1:
+        return line[:position] + line[position + 1:]
+    if mutation == 2:
+        return line[:position] + rng.choice(_JUNK) + line[position:]
+    if mutation == 3:
+        return f"{line} {rng.choice(_SYMBOLS)} {_number(rng)}"
+    if mutation == 4:
+        return rng.choice(_SYMBOLS) * rng.randint(1, 2000)
+    if mutation == 5:
+        return ''.join(rng.choice(_JUNK) for _ in range(rng.randint(0, 40)))
+    if mutation == 6:
+        return '0x' + 'f' * rng.randint(200, 2000) + ' * 2'
+    if mutation == 7:
+        return f"{'(' * rng.randint(1, 50)}{line}{')' * rng.randint(0, 50)}"
+    return ' ' * rng.randint(0, 5000) + line.replace(' ', '\t')
+
+
+def generate_corpus(count: int, seed: int = 0, malformed_ratio: float = 0.5) -> Iterator[str]:
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield malformed_line(rng) if rng.random() < malformed_ratio else valid_line(rng)
+
+
+def write_corpus(path: str, count: int, seed: int = 0, malformed_ratio: float = 0.5) -> int:
+    with open(path, 'w', encoding='utf-8', newline='\n') as stream:
+        for line in generate_corpus(count, seed, malformed_ratio):
+            stream.write(line)
+            stream.write('\n')
+    return count
+
+
+def read_corpus(path: str) -> Iterator[str]:
+    with open(path, encoding='utf-8', newline='\n') as stream:
+        for line in stream:
+            yield line[:-1] if line.endswith('\n') else line
+
+
+class CorpusReport:
+
+    def __init__(self, slow_limit: int = 10) -> None:
+        self.lines: int = 0
+        self.accepted: int = 0
+        self.rejected: int = 0
+        self.crashes: List[Tuple[str, str]] = []
+        self.slowest: List[Tuple[float, str]] = []
+        self.elapsed: float = 0.0
+        self.slow_limit: int = slow_limit
+
+    @property
+    def ok(self) -> bool:
+        return not self.crashes
+
+    @property
+    def throughput(self) -> float:
+        return self.lines / self.elapsed if self.elapsed else 0.0
+
+    def _timed(self, seconds: float, line: str) -> None:
+        slowest = self.slowest
+        if len(slowest) < self.slow_limit or seconds > slowest[-1][0]:
+            slowest.append((seconds, line))
+            slowest.sort(reverse=True)
+            del slowest[self.slow_limit:]
+
+    def __str__(self) -> str:
+        lines = [f"Parsed {self.lines} lines in {self.elapsed:.3f}s ({self.throughput:,.0f} lines/s): "
+                 f"{self.accepted} accepted, {self.rejected} rejected, {len(self.crashes)} undocumented errors."]
+        for line, error in self.crashes[:20]:
+            lines.append(f"  {line[:60]!r}: {error}")
+        if self.slowest:
+            lines.append("Slowest inputs:")
+            for seconds, line in self.slowest:
+                lines.append(f"  {seconds * 1e6:10.1f} us  {line[:60]!r}{'...' if len(line) > 60 else ''}")
+        return '\n'.join(lines)
+
+
+def check_corpus(lines: Iterable[str], parse: Optional[Callable[[str], tuple]] = None,
+                 slow_limit: int = 10) -> CorpusReport:
+    if parse is None:
+        from app.calculator import parse_input as parse  # The calculator package imports the tokenizer this tests.
+    report = CorpusReport(slow_limit)
+    clock = time.perf_counter
+    started = clock()
+    for line in lines:
+        start = clock()
+        try:
+            parse(line)
+            report.accepted += 1
+        except ValueError as e:
+            if DOCUMENTED_ERRORS.match(str(e)):
+                report.rejected += 1
+            else:
+                report.crashes.append((line, f"ValueError: {e}"))
+        except Exception as e:
+            report.crashes.append((line, f"{type(e).__name__}: {e}"))
+        report._timed(clock() - start, line)
+        report.lines += 1
+    report.elapsed = clock() - started
+    return report
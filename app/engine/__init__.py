@@ -0,0 +1,71 @@
+from typing import Callable, Dict, Iterable, Optional, Sequence, Tuple, Type
+
+from app.batch import BatchResult, CALCULATION_ERROR, INVALID_OPERANDS, OK, UNSUPPORTED_OPERATION, column_value
+from app.calculation import Calculation, CalculationFactory
+from app.history import History
+
+_NAN = float('nan')
+
+
+def _through_instance(calculation_class: Type[Calculation]) -> Callable[[float, float], float]:
+    # Calculations registered without a plain function still run, one instance per row.
+    def function(a: float, b: float) -> float:
+        return calculation_class(a, b).exec()
+    return function
+
+
+def dispatch_table() -> Dict[int, Callable[[float, float], float]]:
+    table = {}
+    for calculation_type in CalculationFactory.calculation_types():
+        calculation_class = CalculationFactory.get_calculation(calculation_type)
+        function = calculation_class.function
+        table[calculation_class.opcode] = function if function is not None else _through_instance(calculation_class)
+    return table
+
+
+class Engine:
+    # Evaluates (opcode, a, b) rows by calling the plain function for each opcode straight from a table
+    # built once, with no parsing, class lookup, validation or Calculation instance per row. Failures
+    # are rare, so they are only explained after the fact: a row that raises is checked against its
+    # class's validate() to report the same status and message as app.batch would.
+
+    def __init__(self) -> None:
+        self.functions: Dict[int, Callable[[float, float], float]] = dispatch_table()
+        self.types: Dict[int, str] = {opcode: CalculationFactory.type_for_opcode(opcode) for opcode in self.functions}
+
+    def _fail(self, batch: BatchResult, opcode: int, a: float, b: float, error: Exception) -> None:
+        message = CalculationFactory.get_calculation(self.types[opcode]).validate(a, b)
+        if message is not None:
+            batch._append(_NAN, INVALID_OPERANDS, message)
+        else:
+            batch._append(_NAN, CALCULATION_ERROR, str(error))
+
+    def run_rows(self, rows: Iterable[Tuple[int, float, float]], history: Optional[History] = None,
+                 precision: str = 'float64') -> BatchResult:
+        batch = BatchResult(precision)
+        functions = self.functions
+        results, status, errors = batch.results, batch.status, batch.errors
+        for opcode, a, b in rows:
+            try:
+                function = functions[opcode]
+            except (KeyError, TypeError):
+                batch._append(_NAN, UNSUPPORTED_OPERATION, f"Unknown opcode: {opcode}.")
+                continue
+            try:
+                result = function(a, b)
+                results.append(result if type(result) is float else column_value(result))
+            except Exception as e:  # Includes results the float column cannot hold.
+                self._fail(batch, opcode, a, b, e)
+                continue
+            status.append(OK)
+            errors.append(None)
+            if history is not None:
+                # Only recording needs a Calculation; interning shares it with repeats of the same row.
+                history.append(CalculationFactory.create_calculation(self.types[opcode], a, b, intern=True), result)
+        return batch
+
+    def run_columns(self, opcodes: Sequence[int], a_values: Sequence[float], b_values: Sequence[float],
+                    history: Optional[History] = None, precision: str = 'float64') -> BatchResult:
+        if not len(opcodes) == len(a_values) == len(b_values):
+            raise ValueError("Columns must have the same length.")
+        return self.run_rows(zip(opcodes, a_values, b_values), history, precision)
@@ -0,0 +1,208 @@
+import csv
+import json
+import math
+import os
+import struct
+import sys
+from array import array
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from app.calculation import Calculation, CalculationFactory
+from app.history import History
+from app.integers import Mod
+from app.precision import typecode
+from app.units import Quantity
+
+FORMATS = ('binary', 'csv', 'ndjson')
+
+_MAGIC = b'CALCCOLS'
+# The version says how wide the operand and result columns are: 1 for float64, 2 for float32.
+_VERSIONS = {'d': 1, 'f': 2}
+_TYPECODES = {version: code for code, version in _VERSIONS.items()}
+# magic, version, number of operation names, size of the names block, number of rows
+_HEADER = struct.Struct('<8sHHIQ')
+_SWAP = sys.byteorder != 'little'
+
+
+def _real(value: object) -> float:
+    # Exact integers beyond the float range are written as infinity, like an out of range float literal.
+    try:
+        return float(value)
+    except OverflowError:
+        return math.inf if value > 0 else -math.inf
+
+
+def _padding(size: int) -> bytes:
+    return b'\0' * (-size % 8)
+
+
+class Columns:
+
+    def __init__(self, names: List[str], opcodes: Optional[array] = None, a: Optional[array] = None,
+                 b: Optional[array] = None, results: Optional[array] = None, precision: str = 'float64') -> None:
+        code = typecode(precision)
+        self.names: List[str] = names
+        self.opcodes: array = opcodes if opcodes is not None else array('B')
+        self.a: array = a if a is not None else array(code)
+        self.b: array = b if b is not None else array(code)
+        self.results: array = results if results is not None else array(code)
+
+    @classmethod
+    def from_history(cls, history: Union[History, Iterable[Calculation]], precision: str = 'float64') -> "Columns":
+        # A History gives the results its entries were recorded with; plain calculations are run.
+        columns = cls(CalculationFactory.calculation_types(), precision=precision)
+        opcodes, a, b, results = columns.opcodes, columns.a, columns.b, columns.results
+        items = history.items() if isinstance(history, History) else \
+            ((calculation, calculation.exec()) for calculation in history)
+        for calculation, result in items:
+            values = (calculation.a, calculation.b, result)
+            if any(type(value) is Mod for value in values):
+                # The columns have no room for a modulus; writing the residue alone would change the meaning.
+                raise ValueError(f"Cannot export modular calculations such as '{calculation}': "
+                                 f"the export formats have no modulus column.")
+            if any(type(value) is Quantity for value in values):
+                # Nor for a unit; the SI value alone would silently change the scale (km written as m).
+                raise ValueError(f"Cannot export calculations with units such as '{calculation}': "
+                                 f"the export formats have no unit column.")
+            opcodes.append(calculation.opcode)
+            a.append(_real(calculation.a))
+            b.append(_real(calculation.b))
+            results.append(_real(result))
+        return columns
+
+    def rows(self) -> Iterator[Tuple[str, float, float, float]]:
+        names = self.names
+        for opcode, a, b, result in zip(self.opcodes, self.a, self.b, self.results):
+            yield names[opcode], a, b, result
+
+    def __len__(self) -> int:
+        return len(self.opcodes)
+
+
+def write_binary(columns: Columns, path: str) -> None:
+    names = '\n'.join(columns.names).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, _VERSIONS[columns.results.typecode], len(columns.names), len(names),
+                             len(columns)))
+        f.write(names + _padding(len(names)))
+        for column in (columns.opcodes, columns.a, columns.b, columns.results):
+            if _SWAP:  # pragma: no cover
+                column = array(column.typecode, column)
+                column.byteswap()
+            f.write(memoryview(column).cast('B'))
+            f.write(_padding(len(column) * column.itemsize))
+
+
+def read_binary(path: str) -> Columns:
+    with open(path, 'rb') as f:
+        data = memoryview(f.read())
+
+    if len(data) < _HEADER.size:
+        raise ValueError(f"'{path}' is not a calculator export.")
+    magic, version, name_count, names_size, rows = _HEADER.unpack_from(data)
+    if magic != _MAGIC:
+        raise ValueError(f"'{path}' is not a calculator export.")
+    if version not in _TYPECODES:
+        raise ValueError(f"Unsupported export version: {version}.")
+    code = _TYPECODES[version]
+    width = array(code).itemsize
+
+    offset = _HEADER.size
+    names = bytes(data[offset:offset + names_size]).decode('utf-8').split('\n') if name_count else []
+    offset += names_size + len(_padding(names_size))
+    size = width * rows
+    expected = offset + rows + len(_padding(rows)) + 3 * (size + len(_padding(size)))
+    if len(names) != name_count or len(data) < expected:
+        raise ValueError(f"'{path}' is truncated or corrupt.")
+
+    opcodes = array('B')
+    opcodes.frombytes(data[offset:offset + rows])
+    offset += rows + len(_padding(rows))
+    columns = []
+    for _ in range(3):
+        column = array(code)
+        column.frombytes(data[offset:offset + size])
+        if _SWAP:  # pragma: no cover
+            column.byteswap()
+        columns.append(column)
+        offset += size + len(_padding(size))
+    return Columns(names, opcodes, *columns)
+
+
+def write_csv(columns: Columns, path: str) -> None:
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(('operation', 'a', 'b', 'result'))
+        writer.writerows(columns.rows())
+
+
+def write_ndjson(columns: Columns, path: str) -> None:
+    with open(path, 'w') as f:
+        f.writelines(json.dumps({'operation': operation, 'a': a, 'b': b, 'result': result}) + '\n'
+                     for operation, a, b, result in columns.rows())
+
+
+def _columns_from_rows(rows: Iterable[Tuple[str, float, float, float]]) -> Columns:
+    columns = Columns([])
+    opcodes: dict = {}
+    for operation, a, b, result in rows:
+        if operation not in opcodes:
+            opcodes[operation] = len(columns.names)
+            columns.names.append(operation)
+        columns.opcodes.append(opcodes[operation])
+        columns.a.append(float(a))
+        columns.b.append(float(b))
+        columns.results.append(float(result))
+    return columns
+
+
+def read_csv(path: str) -> Columns:
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        if next(reader, None) != ['operation', 'a', 'b', 'result']:
+            raise ValueError(f"'{path}' is not a calculator CSV export.")
+        return _columns_from_rows(reader)
+
+
+def read_ndjson(path: str) -> Columns:
+    with open(path) as f:
+        rows = (json.loads(line) for line in f if line.strip())
+        return _columns_from_rows((row['operation'], row['a'], row['b'], row['result']) for row in rows)
+
+
+def format_for_path(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return 'csv'
+    if extension in ('.ndjson', '.jsonl'):
+        return 'ndjson'
+    return 'binary'
+
+
+def _resolve_format(path: str, format: Optional[str]) -> str:
+    format = format or format_for_path(path)
+    if format not in FORMATS:
+        raise ValueError(f"Unsupported export format: '{format}'. Available formats: {', '.join(FORMATS)}")
+    return format
+
+
+def export_history(history: Union[History, Iterable[Calculation]], path: str, format: Optional[str] = None,
+                   precision: str = 'float64') -> int:
+    format = _resolve_format(path, format)
+    columns = Columns.from_history(history, precision)
+    if format == 'binary':
+        write_binary(columns, path)
+    elif format == 'csv':
+        write_csv(columns, path)
+    else:
+        write_ndjson(columns, path)
+    return len(columns)
+
+
+def read_export(path: str, format: Optional[str] = None) -> Columns:
+    format = _resolve_format(path, format)
+    if format == 'binary':
+        return read_binary(path)
+    if format == 'csv':
+        return read_csv(path)
+    return read_ndjson(path)
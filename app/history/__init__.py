@@ -0,0 +1,188 @@
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from app.calculation import Calculation
+from app.stats import ResultStats
+
+
+class Node:
+    # Immutable cons cell; a history state is just a pointer to its newest node, so
+    # snapshots, undo and redo share every older node instead of copying them. The result is the one
+    # the entry was appended with, if any.
+    __slots__ = ('calculation', 'previous', 'length', 'result')
+
+    def __init__(self, calculation: Calculation, previous: Optional["HistoryNode"],
+                 result: Optional[object] = None) -> None:
+        self.calculation: Calculation = calculation
+        self.previous: Optional[HistoryNode] = previous
+        self.length: int = previous.length + 1 if previous is not None else 1
+        self.result: Optional[object] = result
+
+
+class LazyNode:
+    # Stands in for the chain of nodes over the first `length` entries of a sequence of calculations, so a
+    # restored history builds no node or calculation per entry; the ones that are read are built then.
+    __slots__ = ('entries', 'length')
+
+    def __init__(self, entries: Sequence[Calculation], length: int) -> None:
+        self.entries: Sequence[Calculation] = entries
+        self.length: int = length
+
+    @property
+    def calculation(self) -> Calculation:
+        return self.entries[self.length - 1]
+
+    @property
+    def previous(self) -> Optional["LazyNode"]:
+        return LazyNode(self.entries, self.length - 1) if self.length > 1 else None
+
+    @property
+    def result(self) -> None:
+        # Restored entries keep no result; readers run the calculation.
+        return None
+
+
+HistoryNode = Union[Node, LazyNode]
+
+
+def _newest(node: Optional[HistoryNode], keep: int) -> Optional[HistoryNode]:
+    # The chain of the newest `keep` entries from node; rebuilt only when it is longer than that.
+    if node is None or node.length <= keep:
+        return node
+    nodes = []
+    while len(nodes) < keep:
+        nodes.append(node)
+        node = node.previous
+    head = None
+    for node in reversed(nodes):
+        head = Node(node.calculation, head, node.result)
+    return head
+
+
+class HistoryState(NamedTuple):
+    # The newest node of the current history, of the undone entries (newest undone first) and of each
+    # snapshot; None for an empty one.
+    head: Optional[HistoryNode]
+    redo: Optional[HistoryNode]
+    snapshots: Dict[str, Optional[HistoryNode]]
+
+
+class History:
+
+    def __init__(self, max_entries: Optional[int] = None) -> None:
+        self.max_entries: Optional[int] = None
+        self.evictions: int = 0
+        self._head: Optional[HistoryNode] = None
+        # Entries at or below this position of the current chain are evicted but not yet cut off: trimming
+        # rebuilds the kept nodes, so the chain is only cut once a tenth of it is evicted, keeping appends
+        # amortized O(1) while the history itself holds exactly max_entries.
+        self._floor: int = 0
+        self._redo: Optional[HistoryNode] = None
+        self._snapshots: Dict[str, Optional[HistoryNode]] = {}
+        # Summarizes every result appended with its value, including ones later undone or trimmed.
+        self.stats: ResultStats = ResultStats()
+        self.set_limit(max_entries)
+
+    def set_limit(self, max_entries: Optional[int]) -> None:
+        if max_entries is not None and max_entries < 1:
+            raise ValueError("History limit must be positive.")
+        self.max_entries = max_entries
+        if max_entries is not None:
+            self.trim(max_entries)
+            # Undone entries and snapshots are held to the same limit, each on its own: a snapshot stops
+            # sharing nodes with the history once the history is trimmed past it.
+            self._redo = _newest(self._redo, max_entries)
+            self._snapshots = {name: _newest(node, max_entries) for name, node in self._snapshots.items()}
+
+    def append(self, calculation: Calculation, result: Optional[object] = None) -> None:
+        # Callers that already ran the calculation pass its result so the statistics see it without a re-run.
+        if result is not None:
+            self.stats.add(result)
+        self._head = Node(calculation, self._head, result)
+        self._redo = None
+        self._enforce_limit()
+
+    def _enforce_limit(self) -> None:
+        max_entries = self.max_entries
+        if max_entries is None or len(self) <= max_entries:
+            return
+        self.evictions += len(self) - max_entries
+        self._floor = self._head.length - max_entries
+        if self._floor > max_entries // 10:
+            self._head = _newest(self._head, max_entries)
+            self._floor = 0
+
+    def _visible(self, node: Optional[HistoryNode]) -> Optional[HistoryNode]:
+        # A chain of the current entries only, for state that outlives the floor.
+        return _newest(node, len(self)) if self._floor else node
+
+    def trim(self, keep: int) -> int:
+        dropped = max(0, len(self) - keep)
+        if dropped:
+            self._head = _newest(self._head, keep)
+            self._floor = 0
+            self.evictions += dropped
+        return dropped
+
+    def undo(self) -> Optional[Calculation]:
+        head = self._head
+        if not len(self):
+            return None
+        self._head = head.previous
+        self._redo = Node(head.calculation, self._redo, head.result)
+        return head.calculation
+
+    def redo(self) -> Optional[Calculation]:
+        redo = self._redo
+        if redo is None:
+            return None
+        self._redo = redo.previous
+        self._head = Node(redo.calculation, self._head, redo.result)
+        self._enforce_limit()
+        return redo.calculation
+
+    def snapshot(self, name: str) -> None:
+        self._snapshots[name] = self._visible(self._head)
+
+    def restore(self, name: str) -> None:
+        if name not in self._snapshots:
+            raise ValueError(f"No snapshot named '{name}'.")
+        self._head = self._snapshots[name]
+        self._floor = 0
+        self._redo = None
+
+    def snapshots(self) -> List[str]:
+        return list(self._snapshots)
+
+    def state(self) -> HistoryState:
+        return HistoryState(self._visible(self._head), self._redo, dict(self._snapshots))
+
+    def restore_state(self, state: HistoryState) -> None:
+        # Replaces the entries, undone entries and snapshots; limits, evictions and statistics are kept.
+        self._head = state.head
+        self._floor = 0
+        self._redo = state.redo
+        self._snapshots = dict(state.snapshots)
+
+    def last(self) -> Optional[Calculation]:
+        return self._head.calculation if len(self) else None
+
+    def __len__(self) -> int:
+        return max(0, self._head.length - self._floor) if self._head is not None else 0
+
+    def __iter__(self) -> Iterator[Calculation]:
+        calculations = []
+        node = self._head
+        for _ in range(len(self)):
+            calculations.append(node.calculation)
+            node = node.previous
+        return reversed(calculations)
+
+    def items(self) -> Iterator[Tuple[Calculation, object]]:
+        # Oldest first, with the result each entry was appended with; entries without one are run.
+        nodes = []
+        node = self._head
+        for _ in range(len(self)):
+            nodes.append(node)
+            node = node.previous
+        for node in reversed(nodes):
+            yield node.calculation, node.result if node.result is not None else node.calculation.exec()
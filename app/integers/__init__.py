@@ -0,0 +1,291 @@
+import math
+import threading
+from typing import List, Optional, Union
+
+# Results are refused before they are computed once they would exceed this many bits (about 1.26 million
+# digits), so a typo such as "9 ** 99999999" fails at once instead of hanging the REPL.
+MAX_RESULT_BITS = 1 << 22
+# Integers up to this size are shown in full; larger ones as leading and trailing digits plus a digit count.
+ABBREVIATE_BITS = 3000
+SHOWN_DIGITS = 20
+# n! is kept for every n below this, so small factorials and binomials are lookups and divisions.
+FACTORIAL_TABLE_SIZE = 1024
+
+# Floats stop just short of 2 ** 1024.
+FLOAT_BITS = 1024
+
+_LOG2_10 = math.log2(10)
+_LN2 = math.log(2)
+# Counts up to here are safe to use as floats in size estimates; lgamma() of them does not overflow.
+_HUGE = 1 << 512
+
+Integral = Union[int, float]
+
+
+def as_integer(value: object, operation: str) -> int:
+    # Integral floats are accepted so the integer operations also work outside integer mode.
+    if type(value) is int:
+        return value
+    if type(value) is float and value.is_integer():
+        return int(value)
+    raise ValueError(f"'{operation}' needs integer operands, got {value}.")
+
+
+def _integer_error(value: object, operation: str) -> Optional[str]:
+    # The message as_integer() raises, without raising it.
+    if type(value) is int or type(value) is float and value.is_integer():
+        return None
+    return f"'{operation}' needs integer operands, got {value}."
+
+
+def _float_error(bits: float, operands: tuple) -> Optional[str]:
+    # The message _exact() raises for a float result of about this many bits.
+    if bits < FLOAT_BITS or all(type(operand) is int for operand in operands):
+        return None
+    return "Result is too large for a float; switch to 'mode int' for exact results."
+
+
+def _binomial_bits(total: int, chosen: int) -> float:
+    # log2 of total choose chosen, for 0 <= chosen <= total. lgamma() overflows for totals past about
+    # 1e305; there every factor (total - i) / (i + 1) of the smaller side is total / (i + 1) to float
+    # precision, and a smaller side past _HUGE alone means more than that many bits.
+    smaller = min(chosen, total - chosen)
+    if total <= _HUGE:
+        return (math.lgamma(total + 1) - math.lgamma(smaller + 1) - math.lgamma(total - smaller + 1)) / _LN2
+    if smaller > _HUGE:
+        return math.inf
+    return smaller * math.log2(total) - math.lgamma(smaller + 1) / _LN2
+
+
+def _check_bits(bits: float) -> None:
+    if bits == math.inf:
+        raise ValueError(f"Result would have far too many digits; the limit is {MAX_RESULT_BITS / _LOG2_10:,.0f}.")
+    if bits > MAX_RESULT_BITS:
+        raise ValueError(f"Result would have about {bits / _LOG2_10:,.0f} digits; "
+                         f"the limit is {MAX_RESULT_BITS / _LOG2_10:,.0f}.")
+
+
+def _exact(result: int, operands: tuple) -> Integral:
+    # Exact when every operand was an int; integral floats (float mode) get a float back.
+    if all(type(operand) is int for operand in operands):
+        return result
+    try:
+        return float(result)
+    except OverflowError:
+        raise ValueError("Result is too large for a float; switch to 'mode int' for exact results.") from None
+
+
+def power(base: object, exponent: object) -> object:
+    if type(base) is Mod:
+        return base ** as_integer(exponent, '**')
+    if type(base) not in (int, float) or type(exponent) not in (int, float):
+        raise ValueError(f"Cannot raise {base} to the power {exponent}.")
+    if type(base) is int and type(exponent) is int and exponent >= 0:
+        if abs(base) > 1:
+            _check_bits(exponent * math.log2(abs(base)))
+        # int.__pow__ is left-to-right square-and-multiply (windowed for long exponents) in C.
+        return base ** exponent
+    try:
+        return math.pow(base, exponent)
+    except ValueError:
+        if base == 0:
+            raise ZeroDivisionError("Division by zero not allowed.") from None
+        raise ValueError(f"{base} ** {exponent} is not a real number.") from None
+    except OverflowError:
+        raise ValueError(f"{base} ** {exponent} is too large for a float; "
+                         f"switch to 'mode int' for exact results.") from None
+
+
+def power_error(base: object, exponent: object) -> Optional[str]:
+    # What power() raises for real operands, predicted without computing the power. Exact integer powers
+    # and moduli are left to power(), which refuses oversized results before computing them.
+    if type(base) not in (int, float) or type(exponent) not in (int, float) \
+            or type(base) is int and type(exponent) is int and exponent >= 0:
+        return None
+    if not (math.isfinite(base) and math.isfinite(exponent)):
+        return None
+    if base == 0 and exponent < 0:
+        return "Division by zero not allowed."
+    if base < 0 and not float(exponent).is_integer():
+        return f"{base} ** {exponent} is not a real number."
+    if base != 0 and exponent * math.log2(abs(base)) >= FLOAT_BITS:
+        return f"{base} ** {exponent} is too large for a float; switch to 'mode int' for exact results."
+    return None
+
+
+def factorial_error(n: object, step: object = 1) -> Optional[str]:
+    error = _integer_error(n, '!') or _integer_error(step, '!')
+    if error is not None:
+        return error
+    value, stride = int(n), int(step)
+    if value < 0 or stride < 1:
+        return "Factorials need a non-negative number and a positive step."
+    # Every term but the last is at least 2, so more terms than FLOAT_BITS can only overflow a float. The
+    # count is arithmetic: len(range(...)) fails past 2 ** 63.
+    terms = -(-value // stride)
+    bits = FLOAT_BITS if terms > FLOAT_BITS + 1 else sum(math.log2(term) for term in range(value, 0, -stride))
+    return _float_error(bits, (n, step))
+
+
+def binomial_error(n: object, k: object) -> Optional[str]:
+    error = _integer_error(n, 'choose') or _integer_error(k, 'choose')
+    if error is not None:
+        return error
+    total, chosen = int(n), int(k)
+    if total < 0:
+        return "Binomial coefficients need a non-negative number of items."
+    if not 0 <= chosen <= total:
+        return None
+    return _float_error(_binomial_bits(total, chosen), (n, k))
+
+
+def gcd_error(a: object, b: object) -> Optional[str]:
+    return _integer_error(a, 'gcd') or _integer_error(b, 'gcd')
+
+
+_FACTORIALS: List[int] = [1]
+# Threads (the HTTP server, parallel evaluation) extend the table together; reads of filled slots need no lock.
+_FACTORIALS_LOCK = threading.Lock()
+
+
+def _product(start: int, stop: int, step: int) -> int:
+    # Product of range(start, stop, step) by binary splitting, so the big multiplications have balanced sizes.
+    count = len(range(start, stop, step))
+    if count < 16:
+        result = 1
+        for value in range(start, stop, step):
+            result *= value
+        return result
+    middle = start + (count // 2) * step
+    return _product(start, middle, step) * _product(middle, stop, step)
+
+
+def factorial(n: Integral, step: Integral = 1) -> Integral:
+    # n!, or the multifactorial n(n - step)(n - 2 step)... when step is above 1 (n!! for step 2).
+    value, stride = as_integer(n, '!'), as_integer(step, '!')
+    if value < 0 or stride < 1:
+        raise ValueError("Factorials need a non-negative number and a positive step.")
+    if stride == 1:
+        if value < FACTORIAL_TABLE_SIZE:
+            table = _FACTORIALS
+            if len(table) <= value:
+                with _FACTORIALS_LOCK:
+                    while len(table) <= value:
+                        table.append(table[-1] * len(table))
+            return _exact(table[value], (n, step))
+        _check_bits(math.lgamma(value + 1) / _LN2 if value <= _HUGE else math.inf)
+        return _exact(math.factorial(value), (n, step))
+    terms = -(-value // stride)
+    _check_bits(terms * math.log2(max(value, 1)) if terms <= _HUGE else math.inf)
+    return _exact(_product(value, 0, -stride), (n, step))
+
+
+def binomial(n: Integral, k: Integral) -> Integral:
+    total, chosen = as_integer(n, 'choose'), as_integer(k, 'choose')
+    if total < 0:
+        raise ValueError("Binomial coefficients need a non-negative number of items.")
+    if not 0 <= chosen <= total:
+        return _exact(0, (n, k))
+    if total < FACTORIAL_TABLE_SIZE:
+        factorial(total)
+        table = _FACTORIALS
+        return _exact(table[total] // (table[chosen] * table[total - chosen]), (n, k))
+    _check_bits(_binomial_bits(total, chosen))
+    return _exact(math.comb(total, chosen), (n, k))
+
+
+def gcd(a: Integral, b: Integral) -> Integral:
+    return _exact(math.gcd(as_integer(a, 'gcd'), as_integer(b, 'gcd')), (a, b))
+
+
+class Mod:
+    # An integer modulo a positive modulus. "3 ** 1000 mod 7" parses its first operand as Mod(3, 7), so
+    # the power is a modular exponentiation and intermediate results never grow past the modulus.
+
+    __slots__ = ('value', 'modulus')
+
+    def __init__(self, value: int, modulus: int) -> None:
+        if modulus < 1:
+            raise ValueError("The modulus must be a positive integer.")
+        self.value: int = value % modulus
+        self.modulus: int = modulus
+
+    def _operand(self, other: object, operation: str) -> int:
+        if type(other) is Mod:
+            if other.modulus != self.modulus:
+                raise ValueError(f"Cannot {operation} integers modulo {self.modulus} and {other.modulus}.")
+            return other.value
+        return as_integer(other, operation)
+
+    def __add__(self, other: object) -> "Mod":
+        return Mod(self.value + self._operand(other, 'add'), self.modulus)
+
+    __radd__ = __add__
+
+    def __sub__(self, other: object) -> "Mod":
+        return Mod(self.value - self._operand(other, 'subtract'), self.modulus)
+
+    def __rsub__(self, other: object) -> "Mod":
+        return Mod(self._operand(other, 'subtract') - self.value, self.modulus)
+
+    def __mul__(self, other: object) -> "Mod":
+        return Mod(self.value * self._operand(other, 'multiply'), self.modulus)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other: object) -> "Mod":
+        divisor = self._operand(other, 'divide')
+        try:
+            inverse = pow(divisor, -1, self.modulus)
+        except ValueError:
+            raise ValueError(f"{divisor} has no inverse modulo {self.modulus}.") from None
+        return Mod(self.value * inverse, self.modulus)
+
+    def __pow__(self, exponent: int) -> "Mod":
+        try:
+            return Mod(pow(self.value, exponent, self.modulus), self.modulus)
+        except ValueError:
+            raise ValueError(f"{self.value} has no inverse modulo {self.modulus}.") from None
+
+    def __int__(self) -> int:
+        return self.value
+
+    def __float__(self) -> float:
+        return float(self.value)
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is Mod:
+            return (self.value, self.modulus) == (other.value, other.modulus)
+        # Lets division checks such as "b == 0" see a zero residue.
+        return type(other) in (int, float) and self.value == other
+
+    def __hash__(self) -> int:
+        return hash((self.value, self.modulus))
+
+    def __str__(self) -> str:
+        return f"{format_value(self.value)} (mod {format_value(self.modulus)})"
+
+    def __repr__(self) -> str:
+        return f"Mod({self.value!r}, {self.modulus!r})"
+
+
+def format_value(value: object) -> str:
+    # Converting an int to decimal is quadratic in its length, so huge results are shown by their first and
+    # last digits and exact length, which only needs one power of ten and a division.
+    if type(value) is not int or value.bit_length() <= ABBREVIATE_BITS:
+        return str(value)
+    sign, magnitude = ('-', -value) if value < 0 else ('', value)
+    bits = magnitude.bit_length()
+    top = magnitude >> (bits - 64)
+    digits = int(math.log10(top) + (bits - 64) / _LOG2_10) + 1
+    scale = pow(10, digits - SHOWN_DIGITS)
+    leading = magnitude // scale
+    # The estimate from the logarithm can be one off right at a power of ten.
+    if leading >= 10 ** SHOWN_DIGITS:
+        leading //= 10
+        digits += 1
+    elif leading < 10 ** (SHOWN_DIGITS - 1):
+        digits -= 1
+        leading = magnitude // (scale // 10)
+    trailing = str(magnitude % 10 ** SHOWN_DIGITS).zfill(SHOWN_DIGITS)
+    return f"{sign}{leading}...{trailing} ({digits:,} digits)"
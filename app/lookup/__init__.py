@@ -0,0 +1,150 @@
+import asyncio
+import http.client
+import json
+import queue
+from typing import Dict, Hashable, Iterable, List, Optional, Sequence
+from urllib.parse import urlencode, urlsplit
+
+from app.calculation import AsyncCalculation, Calculation
+
+
+class RateSource:
+    # Serves many keys per HTTP request ("GET /rates?keys=840,978" -> {"840": 1.0, "978": 0.92})
+    # over keep-alive connections that are reused between requests.
+
+    def __init__(self, name: str, url: str, pool_size: int = 4, max_batch: int = 200,
+                 timeout: float = 5.0) -> None:
+        parts = urlsplit(url)
+        if parts.scheme != 'http' or not parts.hostname:
+            raise ValueError(f"Rate source URL must be http://host[:port]/path, got '{url}'.")
+        self.name: str = name
+        self.url: str = url
+        self.pool_size: int = pool_size
+        self.max_batch: int = max_batch
+        self.timeout: float = timeout
+        self.requests: int = 0
+        self.connections: int = 0
+        self._host: str = parts.hostname
+        self._port: Optional[int] = parts.port
+        self._path: str = parts.path or '/'
+        self._idle: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue(maxsize=pool_size)
+
+    def _connection(self) -> http.client.HTTPConnection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            self.connections += 1
+            return http.client.HTTPConnection(self._host, self._port, timeout=self.timeout)
+
+    def _release(self, connection: http.client.HTTPConnection) -> None:
+        try:
+            self._idle.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+    def _request(self, connection: http.client.HTTPConnection, target: str) -> bytes:
+        connection.request('GET', target, headers={'Connection': 'keep-alive'})
+        response = connection.getresponse()
+        body = response.read()
+        if response.status != 200:
+            raise ValueError(f"Rate source '{self.name}' returned HTTP {response.status}.")
+        return body
+
+    def fetch(self, keys: Sequence[Hashable]) -> Dict[Hashable, float]:
+        target = f"{self._path}?{urlencode({'keys': ','.join(str(key) for key in keys)})}"
+        connection = self._connection()
+        try:
+            try:
+                body = self._request(connection, target)
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                # The server may close an idle keep-alive connection; one fresh attempt is safe for a GET.
+                connection.close()
+                self.connections += 1
+                body = self._request(connection, target)
+        except http.client.HTTPException as e:
+            # A malformed status line or a cut-off body is the source's fault, like a bad payload.
+            connection.close()
+            raise ValueError(f"Rate source '{self.name}' sent an invalid response: {e!r}.") from None
+        except BaseException:
+            connection.close()
+            raise
+        self.requests += 1
+        self._release(connection)
+
+        try:
+            values = json.loads(body)
+        except ValueError:
+            raise ValueError(f"Rate source '{self.name}' sent a body that is not JSON.") from None
+        if type(values) is not dict:
+            raise ValueError(f"Rate source '{self.name}' sent {type(values).__name__} instead of an object.")
+        rates = {}
+        for key in keys:
+            value = values.get(str(key))
+            if value is None:
+                continue
+            if type(value) not in (int, float):
+                raise ValueError(f"Rate source '{self.name}' sent a non-numeric value for {key}: {value!r}.")
+            rates[key] = float(value)
+        return rates
+
+    async def fetch_async(self, keys: Sequence[Hashable]) -> Dict[Hashable, float]:
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self.pool_size)
+
+        async def fetch_batch(batch: Sequence[Hashable]) -> Dict[Hashable, float]:
+            async with slots:
+                return await loop.run_in_executor(None, self.fetch, batch)
+
+        values: Dict[Hashable, float] = {}
+        batches = [keys[start:start + self.max_batch] for start in range(0, len(keys), self.max_batch)]
+        for result in await asyncio.gather(*(fetch_batch(batch) for batch in batches)):
+            values.update(result)
+        return values
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class LookupEngine:
+
+    def __init__(self) -> None:
+        self.sources: Dict[str, RateSource] = {}
+
+    def add_source(self, source: RateSource) -> None:
+        self.sources[source.name] = source
+
+    def get_source(self, name: str) -> RateSource:
+        source = self.sources.get(name)
+        if source is None:
+            raise ValueError(f"No rate source named '{name}' is configured.")
+        return source
+
+    async def resolve_async(self, calculations: Iterable[Calculation]) -> int:
+        # Pending lookups are grouped per source and deduplicated, so each source sees one
+        # request per batch of keys however many calculations share them.
+        pending: Dict[str, Dict[Hashable, List[AsyncCalculation]]] = {}
+        for calculation in calculations:
+            if isinstance(calculation, AsyncCalculation) and calculation.value is None:
+                keys = pending.setdefault(calculation.source, {})
+                keys.setdefault(calculation.lookup_key(), []).append(calculation)
+        sources = [self.get_source(name) for name in pending]
+
+        results = await asyncio.gather(*(source.fetch_async(list(pending[source.name])) for source in sources))
+        resolved = 0
+        for source, values in zip(sources, results):
+            for key, value in values.items():
+                for calculation in pending[source.name][key]:
+                    calculation.value = value
+                    resolved += 1
+        return resolved
+
+    def resolve(self, calculations: Iterable[Calculation]) -> int:
+        return asyncio.run(self.resolve_async(calculations))
+
+    def close(self) -> None:
+        for source in self.sources.values():
+            source.close()
@@ -0,0 +1,222 @@
+import heapq
+import itertools
+import sys
+from collections import OrderedDict
+from types import FunctionType, ModuleType
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, MutableMapping, Optional, Set, Tuple
+
+# Shared objects are not attributed to whoever happens to reference them.
+_SHARED_TYPES = (type, ModuleType, FunctionType)
+
+
+def sizeof(obj: Any) -> int:
+    seen: Set[int] = set()
+    stack = [obj]
+    total = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen or isinstance(item, _SHARED_TYPES):
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        else:
+            attributes = getattr(item, '__dict__', None)
+            if attributes is not None:
+                stack.append(attributes)
+            for cls in type(item).__mro__:
+                for slot in getattr(cls, '__slots__', ()):
+                    if slot not in ('__dict__', '__weakref__') and hasattr(item, slot):
+                        stack.append(getattr(item, slot))
+    return total
+
+
+def format_bytes(size: float) -> str:
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return ''  # pragma: no cover
+
+
+def parse_bytes(text: str) -> int:
+    text = text.strip().upper()
+    for unit, factor in (('GB', 1024 ** 3), ('MB', 1024 ** 2), ('KB', 1024), ('B', 1)):
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * factor)
+    raise ValueError(f"Not a byte size: '{text}'.")
+
+
+class EvictionPolicy:
+
+    name = ''
+
+    def inserted(self, key: Hashable, size: int) -> None:
+        raise NotImplementedError  # pragma: no cover
+
+    def accessed(self, key: Hashable) -> None:
+        pass
+
+    def removed(self, key: Hashable) -> None:
+        raise NotImplementedError  # pragma: no cover
+
+    def victim(self) -> Hashable:
+        raise NotImplementedError  # pragma: no cover
+
+    def order(self) -> Iterable[Hashable]:
+        raise NotImplementedError  # pragma: no cover
+
+
+class FIFOPolicy(EvictionPolicy):
+
+    name = 'fifo'
+
+    def __init__(self) -> None:
+        self._order: "OrderedDict[Hashable, None]" = OrderedDict()
+
+    def inserted(self, key: Hashable, size: int) -> None:
+        self._order[key] = None
+
+    def removed(self, key: Hashable) -> None:
+        del self._order[key]
+
+    def victim(self) -> Hashable:
+        return next(iter(self._order))
+
+    def order(self) -> Iterable[Hashable]:
+        return iter(self._order)
+
+
+class LRUPolicy(FIFOPolicy):
+
+    name = 'lru'
+
+    def inserted(self, key: Hashable, size: int) -> None:
+        self._order[key] = None
+        self._order.move_to_end(key)
+
+    def accessed(self, key: Hashable) -> None:
+        self._order.move_to_end(key)
+
+
+class SizeWeightedPolicy(EvictionPolicy):
+    # Evicts the entry holding the most bytes per access, so one huge, rarely used
+    # value goes before many small hot ones.
+
+    name = 'size'
+
+    def __init__(self) -> None:
+        self._entries: Dict[Hashable, List[int]] = {}
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._counter = itertools.count()
+
+    def _push(self, key: Hashable) -> None:
+        size, hits, _ = self._entries[key]
+        version = next(self._counter)
+        self._entries[key][2] = version
+        heapq.heappush(self._heap, (-size / (hits + 1), version, key))
+        if len(self._heap) > 2 * len(self._entries) + 16:
+            self._heap = [(-size / (hits + 1), version, key) for key, (size, hits, version) in self._entries.items()]
+            heapq.heapify(self._heap)
+
+    def inserted(self, key: Hashable, size: int) -> None:
+        self._entries[key] = [size, 0, 0]
+        self._push(key)
+
+    def accessed(self, key: Hashable) -> None:
+        self._entries[key][1] += 1
+        self._push(key)
+
+    def removed(self, key: Hashable) -> None:
+        del self._entries[key]
+
+    def victim(self) -> Hashable:
+        heap = self._heap
+        while True:
+            _, version, key = heap[0]
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] == version:
+                return key
+            heapq.heappop(heap)
+
+    def order(self) -> Iterable[Hashable]:
+        return iter(self._entries)
+
+
+POLICIES = {policy.name: policy for policy in (FIFOPolicy, LRUPolicy, SizeWeightedPolicy)}
+
+
+def make_policy(name: str) -> EvictionPolicy:
+    policy = POLICIES.get(name.lower())
+    if policy is None:
+        raise ValueError(f"Unknown eviction policy: '{name}'. Available policies: {', '.join(POLICIES)}")
+    return policy()
+
+
+class BoundedStore(MutableMapping):
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None,
+                 policy: str = 'lru', sizer: Callable[[Any], int] = sizeof) -> None:
+        self.max_entries: Optional[int] = max_entries
+        self.max_bytes: Optional[int] = max_bytes
+        self.policy: EvictionPolicy = make_policy(policy)
+        self.nbytes: int = 0
+        self.evictions: int = 0
+        self._sizer = sizer
+        self._data: Dict[Hashable, Tuple[Any, int]] = {}
+
+    def _over_limit(self) -> bool:
+        return (self.max_entries is not None and len(self._data) > self.max_entries
+                or self.max_bytes is not None and self.nbytes > self.max_bytes)
+
+    def _evict(self) -> None:
+        while self._data and self._over_limit():
+            del self[self.policy.victim()]
+            self.evictions += 1
+
+    def configure(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None,
+                  policy: Optional[str] = None) -> None:
+        if policy is not None:
+            new_policy = make_policy(policy)
+            for key in self.policy.order():
+                new_policy.inserted(key, self._data[key][1])
+            self.policy = new_policy
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._evict()
+
+    def ordered_items(self) -> List[Tuple[Hashable, Any]]:
+        # Entries in eviction order, first victim first, without counting as accesses.
+        return [(key, self._data[key][0]) for key in self.policy.order()]
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value = self._data[key][0]
+        self.policy.accessed(key)
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        if key in self._data:
+            del self[key]
+        size = self._sizer(key) + self._sizer(value)
+        self._data[key] = (value, size)
+        self.nbytes += size
+        self.policy.inserted(key, size)
+        self._evict()
+
+    def __delitem__(self, key: Hashable) -> None:
+        _, size = self._data.pop(key)
+        self.nbytes -= size
+        self.policy.removed(key)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
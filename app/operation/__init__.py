@@ -1,3 +1,6 @@
+from app import integers
+
+
 class Operation:
     
     @staticmethod
@@ -16,4 +19,20 @@ class Operation:
     def div(a: float, b: float) -> float:
         if b == 0:
             raise ValueError("Division by zero not allowed.")
-        return a / b
\ No newline at end of file
+        return a / b
+
+    @staticmethod
+    def pow(a: float, b: float) -> float:
+        return integers.power(a, b)
+
+    @staticmethod
+    def factorial(a: float, step: float = 1) -> float:
+        return integers.factorial(a, step)
+
+    @staticmethod
+    def gcd(a: float, b: float) -> float:
+        return integers.gcd(a, b)
+
+    @staticmethod
+    def binomial(a: float, b: float) -> float:
+        return integers.binomial(a, b)
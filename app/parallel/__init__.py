@@ -0,0 +1,142 @@
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence, Set, Tuple, Type
+from weakref import WeakKeyDictionary
+
+from app.calculation import Calculation
+from app.prepared import Binary, Node, PreparedExpression, _compile
+from app.sharedcache import SharedResultCache
+
+# Operations cheaper than this run on the calling thread; a pool round trip would cost more than the work.
+# The arithmetic operators cost 1 and powers, factorials and binomials 10, so only the latter are dispatched.
+DISPATCH_COST = 10
+
+# slot, calculation class, left slot, right slot, run on the pool
+_Step = Tuple[int, Type[Calculation], int, int, bool]
+
+
+# Set in each worker of a process pool started with a shared cache.
+_worker_cache: Optional[SharedResultCache] = None
+
+
+def _install_cache(cache: SharedResultCache) -> None:
+    global _worker_cache
+    _worker_cache = cache
+
+
+def _apply(calculation_class: Type[Calculation], a: float, b: float) -> float:
+    if _worker_cache is not None:
+        return _worker_cache.get_or_compute(calculation_class, a, b)
+    return calculation_class(a, b).exec()
+
+
+class _Plan:
+    # Expensive nodes are grouped by height: every node on a level only depends on lower
+    # levels, so a level can run concurrently and waiting on it never blocks a pool worker.
+
+    def __init__(self, tree: Node, dispatch_cost: int) -> None:
+        self.dispatch_cost: int = dispatch_cost
+        self.inline: List[Tuple[int, Callable[[Sequence[float]], float]]] = []
+        self.levels: List[List[_Step]] = []
+        self.slots: int = 0
+        self._expensive: Set[int] = set()
+        self._mark(tree)
+        self.root, _ = self._plan(tree)
+
+    def _mark(self, node: Node) -> bool:
+        if not isinstance(node, Binary):
+            return False
+        left, right = self._mark(node.left), self._mark(node.right)
+        if left or right or node.calculation_class.cost >= self.dispatch_cost:
+            self._expensive.add(id(node))
+            return True
+        return False
+
+    def _plan(self, node: Node) -> Tuple[int, int]:
+        slot = self.slots
+        self.slots += 1
+        if id(node) not in self._expensive:
+            self.inline.append((slot, _compile(node)))
+            return slot, 0
+        left, left_height = self._plan(node.left)
+        right, right_height = self._plan(node.right)
+        height = max(left_height, right_height) + 1
+        if len(self.levels) < height:
+            self.levels.append([])
+        remote = node.calculation_class.cost >= self.dispatch_cost
+        self.levels[height - 1].append((slot, node.calculation_class, left, right, remote))
+        return slot, height
+
+
+class ParallelEvaluator:
+
+    def __init__(self, executor: Optional[Executor] = None, workers: Optional[int] = None,
+                 processes: bool = False, dispatch_cost: int = DISPATCH_COST,
+                 shared_cache: Optional[SharedResultCache] = None) -> None:
+        self.workers: Optional[int] = workers
+        self.processes: bool = processes
+        self.dispatch_cost: int = dispatch_cost
+        # Results of expensive nodes are looked up here first, by this process and by the workers of a
+        # process pool the evaluator starts, so a result computed once is reused everywhere.
+        self.shared_cache: Optional[SharedResultCache] = shared_cache
+        self.dispatched: int = 0
+        self._executor: Optional[Executor] = executor
+        self._owns_executor: bool = executor is None
+        self._plans: "WeakKeyDictionary[PreparedExpression, _Plan]" = WeakKeyDictionary()
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.processes and self.shared_cache is not None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_install_cache,
+                                                     initargs=(self.shared_cache,))
+            else:
+                pool = ProcessPoolExecutor if self.processes else ThreadPoolExecutor
+                self._executor = pool(max_workers=self.workers)
+        return self._executor
+
+    def _compute(self, calculation_class: Type[Calculation], a: float, b: float) -> float:
+        if self.shared_cache is not None:
+            return self.shared_cache.get_or_compute(calculation_class, a, b)
+        return calculation_class(a, b).exec()
+
+    def plan(self, prepared: PreparedExpression) -> _Plan:
+        plan = self._plans.get(prepared)
+        if plan is None or plan.dispatch_cost != self.dispatch_cost:
+            plan = self._plans[prepared] = _Plan(prepared.tree, self.dispatch_cost)
+        return plan
+
+    def evaluate(self, prepared: PreparedExpression, params: Sequence[float] = ()) -> float:
+        if len(params) != len(prepared.parameters):
+            raise ValueError(f"Expected {len(prepared.parameters)} parameters, got {len(params)}.")
+        plan = self.plan(prepared)
+        values = [0.0] * plan.slots
+        for slot, program in plan.inline:
+            values[slot] = program(params)
+
+        for level in plan.levels:
+            # A lone expensive node has nothing to overlap with, so it is not worth a round trip.
+            remote = sum(step[4] for step in level) > 1
+            # Threads share this process's cache directly; process workers use the copy they attached to.
+            apply = _apply if self.processes or self.shared_cache is None else self._compute
+            futures: List[Tuple[int, Future]] = []
+            for slot, calculation_class, left, right, expensive in level:
+                if remote and expensive:
+                    futures.append((slot, self.executor.submit(apply, calculation_class, values[left], values[right])))
+            self.dispatched += len(futures)
+            for slot, calculation_class, left, right, expensive in level:
+                if not (remote and expensive):
+                    values[slot] = self._compute(calculation_class, values[left], values[right])
+            for slot, future in futures:
+                values[slot] = future.result()
+        return values[plan.root]
+
+    def close(self) -> None:
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> "ParallelEvaluator":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
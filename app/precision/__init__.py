@@ -0,0 +1,113 @@
+import math
+from array import array
+from typing import Dict, Iterable, List, Sequence
+
+from app.calculation import CalculationFactory
+
+# Storage precisions for operand and result columns, by name, with their array typecodes.
+PRECISIONS: Dict[str, str] = {'float64': 'd', 'float32': 'f'}
+# Smallest positive normal float32; anything closer to zero keeps fewer significant bits.
+FLOAT32_TINY = 2.0 ** -126
+FLOAT32_EPSILON = 2.0 ** -23
+
+
+def typecode(precision: str) -> str:
+    try:
+        return PRECISIONS[precision]
+    except KeyError:
+        raise ValueError(f"Unsupported precision: '{precision}'. Available precisions: "
+                         f"{', '.join(PRECISIONS)}") from None
+
+
+def to_float32(values: Iterable[float]) -> array:
+    # Rounds to the nearest float32; finite values beyond its range become infinities, as in IEEE 754.
+    column = array('f')
+    for value in values:
+        try:
+            column.append(value)
+        except OverflowError:  # Exact integers too large even for a float64.
+            column.append(math.inf if value > 0 else -math.inf)
+    return column
+
+
+class _Errors:
+
+    def __init__(self) -> None:
+        self.rows: int = 0
+        self.compared: int = 0
+        self.exact: int = 0
+        self.max_relative: float = 0.0
+        self.sum_relative: float = 0.0
+        self.overflows: int = 0
+        self.underflows: int = 0
+
+    def add(self, full: float, reduced: float) -> None:
+        self.rows += 1
+        if math.isinf(reduced) and not math.isinf(full):
+            self.overflows += 1
+            return
+        if full != 0 and abs(reduced) < FLOAT32_TINY:
+            self.underflows += 1
+            return
+        if not math.isfinite(full) or full == 0:
+            return
+        relative = abs(reduced - full) / abs(full)
+        self.compared += 1
+        self.exact += relative == 0
+        self.sum_relative += relative
+        if relative > self.max_relative:
+            self.max_relative = relative
+
+    @property
+    def mean_relative(self) -> float:
+        return self.sum_relative / self.compared if self.compared else 0.0
+
+
+class PrecisionReport:
+    # Per operation: how far results from float32 operands stored as float32 are from the float64 ones.
+
+    def __init__(self, names: Sequence[str]) -> None:
+        self.names: Sequence[str] = names
+        self.operations: Dict[str, _Errors] = {}
+
+    def add(self, opcode: int, full: float, reduced: float) -> None:
+        name = self.names[opcode]
+        if name not in self.operations:
+            self.operations[name] = _Errors()
+        self.operations[name].add(full, reduced)
+
+    def rows(self) -> List[tuple]:
+        rows = []
+        for name in self.names:
+            errors = self.operations.get(name)
+            if errors is not None:
+                rows.append((name, errors.rows, errors.exact / errors.compared if errors.compared else 1.0,
+                             errors.mean_relative, errors.max_relative, errors.overflows, errors.underflows))
+        return rows
+
+    def __str__(self) -> str:
+        lines = [f"{'operation':<10} {'rows':>9} {'exact':>7} {'mean rel':>9} {'max rel':>9} "
+                 f"{'overflow':>8} {'underflow':>9}"]
+        for name, rows, exact, mean, largest, overflows, underflows in self.rows():
+            lines.append(f"{name:<10} {rows:>9,} {exact:>7.1%} {mean:>9.2e} {largest:>9.2e} "
+                         f"{overflows:>8,} {underflows:>9,}")
+        lines.append(f"float32 storage: {4 + 4 + 4 + 1} bytes per row instead of {8 + 8 + 8 + 1}; "
+                     f"one rounding is at most {FLOAT32_EPSILON / 2:.2e} relative.")
+        return '\n'.join(lines)
+
+
+def precision_report(opcodes: Sequence[int], a_values: Sequence[float], b_values: Sequence[float]) -> PrecisionReport:
+    # Evaluates the rows twice: as given in float64, and from float32 operands into a float32 result column.
+    # Only rows that succeed both ways are compared.
+    from app.batch import OK
+    from app.engine import Engine  # Both import this module, through app.batch, for typecode().
+
+    engine = Engine()
+    full = engine.run_columns(opcodes, a_values, b_values)
+    reduced = engine.run_columns(opcodes, to_float32(a_values), to_float32(b_values), precision='float32')
+    report = PrecisionReport(CalculationFactory.calculation_types())
+    for opcode, full_status, reduced_status, full_result, reduced_result in zip(
+            opcodes, full.status, reduced.status, full.results, reduced.results):
+        if full_status == reduced_status == OK:
+            report.add(opcode, full_result, reduced_result)
+    return report
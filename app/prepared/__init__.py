@@ -0,0 +1,172 @@
+from typing import Callable, Dict, List, Sequence, Tuple, Type, Union
+
+from app.calculation import Calculation, CalculationFactory
+from app.tokenizer import Token, is_number, to_integer, to_number, tokenize
+
+_PRECEDENCE = {'+': 1, '-': 1, '*': 2, '/': 2, 'gcd': 2, 'choose': 2, '**': 3}
+# As in Python, 2 ** 3 ** 2 is 2 ** 9. A leading minus belongs to its operand, as it does to a literal:
+# -x ** 2 is (-x) ** 2 and -x ! is (-x) !, like -2 ** 2 and -2 ! in the calculator.
+_RIGHT_ASSOCIATIVE = {'**'}
+# Postfix operations take their default second operand: "n !" is n!.
+_POSTFIX = {'!'}
+
+
+class Number:
+
+    def __init__(self, value: Union[int, float]) -> None:
+        self.value: Union[int, float] = value
+
+
+class Parameter:
+
+    def __init__(self, name: str, index: int) -> None:
+        self.name: str = name
+        self.index: int = index
+
+
+class Binary:
+
+    def __init__(self, calculation_class: Type[Calculation], left: "Node", right: "Node") -> None:
+        self.calculation_class: Type[Calculation] = calculation_class
+        self.left: Node = left
+        self.right: Node = right
+
+
+Node = Union[Number, Parameter, Binary]
+
+
+class Parser:
+    # Expressions with precedence, parentheses and named parameters. With exact=True integer literals keep
+    # their exact value, as in the calculator's integer mode; other literals are floats either way.
+
+    def __init__(self, expression: str, exact: bool = False) -> None:
+        self.exact: bool = exact
+        self.tokens = tokenize(expression)
+        self.end = Token('end', '', len(expression.rstrip()))
+        self.position = 0
+        self.parameters: Dict[str, int] = {}
+
+    def peek(self) -> Token:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return self.end
+
+    def advance(self) -> Token:
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def parse(self) -> Node:
+        if not self.tokens:
+            raise ValueError("Empty expression.")
+        node = self.expression(1)
+        token = self.peek()
+        if token.kind != 'end':
+            raise ValueError(f"Unexpected token '{token.text}' at position {token.position}.")
+        return node
+
+    def operator(self) -> str:
+        # Symbols, and operations written as names ("n choose k"); anything else ends the expression.
+        kind, value, _ = self.peek()
+        if kind == 'name':
+            value = value.lower()
+            return value if value in _PRECEDENCE else ''
+        return value if kind == 'symbol' else ''
+
+    def expression(self, min_precedence: int) -> Node:
+        left = self.operand()
+        while True:
+            value = self.operator()
+            precedence = _PRECEDENCE.get(value)
+            if precedence is None or precedence < min_precedence:
+                return left
+            self.advance()
+            calculation_class = CalculationFactory.get_calculation(CalculationFactory._symbols.get(value, value))
+            right = self.expression(precedence if value in _RIGHT_ASSOCIATIVE else precedence + 1)
+            left = Binary(calculation_class, left, right)
+
+    def operand(self) -> Node:
+        node = self.primary()
+        while self.operator() in _POSTFIX:
+            calculation_class = CalculationFactory.get_calculation(CalculationFactory._symbols[self.advance().text])
+            step = calculation_class.default_b
+            node = Binary(calculation_class, node, Number(step if self.exact else float(step)))
+        return node
+
+    def primary(self) -> Node:
+        token = self.advance()
+        kind, value, position = token
+        if is_number(token):
+            # Includes inf and nan, which are names to the tokenizer but numbers to the calculator.
+            return Number(self.literal(value, position))
+        if kind == 'name' and value.lower() not in _PRECEDENCE:
+            if value not in self.parameters:
+                self.parameters[value] = len(self.parameters)
+            return Parameter(value, self.parameters[value])
+        if value == '(':
+            node = self.expression(1)
+            if self.advance().text != ')':
+                raise ValueError(f"Missing closing parenthesis for position {position}.")
+            return node
+        if value == '-':
+            operand = self.primary()
+            if isinstance(operand, Number):
+                return Number(-operand.value)
+            return Binary(CalculationFactory.get_calculation('mul'), Number(-1 if self.exact else -1.0), operand)
+        if kind == 'end':
+            raise ValueError(f"Unexpected end of expression at position {position}.")
+        raise ValueError(f"Unexpected token '{value}' at position {position}.")
+
+    def literal(self, text: str, position: int) -> Union[int, float]:
+        if self.exact:
+            try:
+                value = to_integer(text)
+            except ValueError:  # More digits than int() converts; see sys.set_int_max_str_digits().
+                raise ValueError(f"Integer literal too long at position {position}.") from None
+            if value is not None:
+                return value
+        return to_number(text)
+
+
+def _compile(node: Node) -> Callable[[Sequence[float]], float]:
+    if isinstance(node, Number):
+        value = node.value
+        return lambda params: value
+    if isinstance(node, Parameter):
+        index = node.index
+        return lambda params: params[index]
+    calculation_class = node.calculation_class
+    left = _compile(node.left)
+    right = _compile(node.right)
+    return lambda params: calculation_class(left(params), right(params)).exec()
+
+
+class PreparedExpression:
+
+    def __init__(self, expression: str, tree: Node, parameters: Tuple[str, ...]) -> None:
+        self.expression: str = expression
+        self.tree: Node = tree
+        self.parameters: Tuple[str, ...] = parameters
+        self._program = _compile(tree)
+
+    def execute(self, params: Sequence[float] = ()) -> float:
+        if len(params) != len(self.parameters):
+            raise ValueError(f"Expected {len(self.parameters)} parameters, got {len(params)}.")
+        return self._program(params)
+
+    def execute_many(self, columns: Sequence[Sequence[float]]) -> List[float]:
+        if len(columns) != len(self.parameters):
+            raise ValueError(f"Expected {len(self.parameters)} columns, got {len(columns)}.")
+        if len({len(column) for column in columns}) > 1:
+            raise ValueError("Parameter columns must have the same length.")
+        program = self._program
+        return [program(row) for row in zip(*columns)]
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.expression!r}, parameters={self.parameters})"
+
+
+def prepare(expression: str) -> PreparedExpression:
+    parser = Parser(expression)
+    tree = parser.parse()
+    return PreparedExpression(expression, tree, tuple(parser.parameters))
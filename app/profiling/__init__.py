@@ -0,0 +1,86 @@
+import cProfile
+import io
+import pstats
+import sys
+import tracemalloc
+from typing import Optional, TextIO
+
+# Allocations made by the profilers themselves are noise in the report.
+_IGNORED_ALLOCATIONS = [tracemalloc.Filter(False, module.__file__) for module in (cProfile, pstats, tracemalloc)]
+
+
+class Profiler:
+
+    def __init__(self) -> None:
+        self.enabled: bool = False
+        self.memory: bool = False
+        self._profile: cProfile.Profile = cProfile.Profile()
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self._started_tracemalloc: bool = False
+        self._depth: int = 0
+
+    def start(self, memory: bool = False) -> None:
+        if self.enabled:
+            raise ValueError("Profiling is already on.")
+        self._profile = cProfile.Profile()
+        self._snapshot = None
+        self.enabled = True
+        self.memory = memory
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+
+    def stop(self) -> None:
+        if not self.enabled:
+            raise ValueError("Profiling is off.")
+        self.enabled = False
+        if self.memory:
+            self._snapshot = tracemalloc.take_snapshot()
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+                self._started_tracemalloc = False
+
+    # Only the code inside "with profiler:" is measured, so idle time in the REPL prompt is not.
+    def __enter__(self) -> "Profiler":
+        if self.enabled:
+            if self._depth == 0:
+                self._profile.enable()
+            self._depth += 1
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._depth:
+            self._depth -= 1
+            if self._depth == 0:
+                self._profile.disable()
+
+    def report(self, limit: int = 20, sort: str = 'cumulative') -> str:
+        self._profile.create_stats()
+        if not self._profile.stats:
+            return "No profile data collected."
+        stream = io.StringIO()
+        pstats.Stats(self._profile, stream=stream).sort_stats(sort).print_stats(limit)
+
+        snapshot = self._snapshot
+        if snapshot is None and self.enabled and self.memory:
+            snapshot = tracemalloc.take_snapshot()
+        if snapshot is not None:
+            snapshot = snapshot.filter_traces(_IGNORED_ALLOCATIONS)
+            stream.write("Top allocation sites:\n")
+            for statistic in snapshot.statistics('lineno')[:limit]:
+                stream.write(f"  {statistic}\n")
+        return stream.getvalue()
+
+    def dump(self, path: str) -> None:
+        self._profile.create_stats()
+        self._profile.dump_stats(path)
+
+    def finish(self, output: Optional[str] = None, stream: Optional[TextIO] = None) -> None:
+        # End of a profiled command-line run: stop, print the report (to stderr, away from the results) and
+        # write the raw data to output if given. Does nothing when profiling is off.
+        if not self.enabled:
+            return
+        self.stop()
+        print(self.report(), file=stream if stream is not None else sys.stderr)
+        if output:
+            self.dump(output)
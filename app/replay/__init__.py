@@ -0,0 +1,86 @@
+import math
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from app.calculation import CalculationFactory
+from app.export import Columns
+
+# index, operation, a, b, recorded result, replayed result (None when it could not be computed), error
+Mismatch = Tuple[int, str, float, float, float, Optional[float], Optional[str]]
+
+
+class ReplayReport:
+
+    def __init__(self, max_mismatches: int = 100) -> None:
+        self.rows: int = 0
+        self.mismatch_count: int = 0
+        self.mismatches: List[Mismatch] = []
+        self.max_mismatches: int = max_mismatches
+
+    def add(self, rows: int, mismatch_count: int, mismatches: List[Mismatch]) -> None:
+        self.rows += rows
+        self.mismatch_count += mismatch_count
+        self.mismatches.extend(mismatches[:self.max_mismatches - len(self.mismatches)])
+
+    @property
+    def ok(self) -> bool:
+        return self.mismatch_count == 0
+
+    def __str__(self) -> str:
+        lines = [f"Replayed {self.rows} calculations: {self.mismatch_count} mismatches."]
+        for index, operation, a, b, recorded, actual, error in self.mismatches:
+            detail = error if error is not None else f"got {actual!r}"
+            lines.append(f"  #{index + 1}: {operation} {a!r} {b!r} recorded {recorded!r}, {detail}")
+        if self.mismatch_count > len(self.mismatches):
+            lines.append(f"  ... {self.mismatch_count - len(self.mismatches)} more")
+        return '\n'.join(lines)
+
+
+def _replay_chunk(names: List[str], opcodes: array, a_values: array, b_values: array, results: array,
+                  start: int, rel_tol: float, abs_tol: float, max_mismatches: int) -> Tuple[int, int, List[Mismatch]]:
+    classes = [CalculationFactory.find_calculation(name) for name in names]
+    isclose = math.isclose
+    isnan = math.isnan
+    mismatch_count = 0
+    mismatches: List[Mismatch] = []
+
+    for offset, (opcode, a, b, recorded) in enumerate(zip(opcodes, a_values, b_values, results)):
+        calculation_class = classes[opcode]
+        actual: Optional[float] = None
+        if calculation_class is None:
+            error = f"Unsupported calculation type: '{names[opcode]}'."
+        else:
+            error = calculation_class.validate(a, b)
+            if error is None:
+                try:
+                    actual = calculation_class(a, b).exec()
+                except Exception as e:  # A row that no longer computes is a mismatch, not the end of the replay.
+                    error = str(e)
+                else:
+                    if actual == recorded or isclose(actual, recorded, rel_tol=rel_tol, abs_tol=abs_tol) \
+                            or isnan(actual) and isnan(recorded):
+                        continue
+        mismatch_count += 1
+        if len(mismatches) < max_mismatches:
+            mismatches.append((start + offset, names[opcode], a, b, recorded, actual, error))
+    return len(opcodes), mismatch_count, mismatches
+
+
+def replay(columns: Columns, rel_tol: float = 1e-9, abs_tol: float = 0.0, workers: int = 1,
+           chunk_size: int = 250_000, max_mismatches: int = 100) -> ReplayReport:
+    report = ReplayReport(max_mismatches)
+    chunks = [(columns.names, columns.opcodes[start:start + chunk_size], columns.a[start:start + chunk_size],
+               columns.b[start:start + chunk_size], columns.results[start:start + chunk_size],
+               start, rel_tol, abs_tol, max_mismatches)
+              for start in range(0, len(columns), chunk_size)]
+
+    if workers > 1 and len(chunks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            outcomes = list(executor.map(_replay_chunk, *zip(*chunks)))
+    else:
+        outcomes = [_replay_chunk(*chunk) for chunk in chunks]
+
+    for outcome in outcomes:
+        report.add(*outcome)
+    return report
@@ -0,0 +1,187 @@
+import hashlib
+import marshal
+import math
+import os
+import re
+import sys
+from typing import Callable, Dict, Mapping, Optional, Tuple
+
+from app.calculation import Calculation, CalculationFactory
+from app.memory import BoundedStore
+from app.prepared import Binary, Node, Number, Parser
+
+# Bumped whenever the generated code changes shape, so stale files in a cache directory are recompiled.
+_FORMAT = 1
+CACHE_DIRECTORY = '__calccache__'
+
+_ASSIGNMENT = re.compile(r"\s*([A-Za-z_][A-Za-z0-9_]*)\s*=(?!=)(.*)")
+
+Emit = Callable[[int, Optional[Calculation], float], None]
+
+
+class _Compiler:
+    # Turns a script into the source of one Python function. Script line n is generated on line n + 1,
+    # right below the "def", so the line number of a traceback names the script line that failed.
+
+    def __init__(self, exact: bool = False) -> None:
+        self.exact: bool = exact
+        self.classes: Dict[str, str] = {}
+        self.inputs: Dict[str, int] = {}
+        self.assigned: Dict[str, None] = {}
+
+    def calculation(self, calculation_class: type) -> str:
+        name = self.classes.get(calculation_class.calculation_type)
+        if name is None:
+            name = self.classes[calculation_class.calculation_type] = f"_C{len(self.classes)}"
+        return name
+
+    def expression(self, node: Node, line: int) -> str:
+        if isinstance(node, Number):
+            value = node.value
+            return repr(value) if type(value) is int or math.isfinite(value) else f"_float({str(value)!r})"
+        if isinstance(node, Binary):
+            return f"{self.calculation(node.calculation_class)}({self.expression(node.left, line)}, " \
+                   f"{self.expression(node.right, line)}).exec()"
+        if node.name not in self.assigned and node.name not in self.inputs:
+            # Read before any assignment: the value comes from the caller's variables.
+            self.inputs[node.name] = line
+        return f"v_{node.name}"
+
+    def statement(self, text: str, line: int) -> str:
+        match = _ASSIGNMENT.fullmatch(text)
+        expression = match.group(2) if match else text
+        try:
+            node = Parser(expression, self.exact).parse()
+        except ValueError as e:
+            raise ValueError(f"Line {line}: {e}") from None
+        if match:
+            code = f"v_{match.group(1)} = {self.expression(node, line)}"
+            self.assigned[match.group(1)] = None
+            return code
+        if isinstance(node, Binary):
+            return f"_c = {self.calculation(node.calculation_class)}({self.expression(node.left, line)}, " \
+                   f"{self.expression(node.right, line)}); _emit({line}, _c, _c.exec())"
+        return f"_emit({line}, None, {self.expression(node, line)})"
+
+    def source(self, script: str) -> str:
+        body = []
+        for line, text in enumerate(script.splitlines(), start=1):
+            text = text.split('#', 1)[0]
+            body.append(f"    {self.statement(text, line)}" if text.strip() else "")
+        parameters = ''.join(f", v_{name}" for name in self.inputs)
+        result = ''.join(f"v_{name}, " for name in self.assigned)
+        return '\n'.join([f"def _program(_emit{parameters}):", *body, f"    return ({result})", ""])
+
+
+class Program:
+    # A compiled script: one function whose arguments are the variables the script reads before assigning
+    # and whose return value holds every variable it assigns.
+
+    def __init__(self, digest: str, code: object, inputs: Tuple[Tuple[str, int], ...], assigned: Tuple[str, ...],
+                 calculation_types: Tuple[str, ...]) -> None:
+        self.digest: str = digest
+        self.code = code
+        self.inputs: Tuple[Tuple[str, int], ...] = inputs
+        self.assigned: Tuple[str, ...] = assigned
+        self.calculation_types: Tuple[str, ...] = calculation_types
+        namespace = {f"_C{index}": CalculationFactory.get_calculation(calculation_type)
+                     for index, calculation_type in enumerate(calculation_types)}
+        namespace['_float'] = float
+        exec(code, namespace)
+        self._function = namespace['_program']
+
+    def run(self, emit: Emit, variables: Optional[Mapping[str, float]] = None) -> Dict[str, float]:
+        # Calls emit(line, calculation, result) for every line without an assignment and returns the assigned
+        # variables. Failures are raised as ValueError naming the script line.
+        variables = variables if variables is not None else {}
+        arguments = []
+        for name, line in self.inputs:
+            if name not in variables:
+                raise ValueError(f"Line {line}: undefined variable '{name}'.")
+            arguments.append(variables[name])
+        try:
+            values = self._function(emit, *arguments)
+        except Exception as e:
+            traceback, line = e.__traceback__, 0
+            while traceback is not None:
+                if traceback.tb_frame.f_code.co_filename == '<calc>':
+                    line = traceback.tb_lineno - 1
+                traceback = traceback.tb_next
+            raise ValueError(f"Line {line}: {e}") from e
+        return dict(zip(self.assigned, values))
+
+    def dumps(self) -> bytes:
+        return marshal.dumps((_FORMAT, self.digest, self.code, self.inputs, self.assigned, self.calculation_types))
+
+    @classmethod
+    def loads(cls, data: bytes) -> "Program":
+        version, digest, code, inputs, assigned, calculation_types = marshal.loads(data)
+        if version != _FORMAT:
+            raise ValueError(f"Unsupported compiled script version: {version}.")
+        return cls(digest, code, inputs, assigned, calculation_types)
+
+
+def _digest(source: str, exact: bool = False) -> str:
+    # Integer mode compiles integer literals differently, so it is part of the key.
+    return hashlib.sha256(('exact\0' if exact else '').encode('utf-8') + source.encode('utf-8')).hexdigest()
+
+
+# Compiled programs by source hash; an unchanged script is parsed and compiled once per process.
+_programs: BoundedStore = BoundedStore(max_entries=64, policy='lru')
+
+
+def compile_script(source: str, exact: bool = False) -> Program:
+    digest = _digest(source, exact)
+    program = _programs.get(digest)
+    if program is None:
+        compiler = _Compiler(exact)
+        code = compile(compiler.source(source), '<calc>', 'exec')
+        program = _programs[digest] = Program(digest, code, tuple(compiler.inputs.items()),
+                                              tuple(compiler.assigned), tuple(compiler.classes))
+    return program
+
+
+def _cache_path(path: str, digest: str) -> str:
+    directory = os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIRECTORY)
+    return os.path.join(directory, f"{digest}.{sys.implementation.cache_tag}.calc")
+
+
+def _read_cache(cache_path: str, digest: str) -> Optional[Program]:
+    try:
+        with open(cache_path, 'rb') as f:
+            program = Program.loads(f.read())
+    except (OSError, ValueError, EOFError, TypeError):
+        return None
+    return program if program.digest == digest else None
+
+
+def _write_cache(cache_path: str, program: Program) -> None:
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        temporary = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temporary, 'wb') as f:
+            f.write(program.dumps())
+        os.replace(temporary, cache_path)
+    except OSError:
+        pass
+
+
+def load_script(path: str, use_cache: bool = True, exact: bool = False) -> Program:
+    # Like __pycache__: compiled programs are kept next to the script, keyed by the hash of its text, so
+    # later processes running the same file skip parsing and compiling. Cache files that cannot be read
+    # or written are ignored.
+    with open(path, encoding='utf-8') as f:
+        source = f.read()
+    digest = _digest(source, exact)
+    program = _programs.get(digest)
+    if program is not None or not use_cache:
+        return program if program is not None else compile_script(source, exact)
+
+    cache_path = _cache_path(path, digest)
+    program = _read_cache(cache_path, digest)
+    if program is not None:
+        _programs[digest] = program
+        return program
+    program = compile_script(source, exact)
+    _write_cache(cache_path, program)
+    return program
@@ -0,0 +1,183 @@
+import json
+import math
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple, Type
+
+from app.calculation import Calculation, CalculationFactory
+from app.calculator import _SYMBOLS, try_parse_input
+from app.integers import ABBREVIATE_BITS, format_value
+
+MAX_BODY_BYTES = 16 * 1024 * 1024
+# Batch rows serialized per chunk of a streamed response; one write per chunk instead of one per row.
+CHUNK_ROWS = 256
+
+_BAD_ITEM = "Items must be expression strings or objects with numeric 'a' and 'b' and an 'op'."
+_TOO_LARGE = "Operands are too large for a float; evaluate them with 'exact': true."
+
+
+def _is_number(value: object) -> bool:
+    return type(value) in (int, float)
+
+
+def _json_value(result: object) -> object:
+    # JSON has no infinities, and converting a huge int to decimal is slow, so those are sent as text.
+    if type(result) is float:
+        return result if math.isfinite(result) else str(result)
+    if type(result) is int and result.bit_length() <= ABBREVIATE_BITS:
+        return result
+    return format_value(result)
+
+
+class Evaluator:
+    # Evaluates request items against the calculation factory, resolving each operation once per evaluator.
+
+    def __init__(self, exact: bool = False) -> None:
+        self.exact: bool = exact
+        self.classes: Dict[str, Optional[Type[Calculation]]] = {}
+
+    def _operands(self, item: object) -> Tuple[Optional[tuple], Optional[str]]:
+        if isinstance(item, str):
+            return try_parse_input(item, self.exact)
+        if not isinstance(item, dict) or not isinstance(item.get('op'), str) or not _is_number(item.get('a')):
+            return None, _BAD_ITEM
+        op = item['op']
+        calculation_type = _SYMBOLS.get(op, op)
+        b = item.get('b')
+        if 'b' not in item:
+            calculation_class = CalculationFactory.find_calculation(calculation_type)
+            b = calculation_class.default_b if calculation_class is not None else None
+        if not _is_number(b):
+            return None, _BAD_ITEM
+        a = item['a']
+        if not self.exact:
+            try:
+                a, b = float(a), float(b)
+            except OverflowError:  # JSON integers have no size limit.
+                return None, _TOO_LARGE
+        return (calculation_type, a, b), None
+
+    def evaluate(self, item: object) -> Dict[str, object]:
+        parsed, error = self._operands(item)
+        if error is not None:
+            return {'error': error}
+        calculation_type, a, b = parsed
+        if calculation_type not in self.classes:
+            self.classes[calculation_type] = CalculationFactory.find_calculation(calculation_type)
+        calculation_class = self.classes[calculation_type]
+        if calculation_class is None:
+            return {'error': f"Unsupported calculation type: '{calculation_type}'."}
+        error = calculation_class.validate(a, b)
+        if error is not None:
+            return {'error': error}
+        try:
+            result = calculation_class(a, b).exec()
+        except (ValueError, ArithmeticError) as e:
+            return {'error': str(e)}
+        return {'result': _json_value(result)}
+
+
+class CalculatorHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1, so clients keep one connection open across requests. Every response carries a length or
+    # is chunked, which lets the connection be reused after it. Headers and body are separate writes, so
+    # Nagle's algorithm would hold the body back until the client's delayed ACK on every kept-alive request.
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    server_version = 'Calculator/1.0'
+
+    def log_message(self, format: str, *args: object) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, body: object) -> None:
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        if self.close_connection:
+            self.send_header('Connection', 'close')
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self) -> Tuple[object, Optional[str]]:
+        length = self.headers.get('Content-Length')
+        if length is None or not length.isdigit():
+            self.close_connection = True
+            return None, "A Content-Length header is required."
+        if int(length) > MAX_BODY_BYTES:
+            self.close_connection = True
+            return None, f"Request body is larger than {MAX_BODY_BYTES} bytes."
+        try:
+            return json.loads(self.rfile.read(int(length))), None
+        except ValueError as e:
+            return None, f"Invalid JSON: {e}"
+
+    def do_GET(self) -> None:
+        self._send_json(404, {'error': f"Unknown path: '{self.path}'. Use POST /eval or POST /batch."})
+
+    def do_POST(self) -> None:
+        if self.path not in ('/eval', '/batch'):
+            self.do_GET()
+            return
+        body, error = self._read_json()
+        if error is not None:
+            self._send_json(400, {'error': error})
+        elif self.path == '/eval':
+            self._eval(body)
+        else:
+            self._batch(body)
+
+    def _eval(self, body: object) -> None:
+        if not isinstance(body, dict):
+            self._send_json(400, {'error': "Expected an object with 'expression', or with 'a', 'op' and 'b'."})
+            return
+        evaluator = Evaluator(exact=body.get('exact') is True)
+        outcome = evaluator.evaluate(body['expression'] if 'expression' in body else body)
+        self._send_json(200 if 'result' in outcome else 422, outcome)
+
+    def _batch(self, body: object) -> None:
+        if not isinstance(body, list):
+            self._send_json(400, {'error': "Expected a JSON array of expressions or {a, op, b} objects."})
+            return
+        # The response is a JSON array streamed in chunks, so large batches start arriving while later rows
+        # are still being evaluated and the server never holds the whole response.
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        evaluate = Evaluator().evaluate
+        dumps = json.dumps
+        for start in range(0, max(len(body), 1), CHUNK_ROWS):
+            rows = ','.join(dumps(evaluate(item)) for item in body[start:start + CHUNK_ROWS])
+            self._write_chunk(f"{'[' if start == 0 else ','}{rows}{']' if start + CHUNK_ROWS >= len(body) else ''}")
+        self.wfile.write(b'0\r\n\r\n')
+
+    def _write_chunk(self, text: str) -> None:
+        data = text.encode('utf-8')
+        self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+
+
+class CalculatorServer(ThreadingHTTPServer):
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], verbose: bool = False) -> None:
+        self.verbose: bool = verbose
+        super().__init__(address, CalculatorHandler)
+
+
+def parse_address(text: str) -> Tuple[str, int]:
+    host, _, port = text.rpartition(':')
+    if not port.isdigit() or int(port) > 65535:
+        raise ValueError(f"Expected [HOST:]PORT, got '{text}'.")
+    return host or '127.0.0.1', int(port)
+
+
+def serve(address: Tuple[str, int], verbose: bool = False) -> None:  # pragma: no cover
+    with CalculatorServer(address, verbose) as server:
+        host, port = server.server_address[:2]
+        print(f"Serving POST /eval and POST /batch on http://{host}:{port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,32 @@
+from typing import Dict, Optional
+
+from app.cache import ResultCache
+from app.history import History
+from app.lookup import LookupEngine
+from app.memory import BoundedStore, sizeof
+from app.profiling import Profiler
+from app.tracing import Tracer
+
+
+class Session:
+
+    def __init__(self, cache: Optional[ResultCache] = None, profiler: Optional[Profiler] = None,
+                 max_history: Optional[int] = None, max_variables: Optional[int] = None,
+                 variable_policy: str = 'lru') -> None:
+        self.history: History = History(max_entries=max_history)
+        self.cache: Optional[ResultCache] = cache
+        self.profiler: Profiler = profiler if profiler is not None else Profiler()
+        self.variables: BoundedStore = BoundedStore(max_entries=max_variables, policy=variable_policy)
+        self.lookups: LookupEngine = LookupEngine()
+        # Integer mode: integer literals are parsed as exact ints instead of floats.
+        self.exact: bool = False
+        self.tracer: Tracer = Tracer()
+        # Checkpoint file written on exit, if any.
+        self.checkpoint: Optional[str] = None
+
+    def memory_usage(self) -> Dict[str, int]:
+        return {
+            'history': sizeof(self.history),
+            'cache': sizeof(self.cache.memory) if self.cache is not None else 0,
+            'variables': self.variables.nbytes,
+        }
@@ -0,0 +1,152 @@
+import multiprocessing
+import struct
+import zlib
+from multiprocessing.shared_memory import SharedMemory
+from typing import Optional, Type
+
+from app.calculation import Calculation
+
+DEFAULT_CAPACITY = 1 << 16
+# Slots tried from a key's home slot before giving up (reads) or overwriting the home slot (writes).
+MAX_PROBES = 8
+
+_MAGIC = b'CALCSHM1'
+_HEADER = struct.Struct('<8sQ')
+# Slot: sequence number, key (opcode, a, b) and result, 32 bytes. The key is compared as packed bytes, so
+# -0.0 and 0.0 are different keys and a NaN operand matches itself.
+_KEY = struct.Struct('<idd')
+_SLOT = struct.Struct('<I20sd')
+_SEQUENCE = struct.Struct('<I')
+_RECORD = struct.Struct('<20sd')
+SLOT_SIZE = _SLOT.size
+
+
+def _key(opcode: int, a: float, b: float) -> bytes:
+    if opcode < 0:
+        raise ValueError(f"Invalid opcode: {opcode}. Only registered calculations can be cached.")
+    return _KEY.pack(opcode, a, b)
+
+
+class SharedResultCache:
+    # A fixed-size open-addressing hash table in one shared memory block, so every worker process reads
+    # results computed by the others without a round trip to a server or a lock. A lookup costs a few
+    # times a dict lookup, so it pays off when workers repeat each other's misses and misses are costly.
+    #
+    # Each slot carries a sequence number (a seqlock): a writer makes it odd, writes the record and makes
+    # it even again. A reader takes the slot and rereads the number; a slot being written, or rewritten
+    # while it was read, is treated as a miss. Writers take one lock shared by the processes. When every
+    # probed slot holds another key, the home slot is overwritten, so the table never grows or needs
+    # eviction.
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, name: Optional[str] = None) -> None:
+        if capacity < 1:
+            raise ValueError("Cache sizes must be positive.")
+        capacity = 1 << (capacity - 1).bit_length()
+        shared = SharedMemory(name=name, create=True, size=_HEADER.size + capacity * SLOT_SIZE)
+        _HEADER.pack_into(shared.buf, 0, _MAGIC, capacity)
+        self.owner: bool = True
+        self._open(shared, multiprocessing.Lock())
+
+    @classmethod
+    def attach(cls, name: str, lock: object) -> "SharedResultCache":
+        shared = SharedMemory(name=name)
+        if _HEADER.unpack_from(shared.buf, 0)[0] != _MAGIC:
+            shared.close()
+            raise ValueError(f"Shared memory '{name}' does not hold a result cache.")
+        cache = cls.__new__(cls)
+        cache.owner = False
+        cache._open(shared, lock)
+        return cache
+
+    def _open(self, shared: SharedMemory, lock: object) -> None:
+        self.capacity: int = _HEADER.unpack_from(shared.buf, 0)[1]
+        self.hits: int = 0
+        self.misses: int = 0
+        self.overwrites: int = 0
+        self._shared: SharedMemory = shared
+        self._lock = lock
+        self._slots: Optional[memoryview] = shared.buf[_HEADER.size:]
+        self._mask: int = self.capacity - 1
+
+    @property
+    def name(self) -> str:
+        return self._shared.name
+
+    def __reduce__(self):
+        # Workers attach to the same block by name. The lock can only travel to a process as it starts,
+        # e.g. as an argument of a pool initializer.
+        return (type(self).attach, (self.name, self._lock))
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, opcode: int, a: float, b: float) -> Optional[float]:
+        key = _key(opcode, a, b)
+        slots, mask = self._slots, self._mask
+        index = zlib.crc32(key) & mask
+        for _ in range(MAX_PROBES):
+            offset = index * SLOT_SIZE
+            sequence, stored, result = _SLOT.unpack_from(slots, offset)
+            if sequence == 0:
+                break
+            if stored == key:
+                if sequence & 1 or _SEQUENCE.unpack_from(slots, offset)[0] != sequence:
+                    break
+                self.hits += 1
+                return result
+            index = (index + 1) & mask
+        self.misses += 1
+        return None
+
+    def put(self, opcode: int, a: float, b: float, result: float) -> None:
+        key = _key(opcode, a, b)
+        slots, mask = self._slots, self._mask
+        home = zlib.crc32(key) & mask
+        with self._lock:
+            index = home
+            for _ in range(MAX_PROBES):
+                sequence, stored, _ = _SLOT.unpack_from(slots, index * SLOT_SIZE)
+                if sequence == 0 or stored == key:
+                    break
+                index = (index + 1) & mask
+            else:
+                index = home
+                self.overwrites += 1
+            offset = index * SLOT_SIZE
+            sequence = _SEQUENCE.unpack_from(slots, offset)[0]
+            _SEQUENCE.pack_into(slots, offset, (sequence + 1) & 0xFFFFFFFF)
+            _RECORD.pack_into(slots, offset + _SEQUENCE.size, key, result)
+            # Zero means "never written", so the count skips it when it wraps around.
+            _SEQUENCE.pack_into(slots, offset, (sequence + 2) & 0xFFFFFFFF or 2)
+
+    def get_or_compute(self, calculation_class: Type[Calculation], a: float, b: float) -> float:
+        # Only float results of float operands are kept; the slots have no room for exact values. Classes
+        # that were never registered all have opcode -1, so their results would share keys.
+        if type(a) is not float or type(b) is not float or calculation_class.opcode < 0:
+            return calculation_class(a, b).exec()
+        result = self.get(calculation_class.opcode, a, b)
+        if result is None:
+            result = calculation_class(a, b).exec()
+            if type(result) is float:
+                self.put(calculation_class.opcode, a, b, result)
+        return result
+
+    def __len__(self) -> int:
+        return sum(1 for index in range(self.capacity) if _SEQUENCE.unpack_from(self._slots, index * SLOT_SIZE)[0])
+
+    def close(self) -> None:
+        # The owner also removes the block; other processes only detach from it.
+        if self._slots is not None:
+            self._slots.release()
+            self._slots = None
+            self._shared.close()
+            if self.owner:
+                self._shared.unlink()
+
+    def __enter__(self) -> "SharedResultCache":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,169 @@
+import math
+from bisect import bisect_right, insort
+from typing import Any, Dict, List, Tuple
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class P2Quantile:
+    # The P-square estimator (Jain and Chlamtac, 1985): five markers track the minimum, the p/2, p and
+    # (1+p)/2 quantiles and the maximum, and are nudged along a parabola as observations arrive, so an
+    # estimate costs five floats of memory and O(1) work per observation.
+
+    __slots__ = ('p', 'count', '_heights', '_positions', '_desired', '_increments')
+
+    def __init__(self, p: float) -> None:
+        if not 0.0 < p < 1.0:
+            raise ValueError("Quantiles must be between 0 and 1.")
+        self.p: float = p
+        self.count: int = 0
+        self._heights: List[float] = []
+        self._positions: List[int] = [1, 2, 3, 4, 5]
+        self._desired: List[float] = [1.0, 1.0 + 2.0 * p, 1.0 + 4.0 * p, 3.0 + 2.0 * p, 5.0]
+        self._increments: Tuple[float, ...] = (0.0, p / 2.0, p, (1.0 + p) / 2.0, 1.0)
+
+    def add(self, x: float) -> None:
+        self.count += 1
+        heights = self._heights
+        if self.count <= 5:
+            insort(heights, x)
+            return
+
+        if x < heights[0]:
+            heights[0] = x
+            cell = 0
+        elif x >= heights[4]:
+            heights[4] = x
+            cell = 3
+        else:
+            cell = bisect_right(heights, x) - 1
+        positions, desired = self._positions, self._desired
+        for i in range(cell + 1, 5):
+            positions[i] += 1
+        for i, increment in enumerate(self._increments):
+            desired[i] += increment
+
+        for i in (1, 2, 3):
+            offset = desired[i] - positions[i]
+            if offset >= 1.0 and positions[i + 1] - positions[i] > 1 \
+                    or offset <= -1.0 and positions[i - 1] - positions[i] < -1:
+                step = 1 if offset > 0 else -1
+                height = self._parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + step * (heights[i + step] - heights[i]) / (positions[i + step] - positions[i])
+                heights[i] = height
+                positions[i] += step
+
+    def _parabolic(self, i: int, step: int) -> float:
+        q, n = self._heights, self._positions
+        return q[i] + step / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + step) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - step) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'p': self.p, 'count': self.count, 'heights': list(self._heights),
+                'positions': list(self._positions), 'desired': list(self._desired)}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "P2Quantile":
+        estimator = cls(state['p'])
+        estimator.count = state['count']
+        estimator._heights = [float(height) for height in state['heights']]
+        estimator._positions = [int(position) for position in state['positions']]
+        estimator._desired = [float(desired) for desired in state['desired']]
+        return estimator
+
+    @property
+    def value(self) -> float:
+        heights = self._heights
+        if not heights:
+            return math.nan
+        if self.count <= 5:
+            # Nearest rank over the observations themselves until the markers are running.
+            return heights[max(0, math.ceil(self.p * len(heights)) - 1)]
+        return heights[2]
+
+
+class ResultStats:
+    # Moments by Welford's method and quantiles by P-square, both updated per result, so a report never
+    # looks at the history it describes.
+
+    def __init__(self, quantiles: Tuple[float, ...] = QUANTILES) -> None:
+        self.count: int = 0
+        self.skipped: int = 0
+        self.mean: float = 0.0
+        self.minimum: float = math.inf
+        self.maximum: float = -math.inf
+        self._m2: float = 0.0
+        self.quantiles: Dict[float, P2Quantile] = {p: P2Quantile(p) for p in quantiles}
+
+    def add(self, value: object) -> None:
+        # Quantities, moduli and non-finite results do not share one number line, so they are only counted.
+        if type(value) is int:
+            try:
+                value = float(value)
+            except OverflowError:
+                value = math.inf
+        if type(value) is not float or not math.isfinite(value):
+            self.skipped += 1
+            return
+
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+        for estimator in self.quantiles.values():
+            estimator.add(value)
+
+    @property
+    def variance(self) -> float:
+        # Sample variance; zero until there are two results.
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stddev(self) -> float:
+        return math.sqrt(self.variance)
+
+    def quantile(self, p: float) -> float:
+        if p not in self.quantiles:
+            raise ValueError(f"Quantile {p:g} is not tracked. Tracked: {', '.join(f'{q:g}' for q in self.quantiles)}")
+        return self.quantiles[p].value
+
+    def reset(self) -> None:
+        self.__init__(tuple(self.quantiles))
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Plain numbers, lists and dicts only, for saving the summary along with a session.
+        return {'count': self.count, 'skipped': self.skipped, 'mean': self.mean, 'minimum': self.minimum,
+                'maximum': self.maximum, 'm2': self._m2,
+                'quantiles': [estimator.to_dict() for estimator in self.quantiles.values()]}
+
+    @classmethod
+    def from_dict(cls, state: Dict[str, Any]) -> "ResultStats":
+        stats = cls(())
+        stats.count = state['count']
+        stats.skipped = state['skipped']
+        stats.mean = float(state['mean'])
+        stats.minimum = float(state['minimum'])
+        stats.maximum = float(state['maximum'])
+        stats._m2 = float(state['m2'])
+        stats.quantiles = {estimator.p: estimator for estimator in map(P2Quantile.from_dict, state['quantiles'])}
+        return stats
+
+    def __str__(self) -> str:
+        skipped = f" ({self.skipped} skipped)" if self.skipped else ""
+        if not self.count:
+            return f"No results yet{skipped}."
+        lines = [f"Results: {self.count}{skipped}",
+                 f"    mean     : {self.mean:.10g}",
+                 f"    stddev   : {self.stddev:.10g}",
+                 f"    variance : {self.variance:.10g}",
+                 f"    min      : {self.minimum:.10g}",
+                 f"    max      : {self.maximum:.10g}"]
+        for p, estimator in self.quantiles.items():
+            lines.append(f"    {f'p{p * 100:g}':<9}: {estimator.value:.10g}")
+        return '\n'.join(lines)
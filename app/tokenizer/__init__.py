@@ -0,0 +1,104 @@
+import math
+import re
+from typing import List, NamedTuple, Optional
+
+_DIGITS = frozenset('0123456789')
+_NAME_START = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_')
+_NAME_CHARS = _NAME_START | _DIGITS
+_WHITESPACE = frozenset(' \t\r\n\f\v')
+_SPECIAL_NUMBERS = frozenset(('inf', 'infinity', 'nan'))
+
+# Whole literals and blank runs are matched by one regular expression each, so long inputs are scanned in C.
+# Underscores are only accepted between two digits, as in Python literals.
+_NUMBER = re.compile(r"""
+    0[xX][0-9a-fA-F]+(?:_[0-9a-fA-F]+)*
+  | (?:[0-9]+(?:_[0-9]+)*)? (?:\.(?:[0-9]+(?:_[0-9]+)*)?)? (?:[eE][+-]?[0-9]+(?:_[0-9]+)*)?
+""", re.VERBOSE)
+_WHITESPACE_RUN = re.compile(r'[ \t\r\n\f\v]+')
+_SPECIAL_NAME = re.compile(r'(?:[iI][nN][fF](?:[iI][nN][iI][tT][yY])?|[nN][aA][nN])(?![A-Za-z0-9_])')
+
+# Multi-character operators are matched before falling back to single characters.
+_LONG_SYMBOLS = ('**',)
+
+
+class Token(NamedTuple):
+    kind: str
+    text: str
+    position: int
+
+
+def tokenize(expression: str, limit: Optional[int] = None) -> List[Token]:
+    # Callers that only look at the first few tokens pass a limit, so a long run of junk is not scanned in full.
+    tokens: List[Token] = []
+    append = tokens.append
+    make = Token._make
+    number_end = _NUMBER.match
+    n = len(expression)
+    i = 0
+    # A sign directly in front of a number belongs to the number unless it follows an operand.
+    sign_allowed = True
+
+    while i < n and len(tokens) != limit:
+        char = expression[i]
+        if char in _WHITESPACE:
+            i += 1
+            if i < n and expression[i] in _WHITESPACE:
+                i = _WHITESPACE_RUN.match(expression, i).end()
+            continue
+
+        start = i
+        if sign_allowed and char in '+-' and i + 1 < n:
+            following = expression[i + 1]
+            if following in _DIGITS or following == '.' and i + 2 < n and expression[i + 2] in _DIGITS \
+                    or following in 'iInN' and _SPECIAL_NAME.match(expression, i + 1):
+                i += 1
+                char = following
+
+        if char in _DIGITS or char == '.' and i + 1 < n and expression[i + 1] in _DIGITS:
+            i = number_end(expression, i).end()
+            append(make(('number', expression[start:i], start)))
+            sign_allowed = False
+        elif char in _NAME_START:
+            i += 1
+            while i < n and expression[i] in _NAME_CHARS:
+                i += 1
+            append(make(('name', expression[start:i], start)))
+            sign_allowed = False
+        else:
+            for symbol in _LONG_SYMBOLS:
+                if expression.startswith(symbol, i):
+                    i += len(symbol)
+                    break
+            else:
+                i += 1
+            append(make(('symbol', expression[start:i], start)))
+            sign_allowed = char != ')'
+    return tokens
+
+
+def is_number(token: Token) -> bool:
+    return token.kind == 'number' or token.kind == 'name' and token.text.lstrip('+-').lower() in _SPECIAL_NUMBERS
+
+
+def to_number(text: str) -> float:
+    body = text.lstrip('+-')
+    if body[1:2] in ('x', 'X'):
+        try:
+            value = float(int(body, 16))
+        except OverflowError:
+            # Same as an out of range decimal literal such as 1e999.
+            value = math.inf
+        return -value if text[0] == '-' else value
+    return float(text)
+
+
+def to_integer(text: str) -> Optional[int]:
+    # The exact value of an integer literal ("12", "-0x1F", "1_000"); None for literals with a fraction or exponent.
+    body = text.lstrip('+-')
+    if body[1:2] in ('x', 'X'):
+        value = int(body, 16)
+    elif body.replace('_', '').isdigit():
+        value = int(body)
+    else:
+        return None
+    return -value if text[0] == '-' else value
@@ -0,0 +1,102 @@
+import json
+import os
+import random
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+DEFAULT_SAMPLE_RATE = 0.01
+MAX_EVENTS = 100_000
+# Inputs are recorded with their trace, cut to this length so a pasted wall of text stays readable.
+MAX_INPUT_LENGTH = 200
+
+
+class Trace:
+    # Spans of one sampled evaluation. Stages run back to back, so each span ends where the next
+    # begins and recording one costs a clock read and a tuple.
+
+    __slots__ = ('_tracer', '_text', '_start', '_last', '_spans')
+
+    def __init__(self, tracer: "Tracer", text: str) -> None:
+        self._tracer = tracer
+        self._text: str = text
+        self._start: int = time.perf_counter_ns()
+        self._last: int = self._start
+        self._spans: List[tuple] = []
+
+    def span(self, name: str) -> None:
+        # Closes the span running since the previous mark.
+        now = time.perf_counter_ns()
+        self._spans.append((name, self._last, now))
+        self._last = now
+
+    def skip(self) -> None:
+        # Time since the previous mark (printing, for instance) belongs to no stage.
+        self._last = time.perf_counter_ns()
+
+    def finish(self, error: Optional[str] = None) -> None:
+        self._tracer._record(self, time.perf_counter_ns(), error)
+
+
+class Tracer:
+    # Head-based sampling: whether an evaluation is traced is decided once, before it starts, so the
+    # ones that are not pay for a single random draw and nothing else.
+
+    def __init__(self, sample_rate: float = DEFAULT_SAMPLE_RATE, max_events: int = MAX_EVENTS,
+                 path: Optional[str] = None, seed: Optional[int] = None) -> None:
+        self.enabled: bool = False
+        self.sample_rate: float = sample_rate
+        self.path: Optional[str] = path
+        self.traces: int = 0
+        self.events: Deque[Dict[str, object]] = deque(maxlen=max_events)
+        self._random = random.Random(seed).random
+        self._origin: int = time.perf_counter_ns()
+        self._lock = threading.Lock()
+
+    def start(self, sample_rate: Optional[float] = None) -> None:
+        if sample_rate is not None:
+            if not 0.0 < sample_rate <= 1.0:
+                raise ValueError("Sample rate must be above 0 and at most 1.")
+            self.sample_rate = sample_rate
+        self.enabled = True
+
+    def stop(self) -> None:
+        self.enabled = False
+
+    def trace(self, text: str) -> Optional[Trace]:
+        if not self.enabled or self._random() >= self.sample_rate:
+            return None
+        return Trace(self, text)
+
+    def _record(self, trace: Trace, end: int, error: Optional[str]) -> None:
+        pid, tid, origin = os.getpid(), threading.get_ident(), self._origin
+        arguments: Dict[str, object] = {'input': trace._text[:MAX_INPUT_LENGTH]}
+        if error is not None:
+            arguments['error'] = error
+        events = [{'name': 'evaluate', 'cat': 'calculator', 'ph': 'X', 'ts': (trace._start - origin) / 1000,
+                   'dur': (end - trace._start) / 1000, 'pid': pid, 'tid': tid, 'args': arguments}]
+        for name, start, stop in trace._spans:
+            events.append({'name': name, 'cat': 'calculator', 'ph': 'X', 'ts': (start - origin) / 1000,
+                           'dur': (stop - start) / 1000, 'pid': pid, 'tid': tid})
+        with self._lock:
+            self.traces += 1
+            self.events.extend(events)
+
+    def export(self, path: str) -> int:
+        # Chrome Trace Event format, which chrome://tracing, Perfetto and speedscope open directly.
+        with self._lock:
+            events = list(self.events)
+        metadata = {'name': 'process_name', 'ph': 'M', 'pid': os.getpid(), 'args': {'name': 'calculator'}}
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': [metadata] + events, 'displayTimeUnit': 'ns'}, f)
+        return self.traces
+
+    def clear(self) -> None:
+        with self._lock:
+            self.events.clear()
+            self.traces = 0
+
+    def __str__(self) -> str:
+        state = f"on, sampling {self.sample_rate:.2%}" if self.enabled else "off"
+        return f"Tracing {state}; {self.traces} evaluations traced, {len(self.events)} events buffered."
@@ -0,0 +1,293 @@
+import re
+from typing import Dict, List, Optional, Tuple, Union
+
+DIMENSIONS = ('length', 'mass', 'time', 'data')
+
+Dims = Tuple[int, ...]
+# (unit name, exponent) pairs sorted by name, e.g. (('MB', 1), ('s', -1)) for MB/s
+Units = Tuple[Tuple[str, int], ...]
+
+_PREFIXES = {'T': 1e12, 'G': 1e9, 'M': 1e6, 'k': 1e3, 'c': 1e-2, 'm': 1e-3, 'u': 1e-6, 'µ': 1e-6, 'n': 1e-9}
+_BINARY_PREFIXES = {'Ki': 2 ** 10, 'Mi': 2 ** 20, 'Gi': 2 ** 30, 'Ti': 2 ** 40}
+
+
+def _dims(**exponents: int) -> Dims:
+    return tuple(exponents.get(name, 0) for name in DIMENSIONS)
+
+
+class Unit:
+    # Units are interned: every distinct combination of unit names exists once, so quantities
+    # compare units by identity and products and quotients are memoized per pair of units.
+
+    __slots__ = ('scale', 'dims', 'units', 'label', '_products', '_quotients', '_simplified')
+
+    def __init__(self, scale: float, dims: Dims, units: Units) -> None:
+        self.scale: float = scale
+        self.dims: Dims = dims
+        self.units: Units = units
+        self.label: str = _label(units)
+        self._products: Dict["Unit", "Unit"] = {}
+        self._quotients: Dict["Unit", "Unit"] = {}
+        self._simplified: Optional[Tuple["Unit", float]] = None
+
+    @property
+    def dimensionless(self) -> bool:
+        return not any(self.dims)
+
+    def __mul__(self, other: "Unit") -> "Unit":
+        unit = self._products.get(other)
+        if unit is None:
+            unit = self._products[other] = _combine(self, other, 1)
+        return unit
+
+    def __truediv__(self, other: "Unit") -> "Unit":
+        unit = self._quotients.get(other)
+        if unit is None:
+            unit = self._quotients[other] = _combine(self, other, -1)
+        return unit
+
+    def simplified(self) -> Tuple["Unit", float]:
+        # Names measuring the same dimension are merged when a result is shown (MB*min/s -> MB), not on
+        # every operation. Returns the simpler unit and the factor to multiply values by.
+        if self._simplified is None:
+            groups: Dict[Dims, List[Tuple[str, int]]] = {}
+            for name, exponent in self.units:
+                groups.setdefault(UNITS[name].dims, []).append((name, exponent))
+            units = []
+            for entries in groups.values():
+                net = sum(exponent for _, exponent in entries)
+                if len(entries) == 1 or not net:
+                    units.extend(entries if len(entries) == 1 else ())
+                    continue
+                name = max(entries, key=lambda entry: (entry[1] > 0, abs(entry[1])))[0]
+                units.append((name, net))
+            if len(units) == len(self.units):
+                self._simplified = (self, 1.0)
+            else:
+                units.sort()
+                scale = 1.0
+                for name, exponent in units:
+                    scale *= UNITS[name].scale ** exponent
+                unit = _intern(scale, self.dims, tuple(units))
+                self._simplified = (unit, self.scale / unit.scale)
+        return self._simplified
+
+    def __str__(self) -> str:
+        return self.label
+
+    def __repr__(self) -> str:
+        return f"Unit({self.label!r})"
+
+
+def _label(units: Units) -> str:
+    def power(name: str, exponent: int) -> str:
+        return name if exponent == 1 else f"{name}^{exponent}"
+
+    numerator = '*'.join(power(name, exponent) for name, exponent in units if exponent > 0)
+    denominator = '*'.join(power(name, -exponent) for name, exponent in units if exponent < 0)
+    if denominator:
+        return f"{numerator or '1'}/{denominator}"
+    return numerator
+
+
+_INTERNED: Dict[Units, Unit] = {}
+
+
+def _intern(scale: float, dims: Dims, units: Units) -> Unit:
+    unit = _INTERNED.get(units)
+    if unit is None:
+        unit = _INTERNED[units] = Unit(scale, dims, units)
+    return unit
+
+
+def _combine(left: Unit, right: Unit, sign: int) -> Unit:
+    exponents = dict(left.units)
+    for name, exponent in right.units:
+        exponents[name] = exponents.get(name, 0) + sign * exponent
+    units = tuple(sorted((name, exponent) for name, exponent in exponents.items() if exponent))
+    dims = tuple(a + sign * b for a, b in zip(left.dims, right.dims))
+    return _intern(left.scale * right.scale ** sign, dims, units)
+
+
+def _build_table() -> Dict[str, Unit]:
+    # Every unit name the parser accepts, resolved once at import to its SI scale and dimensions.
+    base = {
+        'm': (1.0, _dims(length=1)), 'g': (1e-3, _dims(mass=1)), 's': (1.0, _dims(time=1)),
+        'B': (1.0, _dims(data=1)), 'bit': (0.125, _dims(data=1)),
+    }
+    table = {}
+    for name, (scale, dims) in base.items():
+        table[name] = (scale, dims)
+        for prefix, factor in _PREFIXES.items():
+            table[prefix + name] = (scale * factor, dims)
+    for prefix, factor in _BINARY_PREFIXES.items():
+        table[prefix + 'B'] = (float(factor), _dims(data=1))
+    table.update({
+        'in': (0.0254, _dims(length=1)), 'ft': (0.3048, _dims(length=1)), 'yd': (0.9144, _dims(length=1)),
+        'mi': (1609.344, _dims(length=1)), 't': (1000.0, _dims(mass=1)), 'lb': (0.45359237, _dims(mass=1)),
+        'oz': (0.028349523125, _dims(mass=1)), 'min': (60.0, _dims(time=1)), 'h': (3600.0, _dims(time=1)),
+        'd': (86400.0, _dims(time=1)),
+    })
+    return {name: _intern(scale, dims, ((name, 1),)) for name, (scale, dims) in table.items()}
+
+
+UNITS: Dict[str, Unit] = _build_table()
+
+_FACTOR = re.compile(r"([^\s*/^]+)(?:\^([+-]?\d+))?")
+_MAX_EXPONENT = 12
+# Compound units are parsed once per spelling; the cap keeps junk input from growing the table.
+_MAX_COMPOUND = 4096
+_compound: Dict[str, Optional[Unit]] = {}
+
+
+def _parse_compound(text: str) -> Optional[Unit]:
+    # "MB/s", "kg*m/s^2": the first part is the numerator, each "/" starts a denominator.
+    unit = _DIMENSIONLESS
+    for index, part in enumerate(text.split('/')):
+        for factor in part.split('*'):
+            match = _FACTOR.fullmatch(factor)
+            base = UNITS.get(match.group(1)) if match else None
+            if base is None:
+                return None
+            exponent = int(match.group(2) or 1) * (-1 if index else 1)
+            if abs(exponent) > _MAX_EXPONENT:
+                return None
+            for _ in range(abs(exponent)):
+                unit = unit * base if exponent > 0 else unit / base
+    return unit
+
+
+def find_unit(text: str) -> Optional[Unit]:
+    unit = UNITS.get(text)
+    if unit is None:
+        if text in _compound:
+            return _compound[text]
+        unit = _parse_compound(text)
+        if len(_compound) < _MAX_COMPOUND:
+            _compound[text] = unit
+    return unit
+
+
+def compose_unit(units: Units) -> Unit:
+    # The unit made of these (name, exponent) pairs, as listed in Unit.units.
+    unit = _DIMENSIONLESS
+    for name, exponent in units:
+        base = get_unit(name)
+        for _ in range(abs(exponent)):
+            unit = unit * base if exponent > 0 else unit / base
+    return unit
+
+
+def get_unit(text: str) -> Unit:
+    unit = find_unit(text)
+    if unit is None:
+        raise ValueError(f"Unknown unit: '{text}'.")
+    return unit
+
+
+_DIMENSIONLESS = _intern(1.0, _dims(), ())
+
+Number = Union[int, float]
+
+
+class Quantity:
+    # A value in its own unit. Values are only scaled when units differ or when a plain number is
+    # needed, so arithmetic on quantities in the same unit is a float operation plus a type check.
+
+    __slots__ = ('value', 'unit')
+
+    def __init__(self, value: float, unit: Union[Unit, str]) -> None:
+        self.value: float = value
+        self.unit: Unit = get_unit(unit) if isinstance(unit, str) else unit
+
+    @staticmethod
+    def _result(value: float, unit: Unit) -> Union["Quantity", float]:
+        if unit.dimensionless:
+            return value * unit.scale
+        return _quantity(value, unit)
+
+    def _converted(self, other: "Quantity", action: str) -> float:
+        if other.unit.dims != self.unit.dims:
+            raise ValueError(f"Incompatible units: cannot {action} {self.unit} and {other.unit}.")
+        return other.value * other.unit.scale / self.unit.scale
+
+    def _mismatch(self, action: str) -> ValueError:
+        return ValueError(f"Incompatible units: cannot {action} {self.unit} and a plain number.")
+
+    def __add__(self, other: object) -> "Quantity":
+        if type(other) is Quantity:
+            unit = self.unit
+            if other.unit is unit:
+                return _quantity(self.value + other.value, unit)
+            return _quantity(self.value + self._converted(other, 'add'), unit)
+        raise self._mismatch('add')
+
+    def __radd__(self, other: object) -> "Quantity":
+        raise self._mismatch('add')
+
+    def __sub__(self, other: object) -> "Quantity":
+        if type(other) is Quantity:
+            unit = self.unit
+            if other.unit is unit:
+                return _quantity(self.value - other.value, unit)
+            return _quantity(self.value - self._converted(other, 'subtract'), unit)
+        raise self._mismatch('subtract')
+
+    def __rsub__(self, other: object) -> "Quantity":
+        raise self._mismatch('subtract')
+
+    def __mul__(self, other: Union["Quantity", Number]) -> Union["Quantity", float]:
+        if type(other) is Quantity:
+            return Quantity._result(self.value * other.value, self.unit * other.unit)
+        return _quantity(self.value * other, self.unit)
+
+    def __rmul__(self, other: Number) -> "Quantity":
+        return _quantity(other * self.value, self.unit)
+
+    def __truediv__(self, other: Union["Quantity", Number]) -> Union["Quantity", float]:
+        if type(other) is Quantity:
+            return Quantity._result(self.value / other.value, self.unit / other.unit)
+        return _quantity(self.value / other, self.unit)
+
+    def __rtruediv__(self, other: Number) -> "Quantity":
+        return _quantity(other / self.value, _DIMENSIONLESS / self.unit)
+
+    def __neg__(self) -> "Quantity":
+        return _quantity(-self.value, self.unit)
+
+    def to(self, unit: Union[Unit, str]) -> "Quantity":
+        target = get_unit(unit) if isinstance(unit, str) else unit
+        if target.dims != self.unit.dims:
+            raise ValueError(f"Incompatible units: cannot convert {self.unit} to {target}.")
+        return _quantity(self.value * self.unit.scale / target.scale, target)
+
+    def __float__(self) -> float:
+        # The value in SI base units (bytes for data).
+        return self.value * self.unit.scale
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Quantity):
+            return self.unit.dims == other.unit.dims and float(self) == float(other)
+        # Zero is zero in every unit, which is what division checks rely on.
+        return isinstance(other, (int, float)) and other == 0 and self.value == 0
+
+    def __hash__(self) -> int:
+        return hash((float(self), self.unit.dims))
+
+    def __str__(self) -> str:
+        unit, factor = self.unit.simplified()
+        return f"{self.value * factor if factor != 1.0 else self.value} {unit}"
+
+    def __repr__(self) -> str:
+        return f"Quantity({self.value!r}, {self.unit.label!r})"
+
+
+def _quantity(value: float, unit: Unit) -> Quantity:
+    # Results of arithmetic already hold an interned unit, so they skip the name lookup in __init__.
+    quantity = _new(Quantity)
+    quantity.value = value
+    quantity.unit = unit
+    return quantity
+
+
+_new = object.__new__
@@ -0,0 +1,48 @@
+"""Compare exception-based row handling with the exception-free batch API.
+
+Run from the repository root: python benchmarks/batch.py
+"""
+
+import random
+import sys
+import time
+
+sys.path.insert(0, '.')
+
+from app.batch import evaluate_expressions  # noqa: E402
+from app.calculation import CalculationFactory  # noqa: E402
+from app.calculator import parse_input  # noqa: E402
+
+
+def make_rows(count: int, bad_ratio: float, seed: int = 1):
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < bad_ratio / 2:
+            rows.append(f"{rng.randint(1, 99)} ? {rng.randint(1, 99)}")
+        elif roll < bad_ratio:
+            rows.append(f"{rng.randint(1, 99)} / 0")
+        else:
+            rows.append(f"{rng.randint(1, 99)} {rng.choice('+-*/')} {rng.randint(1, 99)}")
+    return rows
+
+
+def with_exceptions(rows):
+    results = []
+    for row in rows:
+        try:
+            operation, a, b = parse_input(row)
+            results.append(CalculationFactory.create_calculation(operation, a, b).exec())
+        except (ValueError, ZeroDivisionError) as e:
+            results.append(e)
+    return results
+
+
+if __name__ == '__main__':
+    rows = make_rows(300_000, 0.3)
+    for label, function in (("try/except per row", with_exceptions), ("evaluate_expressions", evaluate_expressions)):
+        start = time.perf_counter()
+        function(rows)
+        elapsed = time.perf_counter() - start
+        print(f"{label:<22} {len(rows) / elapsed:12,.0f} rows/s")
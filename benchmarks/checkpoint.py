@@ -0,0 +1,83 @@
+"""Time saving and restoring a large session checkpoint against rebuilding the history by re-running it.
+
+Run from the repository root: python benchmarks/checkpoint.py [--entries N] [--distinct N]
+
+The session holds N history entries drawn from a set of distinct float calculations. Restoring reads the
+typed columns in bulk and builds calculations only when they are read; rebuilding creates and executes
+every calculation again, which is what replaying the inputs would cost at the least.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, '.')
+
+from app.calculation import CalculationFactory  # noqa: E402
+from app.checkpoint import load_session, save_session  # noqa: E402
+from app.session import Session  # noqa: E402
+
+
+def make_session(entries: int, distinct: int, seed: int = 1) -> Session:
+    rng = random.Random(seed)
+    calculations = [CalculationFactory.create_calculation(rng.choice(('add', 'sub', 'mul', 'div')),
+                                                          float(rng.randint(1, 10_000)), float(rng.randint(1, 100)),
+                                                          intern=True)
+                    for _ in range(distinct)]
+    session = Session()
+    for _ in range(entries):
+        calculation = rng.choice(calculations)
+        session.history.append(calculation, calculation.exec())
+    session.variables['rate'] = 0.25
+    return session
+
+
+def rebuild(session: Session) -> float:
+    start = time.perf_counter()
+    target = Session()
+    for calculation in session.history:
+        copy = CalculationFactory.create_calculation(calculation.calculation_type, calculation.a, calculation.b,
+                                                     intern=True)
+        target.history.append(copy, copy.exec())
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entries', type=int, default=1_000_000)
+    parser.add_argument('--distinct', type=int, default=50_000)
+    args = parser.parse_args()
+
+    session = make_session(args.entries, args.distinct)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'session.ckpt')
+        start = time.perf_counter()
+        save_session(session, path)
+        saved = time.perf_counter() - start
+
+        restored = Session()
+        start = time.perf_counter()
+        load_session(restored, path)
+        loaded = time.perf_counter() - start
+        start = time.perf_counter()
+        last = restored.history.last()
+        first_read = time.perf_counter() - start
+        start = time.perf_counter()
+        save_session(restored, path)
+        resaved = time.perf_counter() - start
+        size = os.path.getsize(path)
+
+    assert str(last) == str(session.history.last()) and len(restored.history) == len(session.history)
+    print(f"{args.entries:,} entries, {args.distinct:,} distinct calculations, {size / 1e6:.1f} MB checkpoint")
+    print(f"save            {saved * 1e3:9.1f} ms")
+    print(f"load            {loaded * 1e3:9.1f} ms")
+    print(f"first read      {first_read * 1e6:9.1f} us")
+    print(f"save after load {resaved * 1e3:9.1f} ms")
+    print(f"rebuild         {rebuild(session) * 1e3:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Compare the flat dispatch engine with evaluating through Calculation objects.
+
+Run from the repository root: python benchmarks/engine.py [--rows N]
+
+The same random (opcode, a, b) columns are evaluated three ways: creating a Calculation through the
+factory and calling exec() per row, the batch API (class lookup, validate, instance, exec per row), and
+the engine's opcode table of plain functions. Allocated memory is measured with tracemalloc.
+"""
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from array import array
+
+sys.path.insert(0, '.')
+
+from app.batch import evaluate_columns  # noqa: E402
+from app.calculation import CalculationFactory  # noqa: E402
+from app.engine import Engine  # noqa: E402
+
+
+def make_columns(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    names = ['add', 'sub', 'mul', 'div']
+    opcodes = array('B', (CalculationFactory.get_calculation(rng.choice(names)).opcode for _ in range(count)))
+    a = array('d', (rng.uniform(-1000, 1000) for _ in range(count)))
+    b = array('d', (rng.uniform(1, 1000) for _ in range(count)))
+    return opcodes, a, b
+
+
+def objects(opcodes, a_values, b_values):
+    results = array('d')
+    types = CalculationFactory.calculation_types()
+    for opcode, a, b in zip(opcodes, a_values, b_values):
+        results.append(CalculationFactory.create_calculation(types[opcode], a, b).exec())
+    return results
+
+
+def batch(opcodes, a_values, b_values):
+    types = CalculationFactory.calculation_types()
+    return evaluate_columns([types[opcode] for opcode in opcodes], a_values, b_values).results
+
+
+def engine(opcodes, a_values, b_values):
+    return Engine().run_columns(opcodes, a_values, b_values).results
+
+
+def measure(name, function, columns, repeat: int = 5):
+    best = min(_timed(function, columns) for _ in range(repeat))
+    tracemalloc.start()
+    function(*columns)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    rows = len(columns[0])
+    print(f"{name:<8} {best * 1e9 / rows:7.1f} ns/row  {rows / best / 1e6:6.2f} M rows/s  peak {peak / 1e6:6.2f} MB")
+    return best
+
+
+def _timed(function, columns) -> float:
+    start = time.perf_counter()
+    function(*columns)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200_000)
+    args = parser.parse_args()
+
+    columns = make_columns(args.rows)
+    assert objects(*columns) == batch(*columns) == engine(*columns)
+    print(f"{args.rows:,} rows")
+    baseline = measure("objects", objects, columns)
+    measure("batch", batch, columns)
+    flat = measure("engine", engine, columns)
+    print(f"engine is {baseline / flat:.1f}x faster than the object path")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Load-test the HTTP JSON API over keep-alive connections on localhost.
+
+Run from the repository root: python benchmarks/http_load.py [--requests N] [--clients C] [--batch ROWS]
+
+Without --url a server is started in-process on a free port; pass --url http://host:port to test one
+started separately with python main.py --serve PORT.
+"""
+
+import argparse
+import http.client
+import json
+import random
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, '.')
+
+from app.server import CalculatorServer  # noqa: E402
+
+
+def make_body(rng: random.Random, batch: int) -> bytes:
+    if batch <= 1:
+        return json.dumps({'expression': f"{rng.randint(1, 999)} {rng.choice('+-*/')} {rng.randint(1, 999)}"}).encode()
+    rows = [{'a': rng.uniform(-1e3, 1e3), 'op': rng.choice('+-*/'), 'b': rng.uniform(1, 1e3)} for _ in range(batch)]
+    return json.dumps(rows).encode()
+
+
+def client(host: str, port: int, path: str, bodies, latencies, errors) -> None:
+    # One connection per client, reused for every request.
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    headers = {'Content-Type': 'application/json'}
+    for body in bodies:
+        start = time.perf_counter()
+        connection.request('POST', path, body=body, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        latencies.append(time.perf_counter() - start)
+        if response.status != 200:
+            errors.append(response.status)
+    connection.close()
+
+
+def percentile(ordered, p: float) -> float:
+    return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help="server to test; default: start one in-process")
+    parser.add_argument('--requests', type=int, default=5000, help="total requests")
+    parser.add_argument('--clients', type=int, default=4, help="concurrent keep-alive connections")
+    parser.add_argument('--batch', type=int, default=1, help="rows per request; 1 uses POST /eval")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        parts = urlsplit(args.url)
+        host, port = parts.hostname, parts.port or 80
+    else:
+        server = CalculatorServer(('127.0.0.1', 0))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.server_address[:2]
+
+    rng = random.Random(args.seed)
+    per_client = [[make_body(rng, args.batch) for _ in range(args.requests // args.clients)]
+                  for _ in range(args.clients)]
+    path = '/eval' if args.batch <= 1 else '/batch'
+    latencies, errors = [], []
+    threads = [threading.Thread(target=client, args=(host, port, path, bodies, latencies, errors))
+               for bodies in per_client]
+
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    if server is not None:
+        server.shutdown()
+
+    ordered = sorted(latencies)
+    print(f"{len(latencies)} requests of {max(args.batch, 1)} row(s) over {args.clients} connection(s) "
+          f"in {elapsed:.2f}s")
+    print(f"  {len(latencies) / elapsed:,.0f} requests/s, {len(latencies) * max(args.batch, 1) / elapsed:,.0f} rows/s")
+    print(f"  latency p50 {percentile(ordered, 0.5) * 1e3:.2f} ms, p99 {percentile(ordered, 0.99) * 1e3:.2f} ms, "
+          f"max {ordered[-1] * 1e3:.2f} ms")
+    print(f"  non-200 responses: {len(errors)}")
+    sys.exit(1 if errors else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Compare parse_input against the original split-based parser.
+
+Run from the repository root: python benchmarks/parse_input.py
+"""
+
+import sys
+import timeit
+
+sys.path.insert(0, '.')
+
+from app.calculator import parse_input  # noqa: E402
+
+
+def split_parse_input(expression: str):
+    parts = expression.split()
+    if len(parts) != 3:
+        raise ValueError("Wrong expression format.")
+    num1 = float(parts[0])
+    op = parts[1]
+    num2 = float(parts[2])
+    if op == '+':
+        op = "add"
+    elif op == '-':
+        op = "sub"
+    elif op == '*':
+        op = "mul"
+    elif op == '/':
+        op = "div"
+    else:
+        raise ValueError("Unsupported operation.")
+    return (op, num1, num2)
+
+
+def bench(label, function, expression, number=100_000):
+    seconds = min(timeit.repeat(lambda: function(expression), number=number, repeat=15))
+    print(f"{label:<28} {expression!r:<16} {seconds / number * 1e9:8.1f} ns/call")
+
+
+if __name__ == '__main__':
+    for expression in ("10 + 5", "15.5 / 3.2"):
+        bench("split-based (baseline)", split_parse_input, expression)
+        bench("parse_input", parse_input, expression)
+    for expression in ("10+5", "-3*-2", "0x1F * 1_000"):
+        bench("parse_input (scanner)", parse_input, expression)
@@ -0,0 +1,30 @@
+"""Measure parse_input throughput on a seeded corpus and check it only fails with documented errors.
+
+Run from the repository root: python benchmarks/parser_corpus.py [--lines N] [--seed S] [--corpus FILE]
+The corpus file is generated on first use and reused afterwards, so runs stay comparable.
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, '.')
+
+from app.corpus import check_corpus, read_corpus, write_corpus  # noqa: E402
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lines', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--malformed', type=float, default=0.5, help="share of malformed lines")
+    parser.add_argument('--corpus', default=None, help="corpus file (default: parser_corpus_<seed>_<lines>.txt)")
+    args = parser.parse_args()
+
+    path = args.corpus or f"parser_corpus_{args.seed}_{args.lines}.txt"
+    if not os.path.exists(path):
+        print(f"Writing {args.lines:,} lines to {path} ...")
+        write_corpus(path, args.lines, args.seed, args.malformed)
+
+    report = check_corpus(read_corpus(path))
+    print(report)
+    sys.exit(0 if report.ok else 1)
@@ -0,0 +1,62 @@
+"""Report what float32 storage costs in precision, and saves in memory and time, against float64.
+
+Run from the repository root: python benchmarks/precision.py [--rows N]
+
+Operands are drawn log-uniformly over several orders of magnitude with random signs, stored as float32,
+and the float32 results are compared with float64 results computed from the original operands.
+"""
+
+import argparse
+import random
+import sys
+import time
+from array import array
+
+sys.path.insert(0, '.')
+
+from app.calculation import CalculationFactory  # noqa: E402
+from app.engine import Engine  # noqa: E402
+from app.precision import precision_report, to_float32  # noqa: E402
+
+OPERATIONS = ('add', 'sub', 'mul', 'div', 'pow')
+
+
+def make_columns(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    opcodes, a, b = array('B'), array('d'), array('d')
+    for _ in range(count):
+        name = rng.choice(OPERATIONS)
+        opcodes.append(CalculationFactory.get_calculation(name).opcode)
+        if name == 'pow':
+            a.append(rng.uniform(0.5, 2.0))
+            b.append(rng.uniform(-20, 20))
+        else:
+            a.append(rng.choice((-1, 1)) * 10 ** rng.uniform(-6, 6))
+            b.append(rng.choice((-1, 1)) * 10 ** rng.uniform(-6, 6))
+    return opcodes, a, b
+
+
+def bytes_per_row(batch, a, b) -> float:
+    return sum(column.itemsize for column in (batch.results, a, b)) + batch.status.itemsize
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    opcodes, a, b = make_columns(args.rows)
+    a32, b32 = to_float32(a), to_float32(b)
+    engine = Engine()
+    for name, columns in (('float64', (a, b)), ('float32', (a32, b32))):
+        start = time.perf_counter()
+        batch = engine.run_columns(opcodes, *columns, precision=name)
+        seconds = time.perf_counter() - start
+        print(f"{name}: {bytes_per_row(batch, *columns):.0f} bytes per row in columns, "
+              f"{seconds * 1e9 / args.rows:.0f} ns per row")
+    print()
+    print(precision_report(opcodes, a, b))
+
+
+if __name__ == "__main__":
+    main()
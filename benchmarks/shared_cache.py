@@ -0,0 +1,92 @@
+"""Compare a shared-memory result cache with per-process caches in a pool of workers.
+
+Run from the repository root: python benchmarks/shared_cache.py [--workers N] [--lookups N] [--distinct N]
+
+Every worker evaluates its own seeded stream of power calculations drawn from the same skewed set of
+operands. With per-process caches each worker starts cold and only reuses its own results; with the
+shared cache a result computed by any worker is a hit for all of them.
+"""
+
+import argparse
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, '.')
+
+from app.calculation import PowCalculation  # noqa: E402
+from app.sharedcache import SharedResultCache  # noqa: E402
+
+_shared = None
+
+
+def _install(cache):
+    global _shared
+    _shared = cache
+
+
+def _stream(seed: int, lookups: int, distinct: int):
+    # Pareto-distributed key ranks: a few operand pairs are very common, most are rare.
+    rng = random.Random(seed)
+    for _ in range(lookups):
+        rank = min(int(rng.paretovariate(0.5)), distinct)
+        yield 1.0 + rank / 1000.0, 2.5
+
+
+def _run(seed: int, lookups: int, distinct: int, work: float):
+    opcode = PowCalculation.opcode
+    local = {}
+    hits = 0
+    lookup_seconds = 0.0
+    clock = time.perf_counter
+    start = clock()
+    for a, b in _stream(seed, lookups, distinct):
+        before = clock()
+        result = _shared.get(opcode, a, b) if _shared is not None else local.get((opcode, a, b))
+        lookup_seconds += clock() - before
+        if result is not None:
+            hits += 1
+            continue
+        result = PowCalculation(a, b).exec()
+        deadline = clock() + work  # stands in for an expensive calculation
+        while clock() < deadline:
+            pass
+        if _shared is not None:
+            _shared.put(opcode, a, b, result)
+        else:
+            local[(opcode, a, b)] = result
+    return hits, lookup_seconds, clock() - start
+
+
+def measure(name: str, workers: int, lookups: int, distinct: int, work: float, cache=None) -> None:
+    arguments = {'initializer': _install, 'initargs': (cache,)} if cache is not None else {}
+    with ProcessPoolExecutor(max_workers=workers, **arguments) as executor:
+        outcomes = list(executor.map(_run, range(workers), [lookups] * workers, [distinct] * workers,
+                                     [work] * workers))
+    total = workers * lookups
+    hits = sum(outcome[0] for outcome in outcomes)
+    lookup_seconds = sum(outcome[1] for outcome in outcomes)
+    busy = max(outcome[2] for outcome in outcomes)
+    print(f"{name:<12} hit rate {hits / total:7.2%}  mean lookup {lookup_seconds / total * 1e6:6.2f} us  "
+          f"slowest worker {busy:6.2f} s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--lookups', type=int, default=50_000, help="lookups per worker")
+    parser.add_argument('--distinct', type=int, default=20_000, help="distinct operand pairs")
+    parser.add_argument('--work-us', type=float, default=20.0, help="simulated cost of a miss in microseconds")
+    args = parser.parse_args()
+
+    work = args.work_us / 1e6
+    print(f"{args.workers} workers x {args.lookups:,} lookups over {args.distinct:,} operand pairs")
+    measure("per-process", args.workers, args.lookups, args.distinct, work)
+    with SharedResultCache(capacity=args.distinct * 2) as cache:
+        measure("shared", args.workers, args.lookups, args.distinct, work, cache)
+        print(f"{'':<12} {len(cache):,} results in {cache.capacity:,} slots")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,111 @@
-from app.calculator import Calculator
+import argparse
+import os
+import sys
+
+from app.bench import parse_workload, run as run_bench
+from app.cache import ResultCache
+from app.calculator import Calculator, checkpoint_command, run_script
+from app.checkpoint import load_session
+from app.export import read_export
+from app.lookup import RateSource
+from app.profiling import Profiler
+from app.replay import replay
+from app.server import parse_address, serve
+from app.session import Session
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Basic Calculator")
+    parser.add_argument('script', nargs='?', help="run a .calc script of calculations and assignments, then exit")
+    parser.add_argument('--cache', metavar='PATH', help="persist results in a SQLite cache shared across processes")
+    parser.add_argument('--cache-ttl', metavar='SECONDS', type=float, help="expire cached results after SECONDS")
+    parser.add_argument('--cache-size', metavar='ENTRIES', type=int, default=100_000,
+                        help="maximum number of results kept on disk")
+    parser.add_argument('--replay', metavar='FILE', help="recompute an exported history and report mismatches")
+    parser.add_argument('--tolerance', metavar='REL', type=float, default=1e-9,
+                        help="relative tolerance used by --replay")
+    parser.add_argument('--abs-tolerance', metavar='ABS', type=float, default=0.0,
+                        help="absolute tolerance used by --replay")
+    parser.add_argument('--workers', metavar='N', type=int, default=1, help="worker processes used by --replay")
+    parser.add_argument('--profile', action='store_true',
+                        help="profile calculations with cProfile and print the hotspots at the end")
+    parser.add_argument('--profile-memory', action='store_true', help="also report the top allocation sites")
+    parser.add_argument('--profile-output', metavar='FILE', help="write the raw cProfile data to FILE")
+    parser.add_argument('--rates', metavar='URL', help="rate service used by 'fx', e.g. http://localhost:8000/rates")
+    parser.add_argument('--trace', metavar='FILE',
+                        help="sample evaluations and write their stage spans to FILE (Chrome trace JSON) on exit")
+    parser.add_argument('--trace-rate', metavar='RATE', type=float, default=0.01,
+                        help="share of evaluations traced by --trace")
+    parser.add_argument('--checkpoint', metavar='FILE',
+                        help="restore the session from FILE if it exists, and save it there on exit")
+    parser.add_argument('--int', action='store_true', help="start in integer mode, where integers are exact")
+    parser.add_argument('--serve', metavar='[HOST:]PORT',
+                        help="serve POST /eval and POST /batch as a JSON HTTP API instead of the REPL")
+    parser.add_argument('--bench', metavar='KEY=VALUE', nargs='*',
+                        help="run a seeded synthetic workload and report throughput and latency percentiles, "
+                             "e.g. --bench count=100000 mix=+:4,*:1 errors=0.01 depth=2")
+    args = parser.parse_args()
+
+    profiler = Profiler()
+    if args.profile or args.profile_memory:
+        profiler.start(memory=args.profile_memory)
+
+    if args.serve is not None:
+        try:
+            address = parse_address(args.serve)
+        except ValueError as e:
+            parser.error(str(e))
+        serve(address)
+        sys.exit(0)
+
+    if args.bench is not None:
+        try:
+            workload = parse_workload(args.bench)
+        except ValueError as e:
+            parser.error(str(e))
+        with profiler:
+            report = run_bench(workload)
+        print(report)
+        profiler.finish(args.profile_output)
+        sys.exit(0)
+
+    if args.replay:
+        with profiler:
+            report = replay(read_export(args.replay), rel_tol=args.tolerance, abs_tol=args.abs_tolerance,
+                            workers=args.workers)
+        print(report)
+        profiler.finish(args.profile_output)
+        sys.exit(0 if report.ok else 1)
+
+    cache = ResultCache(args.cache, max_entries=args.cache_size, ttl=args.cache_ttl) if args.cache else None
+    session = Session(cache=cache, profiler=profiler)
+    session.exact = args.int
+    if args.trace:
+        try:
+            session.tracer.start(args.trace_rate)
+        except ValueError as e:
+            parser.error(str(e))
+        session.tracer.path = args.trace
+    if args.rates:
+        session.lookups.add_source(RateSource('fx', args.rates))
+    if args.checkpoint:
+        if os.path.exists(args.checkpoint):
+            try:
+                rows = load_session(session, args.checkpoint)
+            except (OSError, ValueError) as e:
+                parser.error(str(e))
+            print(f"Restored {rows} calculations from '{args.checkpoint}'.")
+        session.checkpoint = args.checkpoint
+    if args.script:
+        # Run against the fully configured session: rates for 'fx', and the restored checkpoint's variables.
+        with profiler:
+            ok = run_script(args.script, session)
+        profiler.finish(args.profile_output)
+        if session.checkpoint is not None:
+            checkpoint_command(session, 'save', session.checkpoint)
+        sys.exit(0 if ok else 1)
+    Calculator(session=session)
+
 
 if __name__ == "__main__":
-    Calculator()
\ No newline at end of file
+    main()
@@ -0,0 +1,115 @@
+# tests/test_batch.py
+
+"""
+Unit tests for the exception-free batch evaluation module using pytest.
+
+These tests check that bulk evaluation returns results, per-row status codes and error
+messages as parallel arrays, and that bad rows are reported instead of raised.
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+import math
+import pytest
+from app.batch import (
+    CALCULATION_ERROR,
+    INVALID_OPERANDS,
+    OK,
+    PARSE_ERROR,
+    UNSUPPORTED_OPERATION,
+    evaluate_columns,
+    evaluate_expressions,
+)
+from app.calculation import AddCalculation
+
+
+def test_evaluate_expressions_mixed_rows():
+    """
+    Test a batch of good and bad expressions.
+    """
+    # Arrange
+    expressions = ['10 + 5', 'ten + five', '4 / 0', '2 ^ 3', '6*7']
+
+    # Act
+    batch = evaluate_expressions(expressions)
+
+    # Assert
+    assert len(batch) == 5
+    assert list(batch.status) == [OK, PARSE_ERROR, INVALID_OPERANDS, PARSE_ERROR, OK]
+    assert batch.results[0] == 15.0
+    assert batch.results[4] == 42.0
+    assert all(math.isnan(batch.results[index]) for index in batch.failures())
+    assert batch.errors[0] is None
+    assert batch.errors[2] == "Division by zero not allowed."
+    assert batch.errors[3] == "Unsupported operation."
+    assert batch.ok == [True, False, False, False, True]
+    assert batch.failures() == [1, 2, 3]
+
+
+def test_evaluate_columns():
+    """
+    Test bulk evaluation over operation and operand columns.
+    """
+    # Act
+    batch = evaluate_columns(['add', 'MUL', 'div', 'mod'], [1.0, 2.0, 3.0, 4.0], [2.0, 3.0, 0.0, 5.0])
+
+    # Assert
+    assert list(batch.status) == [OK, OK, INVALID_OPERANDS, UNSUPPORTED_OPERATION]
+    assert list(batch.results[:2]) == [3.0, 6.0]
+    assert batch.errors[3] == "Unsupported calculation type: 'mod'."
+
+
+def test_huge_integer_operands_are_reported_per_row():
+    """
+    Test that factorials and binomials of operands too large to estimate with floats fail only their rows.
+    """
+    # Act
+    batch = evaluate_expressions(["1e20 ! 2", "1e308 choose 5", "1 + 1"])
+
+    # Assert
+    assert list(batch.status) == [INVALID_OPERANDS, INVALID_OPERANDS, OK]
+    assert batch.errors[:2] == ["Result is too large for a float; switch to 'mode int' for exact results."] * 2
+    assert batch.results[2] == 2.0
+
+
+def test_results_that_are_not_numbers_are_errors():
+    """
+    Test that modular results and results with units are reported instead of stored as bare floats.
+    """
+    # Act
+    batch = evaluate_expressions(["3 ** 2 mod 7", "5 km + 300 m", "2 ** 3"])
+
+    # Assert
+    assert list(batch.status) == [CALCULATION_ERROR, CALCULATION_ERROR, OK]
+    assert batch.errors[0] == "Cannot store the result 2 (mod 7) in a float column."
+    assert batch.errors[1] == ("Cannot store the result 5.3 km in a float column: results with units are not "
+                               "supported here.")
+    assert math.isnan(batch.results[0]) and math.isnan(batch.results[1]) and batch.results[2] == 8.0
+
+
+def test_evaluate_columns_length_mismatch():
+    """
+    Test that columns of different lengths are rejected.
+    """
+    # Act & Assert
+    with pytest.raises(ValueError, match="same length"):
+        evaluate_columns(['add'], [1.0, 2.0], [3.0])
+
+
+def test_evaluate_unexpected_calculation_error(monkeypatch):
+    """
+    Test that an unexpected error raised by exec() is reported for that row only.
+    """
+    # Arrange
+    def broken_exec(self):
+        raise RuntimeError("broken")
+
+    monkeypatch.setattr(AddCalculation, 'exec', broken_exec)
+
+    # Act
+    batch = evaluate_columns(['add', 'sub'], [1.0, 5.0], [2.0, 3.0])
+
+    # Assert
+    assert list(batch.status) == [CALCULATION_ERROR, OK]
+    assert batch.errors[0] == "broken"
+    assert batch.results[1] == 2.0
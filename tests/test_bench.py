@@ -0,0 +1,164 @@
+# tests/test_bench.py
+
+"""
+Unit tests for the synthetic load generator using pytest.
+
+These tests cover workload options, deterministic generation with the requested mix,
+depth and error rate, the per-stage latency report and the bench REPL command.
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+import pytest
+from io import StringIO
+from app.bench import STAGES, Workload, generate, parse_workload, percentile, run
+from app.calculator import Calculator, parse_input
+from app.prepared import prepare
+
+
+def test_parse_workload_options():
+    """
+    Test that key=value words are converted into a workload.
+    """
+    # Act
+    workload = parse_workload(['count=1e3', 'seed=7', 'mix=+:4,*', 'operands=int', 'low=1', 'high=9',
+                               'errors=0.25', 'depth=2'])
+
+    # Assert
+    assert (workload.count, workload.seed, workload.mix) == (1000, 7, {'+': 4.0, '*': 1.0})
+    assert (workload.operands, workload.low, workload.high) == ('int', 1.0, 9.0)
+    assert (workload.error_rate, workload.depth) == (0.25, 2)
+    assert repr(workload) == "count=1000 seed=7 mix=+:4,*:1 operands=int low=1 high=9 errors=0.25 depth=2"
+
+
+@pytest.mark.parametrize("arguments, message", [
+    (['size=10'], "Unknown bench option: 'size=10'"),
+    (['count'], "Unknown bench option: 'count'"),
+    (['mix=%:1'], "Unknown operation in mix: '%'."),
+    (['operands=normal'], "Unknown operand distribution: 'normal'"),
+    (['depth=0'], "count and depth must be positive"),
+    (['errors=2'], "count and depth must be positive"),
+])
+def test_parse_workload_errors(arguments, message):
+    """
+    Test that invalid options are rejected with a message.
+    """
+    with pytest.raises(ValueError, match=message.replace('*', r'\*')):
+        parse_workload(arguments)
+
+
+def test_generate_is_deterministic_and_follows_the_mix():
+    """
+    Test that a seed reproduces the workload and only the mixed operations appear.
+    """
+    # Arrange
+    workload = Workload(count=200, seed=3, mix={'*': 1.0}, operands='int', low=1, high=9)
+
+    # Act
+    first = list(generate(workload))
+    second = list(generate(workload))
+
+    # Assert
+    assert first == second
+    assert all(parse_input(line)[0] == 'mul' for line in first)
+    assert all(1 <= parse_input(line)[1] <= 9 for line in first)
+    assert first != list(generate(Workload(count=200, seed=4, mix={'*': 1.0}, operands='int', low=1, high=9)))
+
+
+def test_generate_depth_and_errors():
+    """
+    Test that nested expressions have the requested depth and errors are injected.
+    """
+    # Arrange
+    workload = Workload(count=400, depth=3, error_rate=0.5, operands='lognormal')
+
+    # Act
+    lines = list(generate(workload))
+
+    # Assert
+    assert all(max(line[:i].count('(') - line[:i].count(')') for i in range(len(line) + 1)) == 2 for line in lines)
+    assert 50 < sum(line.endswith(' ?') for line in lines) < 350
+    assert 50 < sum(line.endswith(' / 0') for line in lines) < 350
+    assert all(prepare(line) for line in lines if not line.endswith('?'))
+
+
+@pytest.mark.parametrize("ordered, fraction, expected", [
+    ([], 0.5, 0), ([5], 0.999, 5), (list(range(1, 101)), 0.5, 50), (list(range(1, 101)), 0.99, 99),
+    (list(range(1, 1001)), 0.999, 999),
+])
+def test_percentile_nearest_rank(ordered, fraction, expected):
+    """
+    Test nearest-rank percentiles.
+    """
+    assert percentile(ordered, fraction) == expected
+
+
+@pytest.mark.parametrize("depth", [1, 3])
+def test_run_reports_every_stage(depth):
+    """
+    Test that successful inputs are timed in every stage and failures are counted.
+    """
+    # Arrange
+    workload = Workload(count=500, depth=depth, error_rate=0.2)
+
+    # Act
+    report = run(workload)
+
+    # Assert
+    succeeded = report.operations - report.errors['parse'] - report.errors['calculation']
+    assert report.operations == 500
+    assert report.errors['parse'] > 0 and report.errors['calculation'] > 0
+    assert len(report.latencies['total']) == 500
+    assert len(report.latencies['parse']) == 500 - report.errors['parse']
+    for stage in ('factory', 'exec', 'history'):
+        assert len(report.latencies[stage]) == succeeded
+    assert report.throughput > 0
+    summary = report.summary('total')
+    assert summary['p50'] <= summary['p99'] <= summary['p999']
+
+
+def test_run_nested_rejects_plain_numbers_and_parameters():
+    """
+    Test that nested inputs without an operation, or with parameters, count as parse errors.
+    """
+    # Act
+    report = run(Workload(count=1, depth=2), lines=["42", "x + 1", "(1 + 2) * 3"])
+
+    # Assert
+    assert report.errors['parse'] == 2
+    assert len(report.latencies['history']) == 1
+
+
+def test_report_format():
+    """
+    Test that the report lists the workload, throughput and a row per stage.
+    """
+    # Act
+    text = str(run(Workload(count=50)))
+    empty = run(Workload(count=1), lines=[])
+
+    # Assert
+    assert text.startswith("Workload: count=50 seed=0")
+    assert "50 inputs in" in text and "ops/sec" in text
+    for stage in STAGES:
+        assert f"\n{stage:<8} " in text
+    assert empty.throughput == 0.0
+    assert empty.summary('exec') == {'count': 0, 'mean': 0.0, 'p50': 0.0, 'p99': 0.0, 'p999': 0.0}
+
+
+def test_calculator_bench_command(monkeypatch, capsys):
+    """
+    Test the bench REPL command.
+    """
+    # Arrange
+    monkeypatch.setattr('sys.stdin', StringIO('bench count=100 depth=2\nbench depth=x\nexit\n'))
+
+    # Act
+    with pytest.raises(SystemExit):
+        Calculator()
+
+    # Assert
+    captured = capsys.readouterr()
+    assert "Workload: count=100" in captured.out
+    assert "p999 us" in captured.out
+    assert "ERROR:  invalid literal for int()" in captured.out
@@ -0,0 +1,328 @@
+# tests/test_cache.py
+
+"""
+Unit tests for the persistent result cache using pytest.
+
+These tests cover the in-memory and SQLite tiers, TTL expiry, size-based eviction,
+warm-up of the hottest entries, sharing between cache instances and the statistics
+exposed for hit ratio and latency.
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+import math
+import pytest
+from io import StringIO
+from app.cache import ResultCache
+from app.calculator import Calculator
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "results.sqlite")
+
+
+def test_get_or_compute_miss_then_hit():
+    """
+    Test that the first lookup computes and stores the result and the second one hits memory.
+    """
+    # Arrange
+    cache = ResultCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return 15.0
+
+    # Act
+    first = cache.get_or_compute('add', 10.0, 5.0, compute)
+    second = cache.get_or_compute('add', 10.0, 5.0, compute)
+
+    # Assert
+    assert first == second == 15.0
+    assert len(calls) == 1
+    assert cache.stats.misses == 1
+    assert cache.stats.memory_hits == 1
+    assert cache.stats.hit_ratio == 0.5
+    assert cache.stats.mean_latency > 0.0
+
+
+def test_cache_shared_between_instances(cache_path):
+    """
+    Test that a second cache opened on the same file sees results stored by the first.
+    """
+    # Arrange
+    writer = ResultCache(cache_path)
+    writer.put(('mul', 7.0, 8.0, 'float'), 56.0)
+    reader = ResultCache(cache_path, warm_entries=0)
+
+    # Act
+    result = reader.get(('mul', 7.0, 8.0, 'float'))
+    again = reader.get(('mul', 7.0, 8.0, 'float'))
+
+    # Assert
+    assert result == again == 56.0
+    assert reader.stats.disk_hits == 1
+    assert reader.stats.memory_hits == 1
+    writer.close()
+    reader.close()
+
+
+def test_cache_backend_is_part_of_key():
+    """
+    Test that the same operands under another backend are a separate entry.
+    """
+    # Arrange
+    cache = ResultCache()
+    cache.put(('add', 1.0, 2.0, 'float'), 3.0)
+
+    # Act
+    result = cache.get(('add', 1.0, 2.0, 'int'))
+
+    # Assert
+    assert result is None
+    assert cache.stats.misses == 1
+
+
+def test_cache_ttl_expiry(cache_path):
+    """
+    Test that entries older than the TTL are treated as misses in both tiers.
+    """
+    # Arrange
+    clock = FakeClock()
+    cache = ResultCache(cache_path, ttl=10.0, clock=clock)
+    cache.put(('add', 1.0, 2.0, 'float'), 3.0)
+    other = ResultCache(cache_path, ttl=10.0, clock=clock, warm_entries=0)
+
+    # Act
+    clock.now += 11.0
+    memory_result = cache.get(('add', 1.0, 2.0, 'float'))
+    disk_result = other.get(('add', 1.0, 2.0, 'float'))
+
+    # Assert
+    assert memory_result is None
+    assert disk_result is None
+    assert cache.stats.misses == 1
+    assert other.stats.misses == 1
+
+
+def test_cache_size_based_eviction():
+    """
+    Test that exceeding max_entries evicts the coldest entries down to the low-water mark.
+    """
+    # Arrange
+    cache = ResultCache(max_entries=10)
+    for value in range(10):
+        cache.put(('add', float(value), 0.0, 'float'), float(value))
+    cache.get(('add', 0.0, 0.0, 'float'))
+    cache.flush()
+
+    # Act
+    cache.put(('add', 10.0, 0.0, 'float'), 10.0)
+
+    # Assert
+    assert len(cache) == 9
+    assert cache.stats.evictions == 2
+    assert cache.get(('add', 0.0, 0.0, 'float')) == 0.0
+
+
+def test_cache_eviction_purges_expired_entries():
+    """
+    Test that evict() removes expired rows before applying the size limit.
+    """
+    # Arrange
+    clock = FakeClock()
+    cache = ResultCache(ttl=5.0, clock=clock)
+    cache.put(('add', 1.0, 1.0, 'float'), 2.0)
+    clock.now += 6.0
+    cache.put(('add', 2.0, 2.0, 'float'), 4.0)
+
+    # Act
+    removed = cache.evict()
+
+    # Assert
+    assert removed == 1
+    assert len(cache) == 1
+
+
+def test_cache_warm_up_loads_hottest_entries(cache_path):
+    """
+    Test that opening a cache loads the most frequently hit entries into memory.
+    """
+    # Arrange
+    cache = ResultCache(cache_path, memory_entries=0)
+    cache.put(('add', 1.0, 1.0, 'float'), 2.0)
+    cache.put(('add', 2.0, 2.0, 'float'), 4.0)
+    cache.get(('add', 2.0, 2.0, 'float'))
+    cache.close()
+
+    # Act
+    warm = ResultCache(cache_path, memory_entries=1, warm_entries=1)
+    result = warm.get(('add', 2.0, 2.0, 'float'))
+
+    # Assert
+    assert result == 4.0
+    assert warm.stats.memory_hits == 1
+
+
+def test_cache_memory_tier_is_bounded():
+    """
+    Test that the memory tier keeps at most memory_entries results.
+    """
+    # Arrange
+    cache = ResultCache(memory_entries=1)
+    cache.put(('add', 1.0, 1.0, 'float'), 2.0)
+    cache.put(('add', 2.0, 2.0, 'float'), 4.0)
+
+    # Act
+    result = cache.get(('add', 1.0, 1.0, 'float'))
+
+    # Assert
+    assert result == 2.0
+    assert cache.stats.disk_hits == 1
+
+
+def test_cache_invalid_sizes():
+    """
+    Test that invalid sizes are rejected.
+    """
+    # Act & Assert
+    with pytest.raises(ValueError, match="Cache sizes must be positive."):
+        ResultCache(max_entries=0)
+
+
+def test_cache_stats_str():
+    """
+    Test the textual statistics report, including the empty case.
+    """
+    # Arrange
+    cache = ResultCache()
+
+    # Act
+    text = str(cache.stats)
+
+    # Assert
+    assert "lookups=0" in text
+    assert "hit_ratio=0.00%" in text
+
+
+def test_calculator_with_cache(monkeypatch, capsys):
+    """
+    Test that the REPL serves repeated calculations from the cache and reports stats.
+    """
+    # Arrange
+    cache = ResultCache()
+    monkeypatch.setattr('sys.stdin', StringIO('10 + 5\n10 + 5\ncache\nexit\n'))
+
+    # Act
+    with pytest.raises(SystemExit):
+        Calculator(cache=cache)
+
+    # Assert
+    captured = capsys.readouterr()
+    assert captured.out.count("15.0") == 2
+    assert "hits=1" in captured.out
+
+
+def test_calculator_cache_disabled(monkeypatch, capsys):
+    """
+    Test the cache command when no cache is configured.
+    """
+    # Arrange
+    monkeypatch.setattr('sys.stdin', StringIO('cache\nexit\n'))
+
+    # Act
+    with pytest.raises(SystemExit):
+        Calculator()
+
+    # Assert
+    captured = capsys.readouterr()
+    assert "Result cache is disabled." in captured.out
+
+
+@pytest.mark.parametrize("a, b, result", [
+    (math.inf, math.inf, math.nan),
+    (math.nan, 1.0, math.nan),
+    (1.0, 0.0, math.inf),
+    (-0.0, 5.0, -0.0),
+])
+def test_cache_bypasses_values_sqlite_cannot_keep(cache_path, a, b, result):
+    """
+    Test that NaN, infinities and negative zero are computed every time and never stored.
+    """
+    # Arrange
+    cache = ResultCache(cache_path)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return result
+
+    # Act
+    values = [cache.get_or_compute('sub', a, b, compute) for _ in range(2)]
+
+    # Assert
+    assert len(calls) == 2 and len(cache) == 0
+    assert all(value is result for value in values)
+
+
+def test_cache_keys_negative_zero_apart(cache_path):
+    """
+    Test that a result for 0.0 is not returned for -0.0, and a -0.0 result is not stored as 0.0.
+    """
+    # Arrange
+    cache = ResultCache(cache_path)
+
+    # Act
+    positive = cache.get_or_compute('mul', 0.0, 5.0, lambda: 0.0)
+    negative = cache.get_or_compute('mul', -0.0, 5.0, lambda: -0.0)
+    signed = cache.get_or_compute('mul', 0.0, -5.0, lambda: -0.0)
+    again = cache.get_or_compute('mul', 0.0, -5.0, lambda: -0.0)
+
+    # Assert
+    assert math.copysign(1.0, positive) == 1.0
+    assert math.copysign(1.0, negative) == math.copysign(1.0, signed) == math.copysign(1.0, again) == -1.0
+    assert len(cache) == 1
+
+
+def test_cache_replacing_an_entry_does_not_count_it_twice():
+    """
+    Test that storing an existing key again neither adds an entry nor triggers eviction early.
+    """
+    # Arrange
+    cache = ResultCache(max_entries=2)
+    cache.put(('add', 1.0, 1.0, 'float'), 2.0)
+
+    # Act
+    for _ in range(5):
+        cache.put(('add', 1.0, 1.0, 'float'), 3.0)
+    cache.put(('add', 2.0, 2.0, 'float'), 4.0)
+
+    # Assert
+    assert cache.stats.evictions == 0 and len(cache) == 2
+    cache.memory.clear()
+    assert cache.get(('add', 1.0, 1.0, 'float')) == 3.0 and cache.stats.disk_hits == 1
+
+
+def test_calculator_cache_with_non_finite_values(monkeypatch, capsys):
+    """
+    Test that the REPL with a cache evaluates inf - inf and nan + 1 instead of failing to store them.
+    """
+    # Arrange
+    monkeypatch.setattr('sys.stdin', StringIO('inf - inf\nnan + 1\ninf - inf\nexit\n'))
+
+    # Act
+    with pytest.raises(SystemExit):
+        Calculator(cache=ResultCache())
+
+    # Assert
+    captured = capsys.readouterr()
+    assert captured.out.count("nan") == 3 and "error" not in captured.out
@@ -11,8 +11,16 @@ Tests are organized following the AAA (Arrange, Act, Assert) pattern and adhere
 to PEP8 standards for code style and formatting.
 """
 
+import copy
+import gc
+import pickle
 import pytest
+import sys
 from unittest.mock import patch
+from app.calculator import evaluate_input
+from app.history import History
+from app.integers import Mod
+from app.memory import sizeof
 from app.operation import Operation
 from app.calculation import (
     CalculationFactory,
@@ -571,3 +579,212 @@ def test_calculation_str_parameterized(
 
     # Assert: Verify the string representation matches the expected format
     assert calc_str == expected_str
+
+
+# -----------------------------------------------------------------------------------
+# Test Operator Symbols
+# -----------------------------------------------------------------------------------
+
+@pytest.mark.parametrize("symbol, expected_type", [
+    ('+', 'add'),
+    ('-', 'sub'),
+    ('*', 'mul'),
+    ('/', 'div'),
+])
+def test_factory_type_for_symbol(symbol, expected_type):
+    """
+    Test that CalculationFactory resolves registered operator symbols to calculation types.
+    """
+    # Act
+    calculation_type = CalculationFactory.type_for_symbol(symbol)
+
+    # Assert
+    assert calculation_type == expected_type
+
+
+def test_factory_type_for_unknown_symbol():
+    """
+    Test that resolving an unregistered symbol raises ValueError.
+    """
+    # Act & Assert
+    with pytest.raises(ValueError, match="Unsupported operation."):
+        CalculationFactory.type_for_symbol('^')
+
+
+def test_factory_register_calculation_duplicate_symbol():
+    """
+    Test that registering a calculation with an already registered symbol raises ValueError
+    and leaves the registry untouched.
+    """
+    # Arrange & Act
+    with pytest.raises(ValueError) as exc_info:
+        @CalculationFactory.register_calculation('plus', symbol='+')
+        class PlusCalculation(Calculation):
+            def exec(self) -> float:
+                return Operation.add(self.a, self.b)
+
+    # Assert
+    assert "Symbol '+' is already registered." in str(exc_info.value)
+    with pytest.raises(ValueError):
+        CalculationFactory.get_calculation('plus')
+
+
+# -----------------------------------------------------------------------------------
+# Test Operand Validation
+# -----------------------------------------------------------------------------------
+
+@pytest.mark.parametrize("calculation_class, a, b, expected", [
+    (AddCalculation, 1.0, 0.0, None),
+    (DivCalculation, 1.0, 2.0, None),
+    (DivCalculation, 1.0, 0.0, "Division by zero not allowed."),
+])
+def test_calculation_validate(calculation_class, a, b, expected):
+    """
+    Test that validate() reports operands exec() would reject, without raising.
+    """
+    # Act & Assert
+    assert calculation_class.validate(a, b) == expected
+
+
+def test_factory_find_calculation():
+    """
+    Test that find_calculation returns None instead of raising for unknown types.
+    """
+    # Act & Assert
+    assert CalculationFactory.find_calculation('ADD') is AddCalculation
+    assert CalculationFactory.find_calculation('modulus') is None
+
+
+# -----------------------------------------------------------------------------------
+# Test Opcodes
+# -----------------------------------------------------------------------------------
+
+def test_registered_calculations_have_type_and_opcode():
+    """
+    Test that registration records the calculation type and a stable opcode on the class.
+    """
+    # Act
+    types = CalculationFactory.calculation_types()
+
+    # Assert
+    assert types[:4] == ['add', 'sub', 'mul', 'div']
+    for calculation_class in (AddCalculation, SubCalculation, MulCalculation, DivCalculation):
+        assert types[calculation_class.opcode] == calculation_class.calculation_type
+        assert CalculationFactory.type_for_opcode(calculation_class.opcode) == calculation_class.calculation_type
+
+
+@pytest.mark.parametrize("opcode", [-1, 255])
+def test_factory_type_for_unknown_opcode(opcode):
+    """
+    Test that unknown opcodes are rejected.
+    """
+    # Act & Assert
+    with pytest.raises(ValueError, match=f"Unknown opcode: {opcode}."):
+        CalculationFactory.type_for_opcode(opcode)
+
+
+# -----------------------------------------------------------------------------------
+# Test Interning
+# -----------------------------------------------------------------------------------
+
+def test_factory_interns_identical_calculations():
+    """
+    Test that interned calculations with the same operation and operands are one shared object.
+    """
+    # Act
+    first = CalculationFactory.create_calculation('add', 1.5, 2.0, intern=True)
+    second = CalculationFactory.create_calculation('ADD', 1.5, 2.0, intern=True)
+    other = CalculationFactory.create_calculation('add', 2.0, 1.5, intern=True)
+    plain = CalculationFactory.create_calculation('add', 1.5, 2.0)
+
+    # Assert
+    assert first is second and first is not other and first is not plain
+    assert isinstance(first, AddCalculation) and type(first).__name__ == 'AddCalculation'
+    assert str(first) == str(plain) == "AddCalculation: 1.5 Add 2.0 = 3.5"
+    assert repr(first) == "AddCalculation(a=1.5, b=2.0)"
+    assert {first: 'cached'}[second] == 'cached'
+
+
+def test_interned_calculations_are_immutable():
+    """
+    Test that shared instances cannot be changed, and survive copying and pickling as themselves.
+    """
+    # Arrange
+    calculation = CalculationFactory.create_calculation('mul', 3.0, 4.0, intern=True)
+
+    # Act & Assert
+    with pytest.raises(AttributeError, match="Interned calculations are immutable."):
+        calculation.a = 5.0
+    with pytest.raises(AttributeError, match="Interned calculations are immutable."):
+        del calculation.b
+    assert copy.copy(calculation) is calculation and copy.deepcopy(calculation) is calculation
+    assert pickle.loads(pickle.dumps(calculation)) is calculation
+    assert calculation.exec() == 12.0
+
+
+def test_int_and_float_operands_are_interned_apart():
+    """
+    Test that 2 and 2.0 are different operands, since exact and float results differ.
+    """
+    # Act
+    exact = CalculationFactory.create_calculation('pow', 2, 100, intern=True)
+    floating = CalculationFactory.create_calculation('pow', 2.0, 100, intern=True)
+
+    # Assert
+    assert exact is CalculationFactory.create_calculation('pow', 2, 100, intern=True)
+    assert exact is not floating
+    assert type(exact.exec()) is int and type(floating.exec()) is float
+
+
+@pytest.mark.parametrize("a, b", [(0.0, 3.0), (-0.0, 3.0), (3.0, Mod(1, 5))])
+def test_operands_that_are_not_interned(a, b):
+    """
+    Test that zeros, whose sign equality ignores, and operands other than ints and floats are not interned.
+    """
+    # Act
+    first = CalculationFactory.create_calculation('add', a, b, intern=True)
+    second = CalculationFactory.create_calculation('add', a, b, intern=True)
+
+    # Assert
+    assert first is not second
+    assert type(first) is AddCalculation
+
+
+def test_interning_skips_lookups_and_forgets_unused_calculations():
+    """
+    Test that looked-up calculations are never shared and entries leave with their last reference.
+    """
+    # Arrange
+    fx = [CalculationFactory.create_calculation('fx', 10.0, 978.0, intern=True) for _ in range(2)]
+    calculation = CalculationFactory.create_calculation('sub', 123.25, 0.5, intern=True)
+    key = (SubCalculation, float, 123.25, float, 0.5)
+
+    # Act
+    present = key in CalculationFactory._interned
+    del calculation
+    gc.collect()
+
+    # Assert
+    assert fx[0] is not fx[1]
+    fx[0].value = 1.0
+    assert present and key not in CalculationFactory._interned
+
+
+def test_history_shares_repeated_calculations(capsys):
+    """
+    Test that the REPL path interns, so repeated inputs cost the history one calculation object.
+    """
+    # Arrange
+    history, separate = History(), History()
+
+    # Act
+    for _ in range(50):
+        evaluate_input("7 * 6", history)
+        evaluate_input("7 / 2", history)
+        for calculation in (MulCalculation(7.0, 6.0), DivCalculation(7.0, 2.0)):
+            separate.append(calculation, calculation.exec())
+
+    # Assert
+    # Both histories keep one result per entry; the difference is the 98 calculations not created.
+    assert len({id(calculation) for calculation in history}) == 2
+    assert sizeof(separate) - sizeof(history) >= 98 * sys.getsizeof(MulCalculation(7.0, 6.0))
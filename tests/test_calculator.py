@@ -40,10 +40,30 @@ Usage:
         -       : Subtracts the second number from the first.
         *       : Multiplies two numbers.
         /       : Divides the first number by the second.
+        **      : Raises the first number to the power of the second.
+        !       : Factorial ("5 !"), or a multifactorial stepping by the second number ("9 ! 2").
+        gcd     : Greatest common divisor of two integers.
+        choose  : Binomial coefficient ("52 choose 5").
+    - Append "mod <m>" to work modulo m, e.g. "3 ** 1000 mod 7".
 
 Special Commands:
     help      : Display this help message.
     history   : Show the history of calculations.
+    undo      : Remove the last calculation from the history.
+    redo      : Restore the last undone calculation.
+    snapshot <name> : Save the current history under a name.
+    restore <name>  : Return the history to a named snapshot.
+    export <file> [binary|csv|ndjson] [float32] : Write the history to a file.
+    cache     : Show result cache statistics.
+    profile on [memory] | off | dump <file> : Profile calculations (and allocations).
+    memory    : Show memory held by history, cache and variables.
+    bench [count=N seed=N mix=+:4,*:1 operands=uniform|int|lognormal errors=R depth=N] : Run a synthetic load.
+    memory limit <history|cache|variables> <entries|size|none> [fifo|lru|size] : Cap memory use.
+    mode [int|float] : Parse integers exactly (int) or as floating point (float).
+    stats [results] | stats reset : Show (or clear) running statistics of the results.
+    run <file> : Run a script of calculations and "name = expression" assignments.
+    trace on [rate] | off | dump <file> | clear : Sample evaluations and record a span per stage.
+    save <file> | load <file> : Checkpoint the session (history, variables, settings) or restore one.
     exit      : Exit the calculator.
 
 Examples:
@@ -389,7 +409,7 @@ def test_calculator_unexpected_exception(monkeypatch, capsys):
         def __str__(self):
             return "MockCalculation"
 
-    def mock_create_calculation(operation, a, b):
+    def mock_create_calculation(operation, a, b, intern=False):
         return MockCalculation()
 
     monkeypatch.setattr('app.calculation.CalculationFactory.create_calculation', mock_create_calculation)
@@ -420,3 +440,52 @@ def test_parse_input_div():
 def test_parse_input_invalid_operator(): 
     with pytest.raises(ValueError):
         parse_input("1 % 2")
+
+@pytest.mark.parametrize("inputs, expected", [
+    ("10+5", ("add", 10.0, 5.0)),
+    ("-3*-2", ("mul", -3.0, -2.0)),
+    ("1e3/0x10", ("div", 1000.0, 16.0)),
+    ("1_000 - .5", ("sub", 1000.0, 0.5)),
+    ("10 -5", ("sub", 10.0, 5.0)),
+    ("inf+1", ("add", float('inf'), 1.0)),
+])
+def test_parse_input_unspaced(inputs, expected):
+    output = parse_input(inputs)
+    assert expected == output
+
+@pytest.mark.parametrize("inputs, message", [
+    ("", "incomplete expression at position 0"),
+    ("1 +", "incomplete expression at position 3"),
+    ("add ten five", "expected a number at position 0"),
+    ("1 2 3", "expected an operation at position 2"),
+    ("1 + x", "expected a number at position 4"),
+    ("1+2 3", "unexpected '3' at position 4"),
+    ("2%3", "Unsupported operation."),
+])
+def test_parse_input_error_positions(inputs, message):
+    with pytest.raises(ValueError, match=message):
+        parse_input(inputs)
+
+@pytest.mark.parametrize("inputs, expected", [
+    ("10 + 5", (("add", 10.0, 5.0), None)),
+    ("-3*-2", (("mul", -3.0, -2.0), None)),
+    ("3 ^ 3", (None, "Unsupported operation.")),
+    ("3^3", (None, "Unsupported operation.")),
+    ("ten + 5", (None, "Wrong expression format: expected a number at position 0.")),
+])
+def test_try_parse_input(inputs, expected):
+    assert try_parse_input(inputs) == expected
+
+@pytest.mark.parametrize("inputs", ["1 +- 2", "1 ? 2", "3 ^ 3", "1 x 2", "2 km 5", "1 +", "1 + 2 3"])
+def test_try_parse_input_matches_parse_input_errors(inputs):
+    """
+    Test that try_parse_input returns the message parse_input raises, whichever path parses the input.
+    """
+    # Act
+    parsed, error = try_parse_input(inputs)
+
+    # Assert
+    assert parsed is None
+    with pytest.raises(ValueError) as raised:
+        parse_input(inputs)
+    assert str(raised.value) == error
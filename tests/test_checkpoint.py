@@ -0,0 +1,278 @@
+# tests/test_checkpoint.py
+
+"""
+Unit tests for session checkpoints using pytest.
+
+These tests cover restoring history, variables and settings, loading without building
+calculations, saving a loaded session again with undo, redo and snapshots around it,
+checkpoints written under other registered operations, the data-only JSON state,
+invalid files, and the save and load commands in the REPL with the checkpoint written
+on exit.
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+import json
+import pickle
+import pytest
+from io import StringIO
+from app.calculation import Calculation, CalculationFactory
+from app.calculator import Calculator, evaluate_input
+from app.checkpoint import load_session, save_session
+from app.history import LazyNode
+from app.session import Session
+import app.checkpoint as checkpoint
+
+
+def entries(session):
+    return [str(calculation) for calculation in session.history]
+
+
+@pytest.fixture
+def session(capsys):
+    session = Session(max_history=50, max_variables=10, variable_policy='fifo')
+    for expression in ("1.5 + 2", "3 * 4", "1.5 + 2", "10 km + 500 m", "-0.0 * 1"):
+        evaluate_input(expression, session.history)
+    session.exact = True
+    evaluate_input("2 ** 100", session.history, exact=True)
+    evaluate_input("3 ** 1000 mod 7", session.history, exact=True)
+    rate = CalculationFactory.create_calculation('fx', 10.0, 978.0)
+    rate.value = 0.5
+    session.history.append(rate, rate.exec())
+    session.variables['x'] = 2.5
+    session.variables['y'] = 10 ** 30
+    session.tracer.start(0.5)
+    session.tracer.stop()
+    return session
+
+
+def test_round_trip(session, tmp_path):
+    """
+    Test that history, statistics, variables and settings come back as they were saved.
+    """
+    # Arrange
+    path = str(tmp_path / "session.ckpt")
+
+    # Act
+    saved = save_session(session, path)
+    restored = Session()
+    loaded = load_session(restored, path)
+
+    # Assert
+    assert saved == loaded == 8
+    assert entries(restored) == entries(session)
+    assert restored.history.stats.count == session.history.stats.count
+    assert restored.history.stats.mean == session.history.stats.mean
+    assert list(restored.variables.items()) == [('x', 2.5), ('y', 10 ** 30)]
+    assert restored.variables.policy.name == 'fifo' and restored.variables.max_entries == 10
+    assert restored.history.max_entries == 50 and restored.exact
+    assert restored.tracer.sample_rate == 0.5 and not restored.tracer.enabled
+    assert str(restored.history.last()) == "FxCalculation: 10.0 Fx 978.0 = 5.0"
+
+
+def test_load_builds_calculations_lazily(session, tmp_path, monkeypatch):
+    """
+    Test that loading builds no float calculation, reading one builds only that one, and repeats are shared.
+    """
+    # Arrange
+    path = str(tmp_path / "session.ckpt")
+    save_session(session, path)
+    created = []
+    create = CalculationFactory.create_calculation
+    monkeypatch.setattr(CalculationFactory, 'create_calculation',
+                        lambda *args, **kwargs: created.append(args) or create(*args, **kwargs))
+    restored = Session()
+
+    # Act
+    load_session(restored, path)
+    after_load = len(created)
+    head = restored.history.state().head
+    second = head.previous.previous.previous.previous.previous.previous.calculation
+    calculations = list(restored.history)
+
+    # Assert
+    # Rows that are not plain floats are decoded with the state: exact integers, units, moduli and fx.
+    assert [args[0] for args in created[:after_load]] == ['add', 'pow', 'pow', 'fx']
+    assert created[1][1:] == (2, 100)
+    assert isinstance(head, LazyNode) and isinstance(head.entries, checkpoint._Rows)
+    assert second is calculations[1] and str(second) == "MulCalculation: 3.0 Mul 4.0 = 12.0"
+    assert calculations[0] is calculations[2]
+    assert len(created) == after_load + 3
+
+
+def test_save_after_load_with_undo_redo_and_snapshots(session, tmp_path, monkeypatch, capsys):
+    """
+    Test that a loaded session saves again, building only rows past its current end, with entries, undo,
+    redo and snapshots added since.
+    """
+    # Arrange
+    first, second = str(tmp_path / "first.ckpt"), str(tmp_path / "second.ckpt")
+    session.history.snapshot('early')
+    save_session(session, first)
+    restored = Session()
+    load_session(restored, first)
+    history = restored.history
+    history.snapshot('loaded')
+    history.undo()
+    history.undo()
+    evaluate_input("7 - 1", history)
+    history.snapshot('branch')
+    evaluate_input("8 - 1", history)
+    history.undo()
+    created = []
+    entry = checkpoint._Rows.entry
+    monkeypatch.setattr(checkpoint._Rows, 'entry', lambda rows, k: created.append(k) or entry(rows, k))
+
+    # Act
+    rows = save_session(restored, second)
+    monkeypatch.undo()
+    final = Session()
+    load_session(final, second)
+
+    # Assert
+    # Only the two undone rows that the 'loaded' snapshot still holds are read.
+    assert rows == 7 and len(created) == 2
+    assert entries(final) == entries(restored)
+    assert str(final.history.redo()) == "SubCalculation: 8.0 Sub 1.0 = 7.0"
+    for name in ('early', 'loaded', 'branch'):
+        final.history.restore(name)
+        history.restore(name)
+        assert entries(final) == entries(restored), name
+    assert final.history.snapshots() == ['early', 'loaded', 'branch']
+
+
+def test_save_under_other_operations(tmp_path, monkeypatch, capsys):
+    """
+    Test that rows saved while other operations were registered are rewritten with today's opcodes.
+    """
+    # Arrange
+    path, again = str(tmp_path / "old.ckpt"), str(tmp_path / "new.ckpt")
+
+    def register(*names):
+        monkeypatch.setattr(CalculationFactory, '_calculations', dict(CalculationFactory._calculations))
+        monkeypatch.setattr(CalculationFactory, '_opcodes', list(CalculationFactory._opcodes))
+        for name in names:
+            @CalculationFactory.register_calculation(name)
+            class Twice(Calculation):
+                def exec(self):
+                    return 2 * self.a + self.b
+
+    register('twice')
+    old = Session()
+    evaluate_input("3 twice 1", old.history)
+    evaluate_input("3 + 1", old.history)
+    save_session(old, path)
+    monkeypatch.undo()
+    with pytest.raises(ValueError, match="uses an unknown calculation type: 'twice'"):
+        load_session(Session(), path)
+    register('other', 'twice')
+    restored = Session()
+    load_session(restored, path)
+
+    # Act
+    save_session(restored, again)
+    final = Session()
+    load_session(final, again)
+
+    # Assert
+    assert entries(final) == entries(old) and len(final.history) == 2
+    assert CalculationFactory.get_calculation('twice').opcode == len(CalculationFactory.calculation_types()) - 1
+
+
+def test_empty_session(tmp_path):
+    """
+    Test saving and loading a session without any history.
+    """
+    # Arrange
+    path = str(tmp_path / "empty.ckpt")
+    session = Session()
+    evaluate_input("1 + 1", session.history)
+
+    # Act
+    rows = save_session(Session(), path)
+    load_session(session, path)
+
+    # Assert
+    assert rows == 0 and len(session.history) == 0 and session.history.last() is None
+
+
+@pytest.mark.parametrize("content, message", [
+    (b"short", "is not a calculator checkpoint"),
+    (b"NOTCALCS" + bytes(24), "is not a calculator checkpoint"),
+    (b"CALCSESS\x03\x00" + bytes(22), "Unsupported checkpoint version: 3."),
+    (b"CALCSESS\x02\x00\x00\x00\x00\x00\x00\x00\x05" + bytes(15), "truncated or corrupt"),
+    (b"CALCSESS\x02\x00\x00\x00\x08\x00\x00\x00" + bytes(16) + b"garbage!", "truncated or corrupt"),
+    (b"CALCSESS\x02\x00\x00\x00\x08\x00\x00\x00" + bytes(16) + b'["list"]', "truncated or corrupt"),
+])
+def test_invalid_files(tmp_path, content, message):
+    """
+    Test that files that are not complete checkpoints are rejected.
+    """
+    # Arrange
+    path = tmp_path / "bad.ckpt"
+    path.write_bytes(content)
+
+    # Act & Assert
+    with pytest.raises(ValueError, match=message):
+        load_session(Session(), str(path))
+
+
+def test_state_is_data_only(session, tmp_path):
+    """
+    Test that the saved state is plain JSON, that bad values in it are rejected, and that pickled states
+    from the first version are refused unread.
+    """
+    # Arrange
+    path = tmp_path / "session.ckpt"
+    save_session(session, str(path))
+    data = path.read_bytes()
+    size = checkpoint._HEADER.unpack_from(data)[2]
+    state = json.loads(data[checkpoint._HEADER.size:checkpoint._HEADER.size + size])
+
+    def rewrite(state, version=checkpoint._VERSION):
+        blob = json.dumps(state).encode() if version == checkpoint._VERSION else state
+        header = checkpoint._HEADER.pack(checkpoint._MAGIC, version, len(blob), 0, 0)
+        path.write_bytes(header + blob + checkpoint._padding(len(blob)))
+        return str(path)
+
+    # Act & Assert
+    assert state['variables'][3] == [['x', 2.5], ['y', {'int': format(10 ** 30, 'x')}]]
+    assert {'mod': ['3', '7']} in [entry['a'] for entry in state['objects']]
+    for field, value in (('max_history', 0), ('max_history', '50'), ('evictions', 1.5), ('exact', 'yes')):
+        with pytest.raises(ValueError, match="truncated or corrupt"):
+            load_session(Session(), rewrite(dict(state, **{field: value})))
+    state['variables'][3][0][1] = {'code': "os.system('true')"}
+    with pytest.raises(ValueError, match="truncated or corrupt"):
+        load_session(Session(), rewrite(state))
+    with pytest.raises(ValueError, match="Unsupported checkpoint version: 1."):
+        load_session(Session(), rewrite(pickle.dumps(state), version=1))
+    with pytest.raises(ValueError, match="Cannot save a value of type 'str'."):
+        session.variables['name'] = 'text'
+        save_session(session, str(tmp_path / "other.ckpt"))
+
+
+def test_calculator_save_load_and_exit(tmp_path, monkeypatch, capsys):
+    """
+    Test the save and load commands, their errors, and the checkpoint written on exit.
+    """
+    # Arrange
+    path, on_exit = tmp_path / "s.ckpt", tmp_path / "exit.ckpt"
+    session = Session()
+    session.checkpoint = str(on_exit)
+    monkeypatch.setattr('sys.stdin', StringIO(f"6 * 7\nsave {path}\n1 + 1\nload {path}\nhistory\n"
+                                              f"load {tmp_path / 'missing.ckpt'}\nexit\n"))
+
+    # Act
+    with pytest.raises(SystemExit):
+        Calculator(session=session)
+
+    # Assert
+    captured = capsys.readouterr()
+    assert f"Saved 1 calculations to '{path}'." in captured.out
+    assert f"Loaded 1 calculations from '{path}'." in captured.out
+    assert "1. MulCalculation: 6.0 Mul 7.0 = 42.0" in captured.out and "AddCalculation" not in captured.out
+    assert "ERROR:  [Errno 2]" in captured.out
+    assert f"Saved 1 calculations to '{on_exit}'." in captured.out
+    restored = Session()
+    load_session(restored, str(on_exit))
+    assert entries(restored) == ["MulCalculation: 6.0 Mul 7.0 = 42.0"]
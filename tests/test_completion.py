@@ -0,0 +1,191 @@
+# tests/test_completion.py
+
+"""
+Unit tests for prefix completion using pytest.
+
+These tests cover the radix trie against a brute-force search of the entered lines,
+recency order and the cap on matches, completing command and operation names, the
+readline hooks, and the lines the REPL feeds to the completer.
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+import random
+import pytest
+from io import StringIO
+from app.calculator import Calculator
+from app.completion import Completer, PrefixTrie, install, readline
+import app.calculator as calculator
+
+
+def newest_matches(lines, prefix, limit):
+    matches = []
+    for line in reversed(lines):
+        if line.startswith(prefix) and line not in matches:
+            matches.append(line)
+    return matches[:limit]
+
+
+def test_trie_matches_brute_force():
+    """
+    Test that every prefix gets the newest distinct lines starting with it.
+    """
+    # Arrange
+    rng = random.Random(3)
+    lines = [f"{rng.randint(1, 120)} {rng.choice('+-*/')} {rng.randint(1, 30)}" for _ in range(3000)]
+    trie = PrefixTrie(max_matches=5)
+
+    # Act
+    for line in lines:
+        trie.add(line)
+
+    # Assert
+    prefixes = {line[:cut] for line in rng.sample(lines, 200) for cut in range(len(line) + 1)}
+    for prefix in sorted(prefixes) + ["7 % ", "1000"]:
+        assert trie.complete(prefix) == newest_matches(lines, prefix, 5), prefix
+
+
+def test_trie_drops_least_recent_lines():
+    """
+    Test that a trie over its line cap forgets the least recently entered lines and still matches a
+    brute-force search of the lines it keeps.
+    """
+    # Arrange
+    rng = random.Random(5)
+    lines = [f"{rng.randint(1, 60)} {rng.choice('+-*/')} {rng.randint(1, 9)}" for _ in range(3000)]
+    trie = PrefixTrie(max_matches=4, max_lines=50)
+
+    # Act
+    for line in lines:
+        trie.add(line)
+
+    # Assert
+    kept = list(dict.fromkeys(reversed(lines)))[:50]
+    assert len(trie) == 50
+    prefixes = {line[:cut] for line in lines[-300:] for cut in range(len(line) + 1)}
+    for prefix in sorted(prefixes):
+        assert trie.complete(prefix) == [line for line in kept if line.startswith(prefix)][:4], prefix
+    assert trie.complete(kept[-1]) == [kept[-1]]
+    assert trie.complete("".join(sorted(set(lines) - set(kept))[:1])) == []
+
+
+def test_trie_line_cap_removes_whole_branches():
+    """
+    Test that forgetting a line removes the nodes only it used.
+    """
+    # Arrange
+    trie = PrefixTrie(max_matches=2, max_lines=2)
+
+    # Act
+    for line in ("10 * 3", "10 * 30", "2 ** 8", "", "7"):
+        trie.add(line)
+
+    # Assert
+    assert len(trie) == 2 and trie.complete("") == ["7", ""]
+    assert sorted(trie._root.children) == ['7']
+    assert trie.complete("1") == [] and trie.complete("2") == []
+
+
+def test_trie_recency_and_splits():
+    """
+    Test that re-entering a line moves it to the front and that lines ending inside an edge are found.
+    """
+    # Arrange
+    trie = PrefixTrie(max_matches=3)
+
+    # Act
+    for line in ("10 * 3", "10 * 30", "10", "10 + 1", "10 * 3", "2 ** 8"):
+        trie.add(line)
+
+    # Assert
+    assert trie.complete("10") == ["10 * 3", "10 + 1", "10"]
+    assert trie.complete("10 *") == ["10 * 3", "10 * 30"]
+    assert trie.complete("10 * 30") == ["10 * 30"]
+    assert trie.complete("") == ["2 ** 8", "10 * 3", "10 + 1"]
+    assert trie.complete("10 -") == [] and trie.complete("3") == []
+
+
+def test_completer_adds_command_and_operation_names():
+    """
+    Test that lines come first, then names for the word being typed, without duplicates.
+    """
+    # Arrange
+    completer = Completer(words=('history', 'help', 'choose', 'gcd'))
+    for line in ("52 choose 5", "help"):
+        completer.add(line)
+
+    # Act & Assert
+    assert completer.complete("52 ch") == ["52 choose 5", "52 choose"]
+    assert completer.complete("h") == ["help", "history"]
+    assert completer.complete("help") == []
+    assert completer.complete("5 ") == []
+    assert completer.complete("") == ["help", "52 choose 5"]
+
+
+def test_readline_complete_states():
+    """
+    Test the readline protocol of asking for match 0, 1, ... until None.
+    """
+    # Arrange
+    completer = Completer(words=('gcd', 'greet'))
+
+    # Act
+    matches = []
+    state = 0
+    while (match := completer.readline_complete("4 g", state)) is not None:
+        matches.append(match)
+        state += 1
+
+    # Assert
+    assert matches == ["4 gcd", "4 greet"]
+
+
+@pytest.mark.skipif(readline is None, reason="readline is not available")
+def test_install_only_on_a_terminal(monkeypatch):
+    """
+    Test that readline is only set up when input comes from a terminal.
+    """
+    # Arrange
+    completer = Completer()
+    monkeypatch.setattr('sys.stdin', StringIO())
+    piped = install(completer)
+
+    class Terminal(StringIO):
+        def isatty(self):
+            return True
+
+    monkeypatch.setattr('sys.stdin', Terminal())
+    previous = readline.get_completer(), readline.get_completer_delims()
+
+    # Act
+    try:
+        installed = install(completer)
+        hooked = readline.get_completer()
+        delimiters = readline.get_completer_delims()
+    finally:
+        readline.set_completer(previous[0])
+        readline.set_completer_delims(previous[1])
+
+    # Assert
+    assert not piped and installed
+    assert hooked == completer.readline_complete and delimiters == ''
+
+
+def test_calculator_feeds_completer(monkeypatch, capsys):
+    """
+    Test that the REPL completes from the lines entered in it and from its command names.
+    """
+    # Arrange
+    completers = []
+    monkeypatch.setattr(calculator, 'install_completion', completers.append)
+    monkeypatch.setattr('sys.stdin', StringIO("10 * 3\n10 * 4\nhistory\nexit\n"))
+
+    # Act
+    with pytest.raises(SystemExit):
+        Calculator()
+
+    # Assert
+    [completer] = completers
+    assert completer.complete("10 *") == ["10 * 4", "10 * 3"]
+    assert completer.complete("10 ch") == ["10 choose"]
+    assert completer.complete("tr") == ["trace"]
@@ -0,0 +1,117 @@
+# tests/test_corpus.py
+
+"""
+Unit tests for the parser fuzzing corpus using pytest.
+
+These tests cover deterministic corpus generation, writing and reading corpus files,
+the harness that separates documented rejections from crashes, and a seeded run of
+parse_input over generated valid and malformed input.
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+import random
+from app.calculator import parse_input
+from app.corpus import (check_corpus, generate_corpus, malformed_line, read_corpus, valid_line,
+                        write_corpus)
+
+
+def test_generate_corpus_is_deterministic():
+    """
+    Test that the same seed produces the same corpus and lines never contain newlines.
+    """
+    # Act
+    first = list(generate_corpus(2000, seed=5))
+    second = list(generate_corpus(2000, seed=5))
+
+    # Assert
+    assert first == second
+    assert first != list(generate_corpus(2000, seed=6))
+    assert not any('\n' in line for line in first)
+
+
+def test_valid_lines_parse():
+    """
+    Test that every generated valid line is accepted by parse_input.
+    """
+    # Arrange
+    rng = random.Random(1)
+
+    # Act & Assert
+    for _ in range(5000):
+        line = valid_line(rng)
+        assert parse_input(line)[0] in ('add', 'sub', 'mul', 'div'), line
+
+
+def test_parse_input_survives_the_corpus():
+    """
+    Test that parse_input only ever fails with its documented errors.
+    """
+    # Act
+    report = check_corpus(generate_corpus(20_000, seed=11, malformed_ratio=0.7))
+
+    # Assert
+    assert report.ok, str(report)
+    assert report.accepted > 0 and report.rejected > 0
+    assert report.accepted + report.rejected == report.lines == 20_000
+
+
+def test_malformed_lines_cover_every_mutation():
+    """
+    Test that malformed lines include truncations, junk runs and oversized literals.
+    """
+    # Arrange
+    rng = random.Random(2)
+
+    # Act
+    lines = [malformed_line(rng) for _ in range(2000)]
+
+    # Assert
+    assert any(len(line) > 1000 and set(line) <= set('+-*/') for line in lines)
+    assert any(line.startswith('0x') and len(line) > 200 for line in lines)
+    assert any(line.startswith('(((') for line in lines)
+    assert any(line.startswith(' ' * 100) for line in lines)
+
+
+def test_write_and_read_corpus(tmp_path):
+    """
+    Test that a corpus file round-trips line for line.
+    """
+    # Arrange
+    path = tmp_path / "corpus.txt"
+
+    # Act
+    written = write_corpus(str(path), 500, seed=3)
+    lines = list(read_corpus(str(path)))
+
+    # Assert
+    assert written == 500
+    assert lines == list(generate_corpus(500, seed=3))
+
+
+def test_check_corpus_reports_crashes_and_slow_inputs():
+    """
+    Test that undocumented errors are reported as crashes along with the slowest inputs.
+    """
+    # Arrange
+    def parse(line):
+        if line == 'boom':
+            raise KeyError(line)
+        if line == 'odd':
+            raise ValueError("Something else.")
+        return parse_input(line)
+
+    # Act
+    report = check_corpus(['1 + 2', '1 ? 2', 'boom', 'odd'], parse=parse, slow_limit=2)
+    text = str(report)
+
+    # Assert
+    assert not report.ok
+    assert (report.accepted, report.rejected) == (1, 1)
+    assert report.crashes == [('boom', "KeyError: 'boom'"), ('odd', "ValueError: Something else.")]
+    assert len(report.slowest) == 2
+    assert report.slowest[0][0] >= report.slowest[1][0]
+    assert "Parsed 4 lines in" in text and "2 undocumented errors." in text
+    assert "'boom': KeyError: 'boom'" in text
+    assert "Slowest inputs:" in text
+    assert check_corpus([]).throughput == 0.0
@@ -0,0 +1,125 @@
+# tests/test_engine.py
+
+"""
+Unit tests for the flat dispatch engine using pytest.
+
+These tests cover agreement with the batch API on results, statuses and messages,
+unknown opcodes, calculations registered without a plain function, recording to a
+history only when one is given, and column length checks.
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+import math
+import pytest
+from array import array
+from app.batch import CALCULATION_ERROR, INVALID_OPERANDS, OK, UNSUPPORTED_OPERATION, evaluate_columns
+from app.calculation import Calculation, CalculationFactory
+from app.engine import Engine, dispatch_table
+from app.history import History
+from app.integers import Mod
+from app.units import Quantity
+import app.calculation as calculation
+
+
+def opcode(name):
+    return CalculationFactory.get_calculation(name).opcode
+
+
+ROWS = [
+    ('add', 2, 3), ('sub', 2, 5), ('mul', 1.5, 4), ('div', 7, 2), ('div', 1, 0), ('pow', 2, 10),
+    ('pow', 10.0, 1000.0), ('fact', 5, 1), ('fact', -1, 1), ('gcd', 12, 18), ('choose', 5, 2), ('fx', 10, 978),
+    ('fact', 1e20, 2.0), ('choose', 1e308, 5.0), ('pow', Mod(3, 7), 2),
+    ('add', Quantity(5.0, 'km'), Quantity(300.0, 'm')),
+]
+
+
+def test_engine_matches_batch():
+    """
+    Test that every row gets the same result, status and message as from the batch API.
+    """
+    # Arrange
+    names, a_values, b_values = zip(*ROWS)
+    expected = evaluate_columns(names, a_values, b_values)
+
+    # Act
+    batch = Engine().run_columns(array('B', map(opcode, names)), a_values, b_values)
+
+    # Assert
+    assert list(batch.status) == list(expected.status)
+    assert batch.errors == expected.errors
+    assert all(x == y or (math.isnan(x) and math.isnan(y)) for x, y in zip(batch.results, expected.results))
+    assert list(batch.status[:4]) == [OK] * 4 and batch.status[4] == INVALID_OPERANDS
+    assert batch.status[6] == INVALID_OPERANDS and list(batch.status[-5:-2]) == [INVALID_OPERANDS] * 3
+    assert list(batch.status[-2:]) == [CALCULATION_ERROR] * 2
+    assert batch.errors[-2] == "Cannot store the result 2 (mod 7) in a float column."
+    assert batch.errors[-1].startswith("Cannot store the result 5.3 km in a float column")
+
+
+def test_unknown_opcodes():
+    """
+    Test that opcodes outside the table are reported per row without stopping the rest.
+    """
+    # Act
+    batch = Engine().run_rows([(200, 1, 2), (-1, 1, 2), (None, 1, 2), ([0], 1, 2), (opcode('add'), 1, 2)])
+
+    # Assert
+    assert list(batch.status) == [UNSUPPORTED_OPERATION] * 4 + [OK]
+    assert batch.errors[0] == "Unknown opcode: 200." and batch.errors[1] == "Unknown opcode: -1."
+    assert batch.results[-1] == 3.0
+
+
+def test_history_only_when_requested(monkeypatch):
+    """
+    Test that no Calculation is created without a history, and that rows which succeed are recorded with one.
+    """
+    # Arrange
+    created = []
+    create = CalculationFactory.create_calculation
+    monkeypatch.setattr(CalculationFactory, 'create_calculation',
+                        lambda *args, **kwargs: created.append(args) or create(*args, **kwargs))
+    engine = Engine()
+    rows = [(opcode('mul'), 6, 7), (opcode('div'), 1, 0), (opcode('mul'), 6, 7)]
+    history = History()
+
+    # Act
+    engine.run_rows(rows)
+    without = len(created)
+    engine.run_rows(rows, history=history)
+
+    # Assert
+    assert without == 0 and len(created) == 2
+    assert [str(entry) for entry in history] == ["MulCalculation: 6 Mul 7 = 42"] * 2
+    assert list(history)[0] is list(history)[1]
+    assert history.stats.count == 2
+
+
+def test_calculation_without_function(monkeypatch):
+    """
+    Test that a calculation registered without a plain function still runs through an instance.
+    """
+    # Arrange
+    monkeypatch.setattr(CalculationFactory, '_calculations', dict(CalculationFactory._calculations))
+    monkeypatch.setattr(CalculationFactory, '_opcodes', list(CalculationFactory._opcodes))
+
+    @CalculationFactory.register_calculation('hypot')
+    class HypotCalculation(Calculation):
+        def exec(self):
+            return math.hypot(self.a, self.b)
+
+    # Act
+    table = dispatch_table()
+    batch = Engine().run_rows([(HypotCalculation.opcode, 3, 4)])
+
+    # Assert
+    assert table[opcode('add')] is calculation.Operation.add
+    assert list(batch.results) == [5.0] and list(batch.status) == [OK]
+
+
+def test_columns_must_have_same_length():
+    """
+    Test that columns of different lengths are rejected before any row runs.
+    """
+    # Act & Assert
+    with pytest.raises(ValueError, match="Columns must have the same length."):
+        Engine().run_columns(array('B', [0, 0]), [1.0], [2.0])
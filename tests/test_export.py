@@ -0,0 +1,234 @@
+# tests/test_export.py
+
+"""
+Unit tests for the history export module using pytest.
+
+These tests cover the columnar binary format (round trip, header validation), the
+recorded results and refused units of exported histories, and the CSV and NDJSON
+exports, as well as the REPL export command.
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+import csv
+import json
+import pytest
+from io import StringIO
+from app.calculation import AddCalculation, CalculationFactory, DivCalculation, MulCalculation
+from app.calculator import Calculator
+from app.export import Columns, export_history, format_for_path, read_binary, read_export, write_binary
+from app.history import History
+from app.units import Quantity
+
+
+@pytest.fixture
+def history():
+    return [AddCalculation(10.0, 5.0), MulCalculation(7.0, 8.0), DivCalculation(1.0, 4.0)]
+
+
+def test_columns_from_history(history):
+    """
+    Test that a history is turned into contiguous typed columns.
+    """
+    # Act
+    columns = Columns.from_history(history)
+
+    # Assert
+    assert len(columns) == 3
+    assert columns.opcodes.typecode == 'B'
+    assert list(columns.a) == [10.0, 7.0, 1.0]
+    assert list(columns.results) == [15.0, 56.0, 0.25]
+    assert list(columns.rows())[1] == ('mul', 7.0, 8.0, 56.0)
+
+
+def test_columns_from_history_use_recorded_results(monkeypatch):
+    """
+    Test that a History exports the results its entries were recorded with, running only entries without one.
+    """
+    # Arrange
+    history = History()
+    history.append(AddCalculation(10.0, 5.0), 15.0)
+    history.append(MulCalculation(7.0, 8.0))
+    history.append(DivCalculation(1.0, 4.0), 0.25)
+    history.undo()
+    history.redo()
+    runs = []
+    monkeypatch.setattr(AddCalculation, 'exec', lambda self: runs.append(self) or 0.0)
+    monkeypatch.setattr(DivCalculation, 'exec', lambda self: runs.append(self) or 0.0)
+
+    # Act
+    columns = Columns.from_history(history)
+
+    # Assert
+    assert list(columns.results) == [15.0, 56.0, 0.25] and runs == []
+
+
+def test_columns_refuse_units():
+    """
+    Test that calculations with units are not exported as bare SI values.
+    """
+    # Arrange
+    calculation = CalculationFactory.create_calculation('add', Quantity(5.0, 'km'), Quantity(300.0, 'm'))
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="Cannot export calculations with units such as .*no unit column"):
+        Columns.from_history([AddCalculation(1.0, 2.0), calculation])
+
+
+def test_binary_round_trip(history, tmp_path):
+    """
+    Test that a binary export reads back to the same columns.
+    """
+    # Arrange
+    path = str(tmp_path / "history.calc")
+
+    # Act
+    rows = export_history(history, path)
+    columns = read_binary(path)
+
+    # Assert
+    assert rows == 3
+    assert list(columns.rows()) == [('add', 10.0, 5.0, 15.0), ('mul', 7.0, 8.0, 56.0), ('div', 1.0, 4.0, 0.25)]
+
+
+def test_binary_round_trip_empty(tmp_path):
+    """
+    Test exporting an empty history.
+    """
+    # Arrange
+    path = str(tmp_path / "empty.calc")
+    write_binary(Columns([]), path)
+
+    # Act
+    columns = read_binary(path)
+
+    # Assert
+    assert len(columns) == 0
+    assert columns.names == []
+
+
+def test_csv_export(history, tmp_path):
+    """
+    Test the CSV export.
+    """
+    # Arrange
+    path = str(tmp_path / "history.csv")
+
+    # Act
+    export_history(history, path)
+
+    # Assert
+    with open(path, newline='') as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == ['operation', 'a', 'b', 'result']
+    assert rows[1] == ['add', '10.0', '5.0', '15.0']
+
+
+def test_ndjson_export(history, tmp_path):
+    """
+    Test the NDJSON export with an explicit format.
+    """
+    # Arrange
+    path = str(tmp_path / "history.out")
+
+    # Act
+    export_history(history, path, 'ndjson')
+
+    # Assert
+    with open(path) as f:
+        rows = [json.loads(line) for line in f]
+    assert rows[2] == {'operation': 'div', 'a': 1.0, 'b': 4.0, 'result': 0.25}
+
+
+@pytest.mark.parametrize("path, expected", [
+    ("out.csv", 'csv'),
+    ("out.NDJSON", 'ndjson'),
+    ("out.jsonl", 'ndjson'),
+    ("out.bin", 'binary'),
+    ("out", 'binary'),
+])
+def test_format_for_path(path, expected):
+    """
+    Test that the format is inferred from the file extension.
+    """
+    # Act & Assert
+    assert format_for_path(path) == expected
+
+
+def test_export_unsupported_format(history, tmp_path):
+    """
+    Test that an unknown format is rejected.
+    """
+    # Act & Assert
+    with pytest.raises(ValueError, match="Unsupported export format: 'xml'"):
+        export_history(history, str(tmp_path / "out"), 'xml')
+
+
+@pytest.mark.parametrize("content, message", [
+    (b"short", "is not a calculator export"),
+    (b"NOTCALCS" + bytes(16), "is not a calculator export"),
+    (b"CALCCOLS\x03\x00" + bytes(14), "Unsupported export version: 3."),
+    (b"CALCCOLS\x01\x00\x00\x00\x00\x00\x00\x00\x05" + bytes(7), "truncated or corrupt"),
+])
+def test_read_binary_invalid(tmp_path, content, message):
+    """
+    Test that invalid binary files are rejected.
+    """
+    # Arrange
+    path = tmp_path / "bad.calc"
+    path.write_bytes(content)
+
+    # Act & Assert
+    with pytest.raises(ValueError, match=message):
+        read_binary(str(path))
+
+
+def test_calculator_export_command(monkeypatch, capsys, tmp_path):
+    """
+    Test the REPL export command, including an error.
+    """
+    # Arrange
+    path = tmp_path / "session.csv"
+    user_input = f'10 + 5\nexport {path}\nexport {tmp_path}/x.out xml\nexit\n'
+    monkeypatch.setattr('sys.stdin', StringIO(user_input))
+
+    # Act
+    with pytest.raises(SystemExit):
+        Calculator()
+
+    # Assert
+    captured = capsys.readouterr()
+    assert f"Exported 1 calculations to '{path}'." in captured.out
+    assert "Unsupported export format: 'xml'" in captured.out
+    assert path.read_text().splitlines()[1] == 'add,10.0,5.0,15.0'
+
+
+@pytest.mark.parametrize("name", ["history.calc", "history.csv", "history.ndjson"])
+def test_read_export_round_trip(history, tmp_path, name):
+    """
+    Test that every export format reads back into the same rows.
+    """
+    # Arrange
+    path = str(tmp_path / name)
+    export_history(history, path)
+
+    # Act
+    columns = read_export(path)
+
+    # Assert
+    assert list(columns.rows()) == [('add', 10.0, 5.0, 15.0), ('mul', 7.0, 8.0, 56.0), ('div', 1.0, 4.0, 0.25)]
+
+
+def test_read_export_errors(tmp_path):
+    """
+    Test reading a CSV without the export header and an unknown format.
+    """
+    # Arrange
+    path = tmp_path / "other.csv"
+    path.write_text("x,y\n1,2\n")
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="is not a calculator CSV export"):
+        read_export(str(path))
+    with pytest.raises(ValueError, match="Unsupported export format"):
+        read_export(str(path), 'xml')
@@ -0,0 +1,202 @@
+# tests/test_history.py
+
+"""
+Unit tests for the persistent calculation history using pytest.
+
+These tests cover appending, undo and redo, named snapshots and restore, and check
+that snapshots share structure with the live history instead of copying it.
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+import pytest
+from io import StringIO
+from app.calculation import AddCalculation, MulCalculation, SubCalculation
+from app.calculator import Calculator
+from app.history import History, HistoryState, LazyNode
+
+
+@pytest.fixture
+def calculations():
+    return [AddCalculation(1.0, 2.0), SubCalculation(5.0, 3.0), MulCalculation(2.0, 4.0)]
+
+
+def test_history_append_and_iterate(calculations):
+    """
+    Test that calculations are iterated oldest first.
+    """
+    # Arrange
+    history = History()
+
+    # Act
+    for calculation in calculations:
+        history.append(calculation)
+
+    # Assert
+    assert len(history) == 3
+    assert list(history) == calculations
+    assert history.last() is calculations[-1]
+
+
+def test_history_empty():
+    """
+    Test an empty history.
+    """
+    # Arrange
+    history = History()
+
+    # Act & Assert
+    assert not history
+    assert list(history) == []
+    assert history.last() is None
+    assert history.undo() is None
+    assert history.redo() is None
+
+
+def test_history_undo_redo(calculations):
+    """
+    Test that undo removes the newest calculation and redo brings it back.
+    """
+    # Arrange
+    history = History()
+    for calculation in calculations:
+        history.append(calculation)
+
+    # Act
+    undone = [history.undo(), history.undo()]
+    redone = history.redo()
+
+    # Assert
+    assert undone == [calculations[2], calculations[1]]
+    assert redone is calculations[1]
+    assert list(history) == calculations[:2]
+
+
+def test_history_append_clears_redo(calculations):
+    """
+    Test that appending after an undo starts a new branch.
+    """
+    # Arrange
+    history = History()
+    history.append(calculations[0])
+    history.append(calculations[1])
+    history.undo()
+
+    # Act
+    history.append(calculations[2])
+
+    # Assert
+    assert history.redo() is None
+    assert list(history) == [calculations[0], calculations[2]]
+
+
+def test_history_snapshot_and_restore(calculations):
+    """
+    Test restoring a named snapshot after further changes.
+    """
+    # Arrange
+    history = History()
+    history.append(calculations[0])
+    history.snapshot('start')
+    history.append(calculations[1])
+    history.append(calculations[2])
+
+    # Act
+    history.restore('start')
+
+    # Assert
+    assert list(history) == [calculations[0]]
+    assert history.snapshots() == ['start']
+    assert history.redo() is None
+
+
+def test_history_snapshot_shares_structure(calculations):
+    """
+    Test that a snapshot points at the same nodes as the history it was taken from.
+    """
+    # Arrange
+    history = History()
+    for calculation in calculations:
+        history.append(calculation)
+
+    # Act
+    history.snapshot('all')
+    head = history._head
+    history.undo()
+    history.append(calculations[0])
+
+    # Assert
+    assert history._snapshots['all'] is head
+    assert history._head.previous is head.previous
+
+
+def test_history_state_round_trip(calculations):
+    """
+    Test that a history's state can be moved to another history, including one backed by a lazy sequence.
+    """
+    # Arrange
+    history = History()
+    for calculation in calculations:
+        history.append(calculation)
+    history.snapshot('two')
+    history.undo()
+    read = []
+
+    class Entries:
+        def __getitem__(self, index):
+            read.append(index)
+            return calculations[index]
+
+    # Act
+    copy = History()
+    copy.restore_state(history.state())
+    lazy = History()
+    lazy.restore_state(HistoryState(LazyNode(Entries(), 3), None, {'one': LazyNode(Entries(), 1)}))
+    last, first_reads = lazy.last(), list(read)
+    lazy.undo()
+    lazy.append(calculations[0])
+
+    # Assert
+    assert list(copy) == calculations[:2] and copy.redo() is calculations[2]
+    assert copy.snapshots() == ['two'] and history.redo() is calculations[2]
+    assert last is calculations[2] and first_reads == [2]
+    assert list(lazy) == [calculations[0], calculations[1], calculations[0]] and len(lazy) == 3
+    lazy.restore('one')
+    assert list(lazy) == calculations[:1]
+
+
+def test_history_restore_unknown_snapshot():
+    """
+    Test that restoring an unknown snapshot raises ValueError.
+    """
+    # Arrange
+    history = History()
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="No snapshot named 'missing'."):
+        history.restore('missing')
+
+
+def test_calculator_undo_redo_snapshot(monkeypatch, capsys):
+    """
+    Test the undo, redo, snapshot and restore REPL commands.
+    """
+    # Arrange
+    user_input = ('undo\nredo\n1 + 1\n2 + 2\nsnapshot Two\nundo\nredo\n3 + 3\n'
+                  'restore Two\nhistory\nrestore nope\nexit\n')
+    monkeypatch.setattr('sys.stdin', StringIO(user_input))
+
+    # Act
+    with pytest.raises(SystemExit):
+        Calculator()
+
+    # Assert
+    captured = capsys.readouterr()
+    assert "Nothing to undo." in captured.out
+    assert "Nothing to redo." in captured.out
+    assert "Saved snapshot 'Two' (2 calculations)." in captured.out
+    assert "Undid: AddCalculation: 2.0 Add 2.0 = 4.0" in captured.out
+    assert "Redid: AddCalculation: 2.0 Add 2.0 = 4.0" in captured.out
+    assert "Restored snapshot 'Two' (2 calculations)." in captured.out
+    assert "3. AddCalculation" not in captured.out
+    assert "No snapshot named 'nope'." in captured.out
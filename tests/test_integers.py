@@ -0,0 +1,411 @@
+# tests/test_integers.py
+
+"""
+Unit tests for exact integer operations using pytest.
+
+These tests cover powers with size guards, the memoized factorial table and
+multifactorials, binomial coefficients, gcd, integers modulo m, abbreviated display
+of huge integers, integer mode in the parser and REPL, and exporting exact results.
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+import math
+import pytest
+from io import StringIO
+from app.bench import Workload
+from app.cache import ResultCache
+from app.calculation import BinomialCalculation, FactorialCalculation, GcdCalculation, PowCalculation
+from app.calculator import Calculator, evaluate_input, parse_input, try_parse_input
+from app.export import Columns
+from app.history import History
+from app.integers import Mod, binomial, factorial, format_value, gcd, power
+from concurrent.futures import ThreadPoolExecutor
+from app.session import Session
+from app.tokenizer import to_integer
+import app.integers as integers
+
+
+@pytest.mark.parametrize("base, exponent, expected", [
+    (2, 200, 2 ** 200),
+    (-3, 3, -27),
+    (1, 10 ** 12, 1),
+    (0, 0, 1),
+    (2, -1, 0.5),
+    (2.0, 10, 1024.0),
+    (Mod(3, 7), 1000, Mod(4, 7)),
+])
+def test_power(base, exponent, expected):
+    """
+    Test exact integer powers, float powers and modular powers.
+    """
+    # Act
+    result = power(base, exponent)
+
+    # Assert
+    assert result == expected and type(result) is type(expected)
+
+
+@pytest.mark.parametrize("base, exponent, error, message", [
+    (9, 99_999_999, ValueError, "Result would have about 95,424,250 digits"),
+    (10.0, 400.0, ValueError, "too large for a float; switch to 'mode int'"),
+    (-8.0, 0.5, ValueError, "is not a real number"),
+    (0, -1, ZeroDivisionError, "Division by zero"),
+    ('x', 2, ValueError, "Cannot raise x to the power 2."),
+])
+def test_power_errors(base, exponent, error, message):
+    """
+    Test that oversized, complex and undefined powers fail before any work is done.
+    """
+    # Act & Assert
+    with pytest.raises(error, match=message):
+        power(base, exponent)
+
+
+def test_factorial_table_is_bounded(monkeypatch):
+    """
+    Test that small factorials come from a table that never grows past its size.
+    """
+    # Arrange
+    monkeypatch.setattr(integers, '_FACTORIALS', [1])
+    monkeypatch.setattr(integers, 'FACTORIAL_TABLE_SIZE', 50)
+
+    # Act
+    small = factorial(20)
+    large = factorial(60)
+
+    # Assert
+    assert small == math.factorial(20) and large == math.factorial(60)
+    assert len(integers._FACTORIALS) == 21
+    assert binomial(40, 3) == 9880 and len(integers._FACTORIALS) == 41
+    assert binomial(100, 50) == math.comb(100, 50)
+
+
+def test_factorial_table_under_threads(monkeypatch):
+    """
+    Test that threads extending the factorial table together leave it correct.
+    """
+    # Arrange
+    monkeypatch.setattr(integers, '_FACTORIALS', [1])
+    values = [n % 400 for n in range(2000)]
+
+    # Act
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(factorial, values))
+
+    # Assert
+    assert results == [math.factorial(n) for n in values]
+    assert integers._FACTORIALS == [math.factorial(n) for n in range(400)]
+
+
+def test_factorials_and_multifactorials():
+    """
+    Test factorials, multifactorials and the types returned for float operands.
+    """
+    # Act & Assert
+    assert factorial(0) == 1 and factorial(5) == 120
+    assert factorial(9, 2) == 945 and factorial(10, 3) == 280 and factorial(0, 2) == 1
+    assert factorial(40, 2) == math.prod(range(40, 0, -2))
+    assert factorial(5.0, 1.0) == 120.0 and type(factorial(5.0, 1.0)) is float
+    assert factorial(3000) == math.factorial(3000)
+
+
+@pytest.mark.parametrize("arguments, message", [
+    ((-1,), "non-negative number and a positive step"),
+    ((5, 0), "non-negative number and a positive step"),
+    ((2.5,), "'!' needs integer operands, got 2.5."),
+    ((10 ** 7,), "Result would have about"),
+    ((10 ** 7, 2), "Result would have about"),
+    ((200.0,), "Result is too large for a float"),
+    ((10 ** 400,), "far too many digits"),
+    ((10 ** 400, 3), "far too many digits"),
+])
+def test_factorial_errors(arguments, message):
+    """
+    Test factorial argument checks and size guards.
+    """
+    # Act & Assert
+    with pytest.raises(ValueError, match=message):
+        factorial(*arguments)
+
+
+def test_binomial_and_gcd():
+    """
+    Test binomial coefficients, including out of range choices, and gcd.
+    """
+    # Act & Assert
+    assert binomial(52, 5) == 2598960 and binomial(5, 7) == 0 and binomial(5, -1) == 0
+    assert binomial(5000, 2) == 12497500 and binomial(52.0, 5.0) == 2598960.0
+    assert gcd(12, 18) == 6 and gcd(-4, 0) == 4 and gcd(12.0, 18.0) == 6.0
+    with pytest.raises(ValueError, match="need a non-negative number of items"):
+        binomial(-1, 0)
+    with pytest.raises(ValueError, match="Result would have about"):
+        binomial(10 ** 8, 5 * 10 ** 7)
+    assert binomial(10 ** 400, 2) == 10 ** 400 * (10 ** 400 - 1) // 2 and binomial(1e308, 1.0) == 1e308
+    with pytest.raises(ValueError, match="far too many digits"):
+        binomial(10 ** 400, 10 ** 399)
+    with pytest.raises(ValueError, match="'gcd' needs integer operands, got 1.5."):
+        gcd(1.5, 2)
+
+
+@pytest.mark.parametrize("calculation, a, b, message", [
+    (PowCalculation, 10.0, 1000.0, "10.0 ** 1000.0 is too large for a float; switch to 'mode int'"),
+    (PowCalculation, -8.0, 0.5, "-8.0 ** 0.5 is not a real number."),
+    (PowCalculation, 0.0, -1.0, "Division by zero not allowed."),
+    (PowCalculation, 2, 2000, None),
+    (PowCalculation, 2.0, 10.0, None),
+    (PowCalculation, 0.0, 2.0, None),
+    (PowCalculation, math.inf, 2.0, None),
+    (PowCalculation, Mod(3, 7), 1000, None),
+    (FactorialCalculation, 2.5, 1, "'!' needs integer operands, got 2.5."),
+    (FactorialCalculation, 5, 0, "non-negative number and a positive step"),
+    (FactorialCalculation, 200.0, 1.0, "Result is too large for a float"),
+    (FactorialCalculation, 5000.0, 1.0, "Result is too large for a float"),
+    (FactorialCalculation, 1e20, 2.0, "Result is too large for a float"),
+    (FactorialCalculation, 200, 1, None),
+    (FactorialCalculation, 10 ** 400, 10 ** 399, None),
+    (FactorialCalculation, 170.0, 1.0, None),
+    (GcdCalculation, 12, 1.5, "'gcd' needs integer operands, got 1.5."),
+    (GcdCalculation, 12.0, 18.0, None),
+    (BinomialCalculation, -1, 0, "need a non-negative number of items"),
+    (BinomialCalculation, 5, 0.5, "'choose' needs integer operands, got 0.5."),
+    (BinomialCalculation, 2000.0, 1000.0, "Result is too large for a float"),
+    (BinomialCalculation, 1e308, 5.0, "Result is too large for a float"),
+    (BinomialCalculation, 2000, 1000, None),
+    (BinomialCalculation, 1e308, 1.0, None),
+    (BinomialCalculation, 1e308, 1e308, None),
+    (BinomialCalculation, 5.0, 7.0, None),
+])
+def test_validate_integer_operations(calculation, a, b, message):
+    """
+    Test that integer operations report what exec() would raise, and that operands it accepts pass.
+    """
+    # Act
+    error = calculation.validate(a, b)
+
+    # Assert
+    assert error == message if message is None else message in error
+    if message is not None:
+        with pytest.raises((ValueError, ZeroDivisionError)):
+            calculation(a, b).exec()
+    else:
+        calculation(a, b).exec()
+
+
+def test_mod_arithmetic():
+    """
+    Test arithmetic on integers modulo m, including inverses and mismatched moduli.
+    """
+    # Arrange
+    three = Mod(3, 7)
+
+    # Act & Assert
+    assert three + 5 == Mod(1, 7) and 5 + three == Mod(1, 7)
+    assert three - 5 == Mod(5, 7) and 5 - three == Mod(2, 7)
+    assert three * Mod(4, 7) == Mod(5, 7) and 4.0 * three == Mod(5, 7)
+    assert three / 5 == Mod(2, 7) and three ** -1 == Mod(5, 7)
+    assert Mod(0, 7) == 0 and three != 'x'
+    assert int(three) == 3 and float(three) == 3.0 and hash(three) == hash(Mod(10, 7))
+    assert str(three) == '3 (mod 7)' and repr(three) == 'Mod(3, 7)'
+    with pytest.raises(ValueError, match="4 has no inverse modulo 8."):
+        Mod(6, 8) / 4
+    with pytest.raises(ValueError, match="2 has no inverse modulo 8."):
+        Mod(2, 8) ** -1
+    with pytest.raises(ValueError, match="Cannot add integers modulo 7 and 5."):
+        three + Mod(1, 5)
+    with pytest.raises(ValueError, match="The modulus must be a positive integer."):
+        Mod(1, 0)
+
+
+@pytest.mark.parametrize("value, expected", [
+    (12345, '12345'),
+    (-(10 ** 50), '-1' + '0' * 50),
+    (2 ** 10000, '19950631168807583848...81774304792596709376 (3,011 digits)'),
+    (10 ** 5000, '10000000000000000000...00000000000000000000 (5,001 digits)'),
+    (10 ** 5000 - 1, '99999999999999999999...99999999999999999999 (5,000 digits)'),
+    (10 ** 904 - 1, '99999999999999999999...99999999999999999999 (904 digits)'),
+    (-(3 ** 9000), '-' + format_value(3 ** 9000)),
+    (1.5, '1.5'),
+], ids=['small', 'below-limit', 'power-of-two', 'power-of-ten', 'below-power-of-ten', 'overestimated', 'negative', 'float'])
+def test_format_value(value, expected):
+    """
+    Test that huge integers are abbreviated with an exact digit count.
+    """
+    # Act & Assert
+    assert format_value(value) == expected
+
+
+def test_format_value_corrects_low_estimates(monkeypatch):
+    """
+    Test that a digit count estimated one too low is corrected.
+    """
+    # Arrange
+    monkeypatch.setattr(integers, '_LOG2_10', math.log2(10) * 1.0001)
+
+    # Act & Assert
+    assert format_value(10 ** 5000) == '10000000000000000000...00000000000000000000 (5,001 digits)'
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("2 ** 200", ('pow', 2, 200)),
+    ("0x10 ! 2", ('fact', 16, 2)),
+    ("20 !", ('fact', 20, 1)),
+    ("1_000 gcd 1.5", ('gcd', 1000, 1.5)),
+    ("3 ** 1000 mod 7", ('pow', Mod(3, 7), 1000)),
+    ("10 / 3 mod 0x11", ('div', Mod(10, 17), 3)),
+])
+def test_parse_input_integer_mode(expression, expected):
+    """
+    Test that integer mode keeps integer literals exact and attaches moduli.
+    """
+    # Act
+    parsed = parse_input(expression, exact=True)
+
+    # Assert
+    assert parsed == expected
+    assert [type(value) for value in parsed] == [type(value) for value in expected]
+    assert try_parse_input(expression, exact=True) == (parsed, None)
+
+
+def test_parse_input_float_mode_operations():
+    """
+    Test that the new operations parse to floats outside integer mode.
+    """
+    # Act & Assert
+    assert parse_input("2 ** 10") == ('pow', 2.0, 10.0)
+    assert parse_input("5 !") == ('fact', 5.0, 1.0)
+    assert parse_input("52 choose 5") == ('choose', 52.0, 5.0)
+    assert parse_input("3.0 ** 4 mod 5") == ('pow', Mod(3, 5), 4.0)
+
+
+@pytest.mark.parametrize("expression, message", [
+    ("2 ** 3 mod 0", "expected a positive integer modulus at position 11."),
+    ("2 ** 3 mod 1.5", "expected a positive integer modulus at position 11."),
+    ("2.5 ** 3 mod 7", "'mod' needs an integer at position 0."),
+    ("2 ** 3 mod " + '9' * 5000, "integer literal too long at position 11."),
+    ('9' * 5000 + " + 1", "integer literal too long at position 0."),
+    ("2 +", "incomplete expression at position 3."),
+    ("2", "incomplete expression at position 1."),
+    ("2 ** 3 mod", "unexpected 'mod' at position 7."),
+])
+def test_parse_input_integer_mode_errors(expression, message):
+    """
+    Test the errors for bad moduli and oversized integer literals.
+    """
+    # Act & Assert
+    with pytest.raises(ValueError, match=f"Wrong expression format: {message}"):
+        parse_input(expression, exact=True)
+
+
+def test_calculations_show_abbreviated_results():
+    """
+    Test the new calculations, their cost and their history text for huge results.
+    """
+    # Act
+    power_text = str(PowCalculation(2, 10000))
+    factorial_text = str(FactorialCalculation(5, 1))
+
+    # Assert
+    assert power_text == "PowCalculation: 2 Pow 10000 = 19950631168807583848...81774304792596709376 (3,011 digits)"
+    assert factorial_text == "FactorialCalculation: 5 Factorial 1 = 120"
+    assert BinomialCalculation(52, 5).exec() == 2598960 and GcdCalculation(12, 18).exec() == 6
+    assert PowCalculation.cost > 1 and FactorialCalculation.default_b == 1
+
+
+def test_evaluate_input_integer_mode_bypasses_cache(capsys):
+    """
+    Test that exact results are printed abbreviated and never cached.
+    """
+    # Arrange
+    history = History()
+    cache = ResultCache()
+
+    # Act
+    evaluate_input("2 ** 10000", history, cache, exact=True)
+    evaluate_input("3 ** 1000 mod 7", history, cache)
+    evaluate_input("9 ** 99999999", history, cache, exact=True)
+    evaluate_input("2 ** 10", history, cache)
+
+    # Assert
+    captured = capsys.readouterr()
+    assert captured.out.splitlines()[:3] == [
+        "19950631168807583848...81774304792596709376 (3,011 digits)", "4 (mod 7)",
+        "An error occurred during calculation: Result would have about 95,424,250 digits; the limit is 1,262,611.",
+    ]
+    assert captured.out.splitlines()[-1] == "1024.0"
+    assert len(history) == 3 and len(cache) == 1
+
+
+def test_calculator_mode(monkeypatch, capsys):
+    """
+    Test switching between float and integer mode in the REPL.
+    """
+    # Arrange
+    session = Session()
+    monkeypatch.setattr('sys.stdin', StringIO('mode\n2 ** 64\nmode int\n2 ** 64\nmode\nmode exact\nmode float\n'
+                                              '25 !\nexit\n'))
+
+    # Act
+    with pytest.raises(SystemExit):
+        Calculator(session=session)
+
+    # Assert
+    captured = capsys.readouterr()
+    assert captured.out.count("Float mode: numbers are floating point.") == 2
+    assert captured.out.count("Integer mode: integers are exact.") == 2
+    assert "Usage: mode [int|float]" in captured.out
+    assert ">>> 1.8446744073709552e+19\n" in captured.out and ">>> 18446744073709551616\n" in captured.out
+    assert ">>> 1.5511210043330986e+25\n" in captured.out
+    assert not session.exact
+
+
+def test_export_huge_integers():
+    """
+    Test that exact integers beyond the float range are exported as infinity.
+    """
+    # Arrange
+    history = History()
+    for a, b in ((2, 2000), (-2, 2001), (3, 4)):
+        history.append(PowCalculation(a, b))
+
+    # Act
+    columns = Columns.from_history(history)
+
+    # Assert
+    assert list(columns.results) == [math.inf, -math.inf, 81.0]
+
+
+def test_export_refuses_modular_results():
+    """
+    Test that calculations modulo m are not exported as their bare residues.
+    """
+    # Arrange
+    history = History()
+    history.append(PowCalculation(3, 4))
+    history.append(PowCalculation(Mod(3, 7), 1000))
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="Cannot export modular calculations such as .*no modulus column"):
+        Columns.from_history(history)
+
+
+def test_bench_rejects_nested_flat_operations():
+    """
+    Test that operations without an infix precedence cannot be nested in bench workloads.
+    """
+    # Act & Assert
+    assert list(Workload().mix) == ['+', '-', '*', '/']
+    assert Workload(mix={'**': 1.0}).mix == {'**': 1.0}
+    with pytest.raises(ValueError, match="Operation '!' cannot be nested; use depth=1."):
+        Workload(mix={'+': 1.0, '!': 1.0}, depth=2)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('12', 12), ('-0x1F', -31), ('+1_000', 1000), ('1.5', None), ('1e3', None), ('inf', None),
+])
+def test_to_integer(text, expected):
+    """
+    Test exact conversion of integer literals.
+    """
+    # Act & Assert
+    assert to_integer(text) == expected
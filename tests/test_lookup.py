@@ -0,0 +1,301 @@
+# tests/test_lookup.py
+
+"""
+Unit tests for async lookup calculations using pytest.
+
+These tests run a local stand-in rates server and cover batching of pending lookups
+into one request per source, connection reuse, retries on closed keep-alive
+connections, missing keys, HTTP errors, malformed responses, and the fx operation in
+the REPL.
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+import json
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import StringIO
+from urllib.parse import parse_qs, urlsplit
+from app.calculation import AsyncCalculation, CalculationFactory, FxCalculation
+from app.calculator import Calculator, evaluate_input
+from app.history import History
+from app.lookup import LookupEngine, RateSource
+from app.session import Session
+
+RATES = {'840': 1.0, '978': 0.5, '826': 0.25}
+
+
+class RatesHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append(parse_qs(urlsplit(self.path).query)['keys'][0].split(','))
+        server.clients.add(self.client_address)
+        if server.raw is not None:
+            self.wfile.write(server.raw)
+            self.close_connection = True
+            return
+        if server.body is not None:
+            body, status = server.body, 200
+        elif server.fail:
+            body, status = b'{}', 500
+        else:
+            keys = server.requests[-1]
+            body, status = json.dumps({key: RATES[key] for key in keys if key in RATES}).encode(), 200
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if server.close_after_response:
+            # Drops the connection without announcing it, like an idle keep-alive timeout.
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), RatesHandler)
+    server.requests, server.clients, server.fail, server.close_after_response = [], set(), False, False
+    server.body = server.raw = None
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def engine(server):
+    engine = LookupEngine()
+    engine.add_source(RateSource('fx', f"http://127.0.0.1:{server.server_port}/rates"))
+    yield engine
+    engine.close()
+
+
+def test_fx_calculation_requires_a_lookup():
+    """
+    Test that an unresolved fx calculation refuses to run, both alone and in bulk.
+    """
+    # Arrange
+    calculation = CalculationFactory.create_calculation('fx', 100.0, 978.0)
+
+    # Act & Assert
+    assert isinstance(calculation, FxCalculation)
+    with pytest.raises(ValueError, match="No 'fx' value for 978."):
+        calculation.exec()
+    assert FxCalculation.validate(100.0, 978.0) == "'fx' needs a 'fx' lookup and cannot run in bulk."
+
+
+def test_async_calculation_default_lookup_key():
+    """
+    Test that the second operand is the lookup key unless a calculation overrides it.
+    """
+    # Arrange
+    class Scaled(AsyncCalculation):
+        source = 'scale'
+
+        def combine(self, value):
+            return self.a * value
+
+    calculation = Scaled(3.0, 7.0)
+
+    # Act
+    calculation.value = 2.0
+
+    # Assert
+    assert calculation.lookup_key() == 7.0
+    assert calculation.exec() == 6.0
+
+
+def test_resolve_batches_keys_into_one_request(engine, server):
+    """
+    Test that pending lookups are deduplicated and sent as a single request.
+    """
+    # Arrange
+    calculations = [FxCalculation(float(amount), code) for amount in range(1, 51) for code in (840.0, 978.0, 826.0)]
+
+    # Act
+    resolved = engine.resolve(calculations + [CalculationFactory.create_calculation('add', 1.0, 2.0)])
+
+    # Assert
+    assert resolved == 150
+    assert len(server.requests) == 1
+    assert sorted(server.requests[0]) == ['826', '840', '978']
+    assert calculations[1].exec() == 0.5
+    assert calculations[-1].exec() == 12.5
+    assert engine.resolve(calculations) == 0
+    assert len(server.requests) == 1
+
+
+def test_resolve_splits_large_batches_and_reuses_connections(engine, server):
+    """
+    Test that keys beyond max_batch go in concurrent requests over pooled keep-alive connections.
+    """
+    # Arrange
+    source = engine.get_source('fx')
+    source.max_batch = 2
+
+    # Act
+    for _ in range(3):
+        engine.resolve([FxCalculation(1.0, code) for code in (840.0, 978.0, 826.0)])
+
+    # Assert
+    assert source.requests == len(server.requests) == 6
+    assert source.connections <= source.pool_size
+    assert len(server.clients) == source.connections
+
+
+def test_resolve_leaves_missing_keys_unresolved(engine):
+    """
+    Test that a key the source does not know leaves its calculation pending.
+    """
+    # Arrange
+    calculation = FxCalculation(10.0, 392.0)
+
+    # Act
+    resolved = engine.resolve([calculation])
+
+    # Assert
+    assert resolved == 0
+    with pytest.raises(ValueError, match="No 'fx' value for 392."):
+        calculation.exec()
+
+
+def test_fetch_retries_closed_connection(engine, server):
+    """
+    Test that a keep-alive connection closed by the server is reopened once.
+    """
+    # Arrange
+    source = engine.get_source('fx')
+    server.close_after_response = True
+
+    # Act
+    first = source.fetch([840])
+    second = source.fetch([978])
+
+    # Assert
+    assert first == {840: 1.0}
+    assert second == {978: 0.5}
+    assert source.connections == 2
+
+
+def test_fetch_http_error(engine, server):
+    """
+    Test that a non-200 response is reported as an error and the connection is dropped.
+    """
+    # Arrange
+    server.fail = True
+    source = engine.get_source('fx')
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="Rate source 'fx' returned HTTP 500."):
+        source.fetch([840])
+    assert source._idle.empty()
+
+
+@pytest.mark.parametrize("body, raw, message", [
+    (b'[1.0]', None, "Rate source 'fx' sent list instead of an object."),
+    (b'{"840": "1.0"}', None, "Rate source 'fx' sent a non-numeric value for 840: '1.0'."),
+    (b'{"840": true}', None, "Rate source 'fx' sent a non-numeric value for 840: True."),
+    (b'not json', None, "Rate source 'fx' sent a body that is not JSON."),
+    (None, b'garbage\r\n\r\n', "Rate source 'fx' sent an invalid response: BadStatusLine"),
+    (None, b'HTTP/1.1 200 OK\r\nContent-Length: 10\r\n\r\n{}', "Rate source 'fx' sent an invalid response: "
+                                                                    "IncompleteRead"),
+])
+def test_fetch_invalid_responses(engine, server, capsys, body, raw, message):
+    """
+    Test that malformed payloads and responses are reported as value errors the REPL prints and survives.
+    """
+    # Arrange
+    server.body, server.raw = body, raw
+    source = engine.get_source('fx')
+    history = History()
+
+    # Act
+    with pytest.raises(ValueError, match=message):
+        source.fetch([840])
+    evaluate_input("10 fx 840", history, lookups=engine)
+
+    # Assert
+    # Connections are kept after a complete response, whatever its payload.
+    assert capsys.readouterr().out.startswith("ERROR:  Rate source 'fx' sent")
+    assert len(history) == 0 and source._idle.empty() == (raw is not None)
+
+
+def test_pool_keeps_at_most_pool_size_idle_connections(server):
+    """
+    Test that surplus connections are closed instead of pooled.
+    """
+    # Arrange
+    source = RateSource('fx', f"http://127.0.0.1:{server.server_port}/rates", pool_size=1)
+    connections = [source._connection(), source._connection()]
+    connections[1].connect()
+
+    # Act
+    for connection in connections:
+        source._release(connection)
+
+    # Assert
+    assert source._idle.qsize() == 1
+    assert connections[1].sock is None
+
+
+@pytest.mark.parametrize("url", ["https://example.com/rates", "rates"])
+def test_rate_source_rejects_bad_urls(url):
+    """
+    Test that only plain http URLs with a host are accepted.
+    """
+    with pytest.raises(ValueError, match="Rate source URL must be"):
+        RateSource('fx', url)
+
+
+def test_engine_unknown_source():
+    """
+    Test that resolving without a configured source fails with a clear message.
+    """
+    with pytest.raises(ValueError, match="No rate source named 'fx' is configured."):
+        LookupEngine().resolve([FxCalculation(1.0, 840.0)])
+
+
+def test_evaluate_input_fx(engine, capsys):
+    """
+    Test that fx lookups are resolved per input and not without an engine.
+    """
+    # Arrange
+    history = History()
+
+    # Act
+    evaluate_input("100 fx 978", history, lookups=engine)
+    evaluate_input("100 fx 978", history)
+    evaluate_input("100 fx 392", history, lookups=engine)
+
+    # Assert
+    captured = capsys.readouterr()
+    assert captured.out.splitlines() == ["50.0", "ERROR:  No rate source named 'fx' is configured.",
+                                         "An error occurred during calculation: No 'fx' value for 392.",
+                                         "Please try again.", ""]
+    assert len(history) == 1
+
+
+def test_calculator_fx(monkeypatch, capsys, server):
+    """
+    Test the fx operation in the REPL with a configured rate source and a cache.
+    """
+    # Arrange
+    session = Session()
+    session.lookups.add_source(RateSource('fx', f"http://127.0.0.1:{server.server_port}/rates"))
+    monkeypatch.setattr('sys.stdin', StringIO('20 FX 826\n20 fx 840\nhistory\nexit\n'))
+
+    # Act
+    with pytest.raises(SystemExit):
+        Calculator(session=session)
+
+    # Assert
+    captured = capsys.readouterr()
+    assert ">>> 5.0\n>>> 20.0\n" in captured.out
+    assert "FxCalculation: 20.0 Fx 826.0 = 5.0" in captured.out
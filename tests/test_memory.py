@@ -0,0 +1,359 @@
+# tests/test_memory.py
+
+"""
+Unit tests for memory accounting and bounded session state using pytest.
+
+These tests cover the size estimate, byte size formatting, the eviction policies of
+BoundedStore, history limits, and the memory REPL commands.
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+import sys
+import pytest
+from io import StringIO
+from app.cache import ResultCache
+from app.calculation import AddCalculation
+from app.calculator import Calculator
+from app.history import History
+from app.memory import BoundedStore, format_bytes, make_policy, parse_bytes, sizeof
+from app.session import Session
+
+
+class _Slotted:
+    __slots__ = ('value', 'missing')
+
+    def __init__(self, value):
+        self.value = value
+
+
+def test_sizeof_counts_nested_objects_once():
+    """
+    Test that containers, attributes and slots are included and shared objects are counted once.
+    """
+    # Arrange
+    shared = [1.5] * 100
+    payload = "x" * 1000
+
+    # Act
+    single = sizeof([shared])
+    double = sizeof([shared, shared])
+    slotted = sizeof(_Slotted(payload))
+    calculation = sizeof(AddCalculation(1.0, 2.0))
+
+    # Assert
+    assert double - single == sys.getsizeof([shared, shared]) - sys.getsizeof([shared])
+    assert slotted > len(payload)
+    assert calculation > sys.getsizeof(AddCalculation(1.0, 2.0))
+    assert sizeof({'key': payload}) > len(payload)
+    assert sizeof(AddCalculation) == 0
+
+
+@pytest.mark.parametrize("size, text", [(512, "512 B"), (2048, "2.0 KB"), (3 * 1024 ** 2, "3.0 MB"),
+                                        (5 * 1024 ** 4, "5120.0 GB")])
+def test_format_bytes(size, text):
+    """
+    Test that byte counts are shown in the largest fitting unit.
+    """
+    assert format_bytes(size) == text
+
+
+@pytest.mark.parametrize("text, size", [("10b", 10), ("2KB", 2048), ("1.5 mb", 1536 * 1024), ("1GB", 1024 ** 3)])
+def test_parse_bytes(text, size):
+    """
+    Test that byte sizes with units are parsed.
+    """
+    assert parse_bytes(text) == size
+
+
+def test_parse_bytes_rejects_plain_numbers():
+    """
+    Test that a size without a unit is rejected.
+    """
+    with pytest.raises(ValueError, match="Not a byte size"):
+        parse_bytes("100")
+
+
+def test_make_policy_unknown():
+    """
+    Test that an unknown policy name lists the available ones.
+    """
+    with pytest.raises(ValueError, match="Unknown eviction policy: 'mru'. Available policies: fifo, lru, size"):
+        make_policy('mru')
+
+
+@pytest.mark.parametrize("policy, survivors", [('fifo', {'b', 'c'}), ('lru', {'a', 'c'})])
+def test_bounded_store_entry_limit(policy, survivors):
+    """
+    Test that FIFO evicts the oldest insert and LRU the least recently read entry.
+    """
+    # Arrange
+    store = BoundedStore(max_entries=2, policy=policy)
+    store['a'] = 1.0
+    store['b'] = 2.0
+
+    # Act
+    assert store['a'] == 1.0
+    store['c'] = 3.0
+
+    # Assert
+    assert set(store) == survivors
+    assert len(store) == 2
+    assert store.evictions == 1
+
+
+def test_bounded_store_size_policy_evicts_large_cold_entries():
+    """
+    Test that the size weighted policy evicts the entry with the most bytes per access first.
+    """
+    # Arrange
+    store = BoundedStore(max_entries=3, policy='size', sizer=lambda value: value if isinstance(value, int) else 0)
+    store['small'] = 10
+    store['large'] = 1000
+    store['hot'] = 1000
+    for _ in range(100):
+        store['hot']
+
+    # Act
+    store['new'] = 10
+
+    # Assert
+    assert 'large' not in store
+    assert {'small', 'hot', 'new'} == set(store)
+
+
+def test_bounded_store_byte_limit_and_replacement():
+    """
+    Test that the byte limit is enforced and replacing a key adjusts the byte count.
+    """
+    # Arrange
+    store = BoundedStore(max_bytes=100, sizer=lambda value: value if isinstance(value, int) else 0)
+
+    # Act
+    store['a'] = 40
+    store['a'] = 60
+    store['b'] = 30
+    bytes_before = store.nbytes
+    store['c'] = 50
+
+    # Assert
+    assert bytes_before == 90
+    assert store.nbytes <= 100
+    assert 'a' not in store
+    del store['b']
+    assert store.nbytes == 50
+
+
+def test_bounded_store_configure_switches_policy():
+    """
+    Test that changing the policy keeps the entries and a new limit evicts immediately.
+    """
+    # Arrange
+    store = BoundedStore(policy='lru')
+    for key in 'abcd':
+        store[key] = 1.0
+
+    # Act
+    store.configure(max_entries=2, policy='fifo')
+
+    # Assert
+    assert set(store) == {'c', 'd'}
+    assert store.policy.name == 'fifo'
+    assert store.evictions == 2
+
+
+def test_size_policy_rebuilds_its_heap():
+    """
+    Test that stale heap entries are compacted while the victim stays correct.
+    """
+    # Arrange
+    store = BoundedStore(policy='size', sizer=lambda value: 8)
+    store['cold'] = 1.0
+    store['hot'] = 1.0
+
+    # Act
+    for _ in range(200):
+        store['hot']
+
+    # Assert
+    assert len(store.policy._heap) <= 2 * len(store) + 16
+    assert store.policy.victim() == 'cold'
+
+
+def test_size_policy_skips_stale_entries():
+    """
+    Test that superseded heap entries are skipped and the entries survive a policy switch.
+    """
+    # Arrange
+    store = BoundedStore(policy='size', sizer=lambda value: value if isinstance(value, int) else 0)
+    store['a'] = 100
+    store['b'] = 50
+
+    # Act
+    store['a']
+    store['a']
+    victim = store.policy.victim()
+    store.configure(policy='lru')
+
+    # Assert
+    assert victim == 'b'
+    assert set(store.policy.order()) == {'a', 'b'}
+
+
+def test_history_limit_trims_oldest():
+    """
+    Test that a history limit drops the oldest calculations and counts them.
+    """
+    # Arrange
+    history = History(max_entries=10)
+
+    # Act
+    for i in range(11):
+        history.append(AddCalculation(float(i), 0.0))
+
+    # Assert
+    assert len(history) == 10
+    assert history.evictions == 1
+    assert [calculation.a for calculation in history] == [float(i) for i in range(1, 11)]
+    history.set_limit(3)
+    assert [calculation.a for calculation in history] == [8.0, 9.0, 10.0]
+    assert history.trim(5) == 0
+
+
+def test_history_limit_is_exact_while_appending():
+    """
+    Test that a capped history holds exactly its limit after every append, and that entries it evicted
+    stay gone through undo, snapshots and its state.
+    """
+    # Arrange
+    history = History(max_entries=100)
+    lengths = []
+
+    # Act
+    for i in range(250):
+        history.append(AddCalculation(float(i), 0.0), float(i))
+        lengths.append(len(history))
+
+    # Assert
+    assert lengths == list(range(1, 101)) + [100] * 150
+    assert history.evictions == 150
+    assert [calculation.a for calculation in history][0] == 150.0
+    assert [result for _, result in history.items()] == [float(i) for i in range(150, 250)]
+    assert history.state().head.length == 100
+    for _ in range(5):
+        history.undo()
+    history.snapshot('undone')
+    history.append(AddCalculation(-1.0, 0.0))
+    assert len(history) == 96 and history.last().a == -1.0
+    assert [calculation.a for calculation in history][0] == 150.0
+    for _ in range(96):
+        history.undo()
+    assert len(history) == 0 and history.last() is None and history.undo() is None
+    assert history.state().head is None
+    history.restore('undone')
+    assert len(history) == 95 and [calculation.a for calculation in history][0] == 150.0
+
+
+def test_history_limit_covers_undone_entries_and_snapshots():
+    """
+    Test that lowering the history limit also cuts the undone entries and each snapshot to that many.
+    """
+    # Arrange
+    history = History()
+    for i in range(8):
+        history.append(AddCalculation(float(i), 0.0))
+    history.snapshot('all')
+    history.undo()
+    history.snapshot('short')
+    for _ in range(4):
+        history.undo()
+
+    # Act
+    history.set_limit(2)
+
+    # Assert
+    assert [calculation.a for calculation in history] == [1.0, 2.0]
+    assert history.evictions == 1
+    state = history.state()
+    assert state.redo.length == 2 and state.snapshots['all'].length == 2
+    assert [history.redo().a, history.redo().a, history.redo()] == [3.0, 4.0, None]
+    assert [calculation.a for calculation in history] == [3.0, 4.0] and history.evictions == 3
+    history.restore('all')
+    assert [calculation.a for calculation in history] == [6.0, 7.0]
+    history.restore('short')
+    assert [calculation.a for calculation in history] == [5.0, 6.0]
+
+
+def test_history_limit_must_be_positive():
+    """
+    Test that a zero history limit is rejected.
+    """
+    with pytest.raises(ValueError, match="History limit must be positive."):
+        History(max_entries=0)
+
+
+def test_session_memory_usage():
+    """
+    Test that the session reports bytes for each kind of state.
+    """
+    # Arrange
+    cache = ResultCache()
+    session = Session(cache=cache)
+    session.history.append(AddCalculation(1.0, 2.0))
+    session.variables['x'] = 3.0
+    cache.put(('Add', 1.0, 2.0, 'float'), 3.0)
+
+    # Act
+    usage = session.memory_usage()
+
+    # Assert
+    assert usage['history'] > 0
+    assert usage['cache'] > 0
+    assert usage['variables'] == session.variables.nbytes > 0
+    assert Session().memory_usage()['cache'] == 0
+
+
+def test_calculator_memory_commands(monkeypatch, capsys):
+    """
+    Test the memory REPL commands with and without a cache.
+    """
+    # Arrange
+    user_input = ('1 + 1\n2 + 2\n3 + 3\nmemory limit history 2\nmemory limit cache 1KB size\n'
+                  'memory limit variables 10 fifo\nmemory limit history 1MB\nmemory limit disk 1\n'
+                  'memory limit history none\nmemory limit variables lots\nmemory bogus\nmemory\nexit\n')
+    monkeypatch.setattr('sys.stdin', StringIO(user_input))
+
+    # Act
+    with pytest.raises(SystemExit):
+        Calculator(cache=ResultCache())
+
+    # Assert
+    captured = capsys.readouterr()
+    assert "Updated history limit." in captured.out
+    assert "Updated cache limit." in captured.out
+    assert "Updated variables limit." in captured.out
+    assert "History can only be limited by entries" in captured.out
+    assert "Unknown memory target: 'disk'." in captured.out
+    assert "Not a byte size" in captured.out
+    assert "Usage: memory | memory limit" in captured.out
+    assert "2 calculations, no limit, 1 evicted" in captured.out
+    assert "size, limit 1.0 KB" in captured.out
+    assert "fifo, limit 10 entries" in captured.out
+    assert "total     :" in captured.out
+
+
+def test_calculator_memory_without_cache(monkeypatch, capsys):
+    """
+    Test that the cache line is omitted and cache limits are refused when caching is off.
+    """
+    # Arrange
+    monkeypatch.setattr('sys.stdin', StringIO('memory\nmemory limit cache 10\nexit\n'))
+
+    # Act
+    with pytest.raises(SystemExit):
+        Calculator()
+
+    # Assert
+    captured = capsys.readouterr()
+    assert "cache     :" not in captured.out
+    assert "Result cache is disabled." in captured.out
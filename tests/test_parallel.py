@@ -0,0 +1,186 @@
+# tests/test_parallel.py
+
+"""
+Unit tests for parallel evaluation of prepared expressions using pytest.
+
+These tests cover the schedule built for expensive and cheap nodes, results matching
+serial execution, inline fallback for lone or cheap nodes, error propagation from pool
+workers and ownership of the executor.
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from app.calculation import AddCalculation, Calculation, DivCalculation, MulCalculation
+from app.parallel import ParallelEvaluator
+from app.prepared import Binary, Number, Parameter, PreparedExpression, prepare
+
+
+class PowCalculation(Calculation):
+    cost = 1000
+
+    def exec(self) -> float:
+        return self.a ** self.b
+
+
+class CountingExecutor(ThreadPoolExecutor):
+
+    def __init__(self):
+        super().__init__(max_workers=2)
+        self.submitted = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+@pytest.fixture
+def expensive():
+    # (x ** 2 + 3 ** y) * (2 ** 3), three independent powers under cheap operations
+    tree = Binary(MulCalculation,
+                  Binary(AddCalculation,
+                         Binary(PowCalculation, Parameter('x', 0), Number(2.0)),
+                         Binary(PowCalculation, Number(3.0), Parameter('y', 1))),
+                  Binary(PowCalculation, Number(2.0), Number(3.0)))
+    return PreparedExpression("(x ** 2 + 3 ** y) * (2 ** 3)", tree, ('x', 'y'))
+
+
+def test_parallel_matches_serial(expensive):
+    """
+    Test that expensive nodes run on the pool and the result matches serial execution.
+    """
+    # Arrange
+    executor = CountingExecutor()
+
+    # Act
+    with ParallelEvaluator(executor=executor) as evaluator:
+        result = evaluator.evaluate(expensive, (4.0, 2.0))
+
+    # Assert
+    assert result == expensive.execute((4.0, 2.0)) == (16.0 + 9.0) * 8.0
+    assert executor.submitted == evaluator.dispatched == 3
+    executor.shutdown()
+
+
+def test_parallel_schedule_levels(expensive):
+    """
+    Test that independent expensive nodes share a level and cheap leaves are compiled inline.
+    """
+    # Act
+    plan = ParallelEvaluator().plan(expensive)
+
+    # Assert
+    assert [len(level) for level in plan.levels] == [3, 1, 1]
+    assert [step[4] for step in plan.levels[0]] == [True, True, True]
+    assert len(plan.inline) == 6
+    assert ParallelEvaluator().plan(expensive) is not plan
+
+
+def test_parallel_cheap_expression_never_dispatches():
+    """
+    Test that an expression made of cheap operations runs entirely inline.
+    """
+    # Arrange
+    prepared = prepare("a * b + c / 2")
+    evaluator = ParallelEvaluator()
+
+    # Act
+    result = evaluator.evaluate(prepared, (2.0, 3.0, 4.0))
+
+    # Assert
+    assert result == 8.0
+    assert evaluator.dispatched == 0
+    assert evaluator._executor is None
+    assert evaluator.plan(prepared) is evaluator.plan(prepared)
+
+
+def test_parallel_lone_expensive_node_runs_inline():
+    """
+    Test that a level with a single expensive node is not sent to the pool.
+    """
+    # Arrange
+    tree = Binary(AddCalculation, Binary(PowCalculation, Number(2.0), Number(10.0)), Number(1.0))
+    prepared = PreparedExpression("2 ** 10 + 1", tree, ())
+    evaluator = ParallelEvaluator()
+
+    # Act
+    result = evaluator.evaluate(prepared)
+
+    # Assert
+    assert result == 1025.0
+    assert evaluator.dispatched == 0
+
+
+def test_parallel_dispatch_cost_threshold():
+    """
+    Test that lowering the dispatch cost sends cheap operations to the pool and rebuilds the plan.
+    """
+    # Arrange
+    prepared = prepare("(a + b) * (a - b)")
+
+    # Act
+    with ParallelEvaluator(workers=2, dispatch_cost=1) as evaluator:
+        result = evaluator.evaluate(prepared, (5.0, 3.0))
+        dispatched = evaluator.dispatched
+        evaluator.dispatch_cost = 10_000
+        serial = evaluator.evaluate(prepared, (5.0, 3.0))
+
+    # Assert
+    assert result == serial == 16.0
+    assert dispatched == 2
+    assert evaluator.dispatched == 2
+    assert evaluator._executor is None
+
+
+def test_parallel_dispatches_registered_operations():
+    """
+    Test that the registered expensive operations go to the pool at the default dispatch cost.
+    """
+    # Arrange
+    prepared = prepare("a ** 2 + (b choose 3) - c !")
+    executor = CountingExecutor()
+
+    # Act
+    with ParallelEvaluator(executor=executor) as evaluator:
+        result = evaluator.evaluate(prepared, (3.0, 5.0, 4.0))
+
+    # Assert
+    assert result == prepared.execute((3.0, 5.0, 4.0)) == 9.0 + 10.0 - 24.0
+    assert executor.submitted == evaluator.dispatched == 3
+    assert ParallelEvaluator().plan(prepare("a * b + c / 2")).levels == []
+    executor.shutdown()
+
+
+def test_parallel_process_pool():
+    """
+    Test that evaluation works with a process pool.
+    """
+    # Act
+    with ParallelEvaluator(workers=2, processes=True, dispatch_cost=1) as evaluator:
+        result = evaluator.evaluate(prepare("(a + b) * (a - b)"), (5.0, 3.0))
+
+    # Assert
+    assert result == 16.0
+    assert evaluator.dispatched == 2
+
+
+def test_parallel_propagates_worker_errors():
+    """
+    Test that an exception raised on a pool worker reaches the caller.
+    """
+    # Arrange
+    prepared = prepare("(a / b) + (a / b)")
+
+    # Act / Assert
+    with ParallelEvaluator(dispatch_cost=DivCalculation.cost) as evaluator:
+        with pytest.raises(ZeroDivisionError):
+            evaluator.evaluate(prepared, (1.0, 0.0))
+
+
+def test_parallel_parameter_count(expensive):
+    """
+    Test that the parameter count is checked like serial execution.
+    """
+    with pytest.raises(ValueError, match="Expected 2 parameters, got 1."):
+        ParallelEvaluator().evaluate(expensive, (1.0,))
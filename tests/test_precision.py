@@ -0,0 +1,130 @@
+# tests/test_precision.py
+
+"""
+Unit tests for float32 storage using pytest.
+
+These tests cover rounding to float32, float32 result columns in the batch API and
+the engine, float32 binary exports and the REPL option for them, and the precision
+report comparing float32 with float64.
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+import math
+import pytest
+from array import array
+from io import StringIO
+from app.batch import CALCULATION_ERROR, OK, BatchResult, evaluate_columns, evaluate_expressions
+from app.calculation import CalculationFactory
+from app.calculator import Calculator
+from app.engine import Engine
+from app.export import Columns, read_binary, write_binary
+from app.precision import FLOAT32_EPSILON, precision_report, to_float32, typecode
+
+
+def opcode(name):
+    return CalculationFactory.get_calculation(name).opcode
+
+
+def test_typecodes_and_rounding():
+    """
+    Test the precision names, and that rounding to float32 overflows to infinity instead of failing.
+    """
+    # Act
+    column = to_float32([0.1, 1e300, -10 ** 400, 2.0 ** -149, 2.0 ** -151])
+
+    # Assert
+    assert typecode('float64') == 'd' and typecode('float32') == 'f'
+    assert column.typecode == 'f' and column.itemsize == 4
+    assert column[0] == 0.10000000149011612
+    assert list(column[1:]) == [math.inf, -math.inf, 2.0 ** -149, 0.0]
+    with pytest.raises(ValueError, match="Unsupported precision: 'float16'. Available precisions: float64, float32"):
+        typecode('float16')
+
+
+def test_float32_batch_and_engine():
+    """
+    Test that the batch API and the engine store float32 results, rounded once, in half the memory.
+    """
+    # Arrange
+    names = ['add', 'div', 'mul', 'pow']
+    a_values, b_values = [0.1, 1.0, 3.0, 10], [0.2, 3.0, 1e39, 400]
+
+    # Act
+    batch = evaluate_columns(names, a_values, b_values, precision='float32')
+    parsed = evaluate_expressions(["0.1 + 0.2", "1 / 3"], precision='float32')
+    flat = Engine().run_columns(array('B', map(opcode, names)), a_values, b_values, precision='float32')
+    full = BatchResult()
+
+    # Assert
+    assert batch.results.itemsize * 2 == full.results.itemsize
+    assert list(batch.results[:2]) == list(parsed.results) == list(to_float32([0.1 + 0.2, 1 / 3]))
+    assert batch.results[2] == math.inf and list(batch.status) == [OK] * 3 + [CALCULATION_ERROR]
+    assert list(flat.status) == list(batch.status) and flat.errors == batch.errors
+    assert batch.errors[3] == "int too large to convert to float"
+
+
+def test_float32_binary_export(tmp_path):
+    """
+    Test that a float32 export is written as version 2 with 4-byte columns and reads back unchanged.
+    """
+    # Arrange
+    path = str(tmp_path / "small.calc")
+    columns = Columns(['add', 'div'], array('B', [0, 1, 1]), to_float32([0.1, 1, 2]), to_float32([0.2, 3, 7]),
+                      to_float32([0.1 + 0.2, 1 / 3, 2 / 7]))
+
+    # Act
+    write_binary(columns, path)
+    loaded = read_binary(path)
+
+    # Assert
+    data = (tmp_path / "small.calc").read_bytes()
+    assert data[8:10] == b'\x02\x00' and len(data) == 24 + 8 + 8 + 3 * 16
+    assert loaded.a.typecode == loaded.results.typecode == 'f'
+    assert list(loaded.rows()) == list(columns.rows())
+    with pytest.raises(ValueError, match="truncated or corrupt"):
+        (tmp_path / "cut.calc").write_bytes(data[:-8])
+        read_binary(str(tmp_path / "cut.calc"))
+
+
+def test_calculator_float32_export(monkeypatch, capsys, tmp_path):
+    """
+    Test the float32 option of the REPL export command, with and without a format.
+    """
+    # Arrange
+    binary, text = tmp_path / "h.calc", tmp_path / "h.csv"
+    monkeypatch.setattr('sys.stdin', StringIO(f"0.1 + 0.2\nexport {binary} float32\nexport {text} csv FLOAT32\nexit\n"))
+
+    # Act
+    with pytest.raises(SystemExit):
+        Calculator()
+
+    # Assert
+    assert f"Exported 1 calculations to '{binary}'." in capsys.readouterr().out
+    assert read_binary(str(binary)).results.typecode == 'f'
+    assert text.read_text().splitlines()[1] == 'add,0.10000000149011612,0.20000000298023224,0.30000001192092896'
+
+
+def test_precision_report():
+    """
+    Test that the report compares float32 with float64 per operation, counting overflows and underflows.
+    """
+    # Arrange
+    rows = [('mul', 1.1, 3.3), ('div', 2, 8), ('add', 1.0, 1e-9), ('mul', 1e30, 1e30), ('mul', 1e-30, 1e-30),
+            ('div', 1, 0), ('sub', 5, 5), ('fx', 1, 978)]
+    names, a_values, b_values = zip(*rows)
+
+    # Act
+    report = precision_report(array('B', map(opcode, names)), a_values, b_values)
+
+    # Assert
+    table = {row[0]: row[1:] for row in report.rows()}
+    assert set(table) == {'mul', 'div', 'add', 'sub'}
+    rows, exact, mean, largest, overflows, underflows = table['mul']
+    assert rows == 3 and overflows == 1 and underflows == 1 and exact == 0.0
+    assert 0 < largest < 3 * FLOAT32_EPSILON and mean == largest
+    assert table['div'] == (1, 1.0, 0.0, 0.0, 0, 0)
+    assert 0 < table['add'][3] < FLOAT32_EPSILON and table['sub'] == (1, 1.0, 0.0, 0.0, 0, 0)
+    lines = str(report).splitlines()
+    assert lines[0].split() == ['operation', 'rows', 'exact', 'mean', 'rel', 'max', 'rel', 'overflow', 'underflow']
+    assert lines[-1] == "float32 storage: 13 bytes per row instead of 25; one rounding is at most 5.96e-08 relative."
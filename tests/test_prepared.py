@@ -0,0 +1,187 @@
+# tests/test_prepared.py
+
+"""
+Unit tests for the prepared expressions module using pytest.
+
+These tests cover parsing of expressions with named parameters at prepare time,
+execution with a parameter tuple, bulk execution over parameter columns, and the
+errors raised for malformed expressions or mismatched parameters.
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+import math
+import pytest
+from app.calculation import AddCalculation, MulCalculation
+from app.prepared import Binary, Number, Parameter, Parser, PreparedExpression, prepare
+
+
+def test_prepare_collects_parameters_in_order():
+    """
+    Test that parameters are collected once, in order of first appearance.
+    """
+    # Act
+    prepared = prepare("a * b + c - a")
+
+    # Assert
+    assert isinstance(prepared, PreparedExpression)
+    assert prepared.parameters == ('a', 'b', 'c')
+
+
+def test_prepare_resolves_calculations_at_prepare_time():
+    """
+    Test that the factory lookup happens while preparing, producing a tree of
+    calculation classes.
+    """
+    # Act
+    tree = prepare("a * b + 2").tree
+
+    # Assert
+    assert isinstance(tree, Binary)
+    assert tree.calculation_class is AddCalculation
+    assert tree.left.calculation_class is MulCalculation
+    assert isinstance(tree.left.left, Parameter)
+    assert isinstance(tree.right, Number)
+
+
+@pytest.mark.parametrize("expression, params, expected", [
+    ("a * b + c", (2.0, 3.0, 4.0), 10.0),
+    ("a + b * c", (2.0, 3.0, 4.0), 14.0),
+    ("(a + b) * c", (2.0, 3.0, 4.0), 20.0),
+    ("a - b - c", (10.0, 3.0, 2.0), 5.0),
+    ("a / b / c", (12.0, 3.0, 2.0), 2.0),
+    ("-a + 1", (5.0,), -4.0),
+    ("-(a - 2) / 4", (10.0,), -2.0),
+    ("2 * (3 + 4) - 1.5e1", (), -1.0),
+    ("-.5 * x", (4.0,), -2.0),
+    ("a*-2+0x10", (3.0,), 10.0),
+    ("- 2 + a", (1.0,), -1.0),
+    ("2 ** 3 ** 2", (), 512.0),
+    ("a ** -1 * 2", (4.0,), 0.5),
+    ("-x ** 2 + -2 ** 2", (3.0,), 13.0),
+    ("n ! / 2", (4.0,), 12.0),
+    ("2 ** 3 ! - (1 + 2)!", (), 58.0),
+    ("n choose k + 12 GCD 18", (5.0, 2.0), 16.0),
+    ("inf - x * -Infinity", (2.0,), math.inf),
+])
+def test_prepared_execute(expression, params, expected):
+    """
+    Test executing prepared expressions with a parameter tuple.
+    """
+    # Arrange
+    prepared = prepare(expression)
+
+    # Act
+    result = prepared.execute(params)
+
+    # Assert
+    assert result == expected
+
+
+def test_prepared_execute_many():
+    """
+    Test bulk execution over whole columns of parameters.
+    """
+    # Arrange
+    prepared = prepare("a * b + c")
+    columns = [[1.0, 2.0, 3.0], [4.0, 5.0, 6.0], [7.0, 8.0, 9.0]]
+
+    # Act
+    results = prepared.execute_many(columns)
+
+    # Assert
+    assert results == [11.0, 18.0, 27.0]
+
+
+def test_prepared_execute_wrong_parameter_count():
+    """
+    Test that executing with the wrong number of parameters raises ValueError.
+    """
+    # Arrange
+    prepared = prepare("a + b")
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="Expected 2 parameters, got 1."):
+        prepared.execute((1.0,))
+
+
+def test_prepared_execute_many_wrong_column_count():
+    """
+    Test that bulk execution with the wrong number of columns raises ValueError.
+    """
+    # Arrange
+    prepared = prepare("a + b")
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="Expected 2 columns, got 1."):
+        prepared.execute_many([[1.0]])
+
+
+def test_prepared_execute_many_ragged_columns():
+    """
+    Test that bulk execution with columns of different lengths raises ValueError.
+    """
+    # Arrange
+    prepared = prepare("a + b")
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="same length"):
+        prepared.execute_many([[1.0, 2.0], [1.0]])
+
+
+def test_prepared_division_by_zero():
+    """
+    Test that division semantics of DivCalculation are kept when executing.
+    """
+    # Arrange
+    prepared = prepare("a / b")
+
+    # Act & Assert
+    with pytest.raises(ZeroDivisionError):
+        prepared.execute((1.0, 0.0))
+
+
+@pytest.mark.parametrize("expression, message", [
+    ("", "Empty expression."),
+    ("a +", "Unexpected end of expression at position 3."),
+    ("(a + b", "Missing closing parenthesis for position 0."),
+    ("a b", "Unexpected token 'b' at position 2."),
+    ("a + )", "Unexpected token '\\)' at position 4."),
+    ("a ^ b", "Unexpected token '\\^' at position 2."),
+    ("! a", "Unexpected token '!' at position 0."),
+    ("a choose", "Unexpected end of expression at position 8."),
+])
+def test_prepare_invalid_expression(expression, message):
+    """
+    Test that malformed expressions are rejected at prepare time.
+    """
+    # Act & Assert
+    with pytest.raises(ValueError, match=message):
+        prepare(expression)
+
+
+def test_parser_exact_literals():
+    """
+    Test that the parser keeps integer literals exact only when asked to.
+    """
+    # Act
+    exact = Parser("2 ** 70 - 0x10 * x + 1.5", exact=True).parse()
+    floats = Parser("2 ** 70").parse()
+    negated = Parser("-x", exact=True).parse()
+
+    # Assert
+    assert exact.left.left.left.value == 2 and type(exact.left.left.left.value) is int
+    assert exact.left.right.left.value == 16 and exact.right.value == 1.5
+    assert type(floats.left.value) is float
+    assert negated.left.value == -1 and type(negated.left.value) is int
+
+
+def test_prepared_repr():
+    """
+    Test the repr of a prepared expression.
+    """
+    # Act
+    text = repr(prepare("x + y"))
+
+    # Assert
+    assert text == "PreparedExpression('x + y', parameters=('x', 'y'))"
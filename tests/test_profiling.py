@@ -0,0 +1,175 @@
+# tests/test_profiling.py
+
+"""
+Unit tests for the profiling module and the REPL profile commands using pytest.
+
+These tests check that only code run inside the profiler context is measured, that
+allocation sites are reported when memory tracing is on, and that profiles can be
+dumped for external tools.
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+import pstats
+import pytest
+import tracemalloc
+from io import StringIO
+from app.calculator import Calculator, parse_input
+from app.profiling import Profiler
+
+
+def test_profiler_reports_profiled_section():
+    """
+    Test that calls made inside the profiler context show up in the report.
+    """
+    # Arrange
+    profiler = Profiler()
+    profiler.start()
+
+    # Act
+    with profiler:
+        with profiler:
+            parse_input("10 + 5")
+    profiler.stop()
+    report = profiler.report()
+
+    # Assert
+    assert "parse_input" in report
+    assert "Top allocation sites" not in report
+
+
+def test_profiler_inactive_context_collects_nothing():
+    """
+    Test that the context manager is a no-op while profiling is off.
+    """
+    # Arrange
+    profiler = Profiler()
+
+    # Act
+    with profiler:
+        parse_input("10 + 5")
+
+    # Assert
+    assert profiler.report() == "No profile data collected."
+
+
+def test_profiler_memory_report():
+    """
+    Test that allocation sites are reported while and after tracing memory.
+    """
+    # Arrange
+    profiler = Profiler()
+    profiler.start(memory=True)
+
+    # Act
+    with profiler:
+        values = [parse_input(f"{i} + 1") for i in range(100)]
+    live_report = profiler.report()
+    profiler.stop()
+    final_report = profiler.report()
+
+    # Assert
+    assert len(values) == 100
+    assert "Top allocation sites" in live_report
+    assert "Top allocation sites" in final_report
+    assert not tracemalloc.is_tracing()
+
+
+def test_profiler_keeps_existing_tracemalloc_session():
+    """
+    Test that the profiler does not stop a tracemalloc session it did not start.
+    """
+    # Arrange
+    tracemalloc.start()
+    profiler = Profiler()
+
+    # Act
+    profiler.start(memory=True)
+    profiler.stop()
+
+    # Assert
+    assert tracemalloc.is_tracing()
+    tracemalloc.stop()
+
+
+def test_profiler_state_errors():
+    """
+    Test starting twice and stopping while off.
+    """
+    # Arrange
+    profiler = Profiler()
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="Profiling is off."):
+        profiler.stop()
+    profiler.start()
+    with pytest.raises(ValueError, match="Profiling is already on."):
+        profiler.start()
+
+
+def test_profiler_dump(tmp_path):
+    """
+    Test that dumped profiles can be loaded by pstats.
+    """
+    # Arrange
+    path = str(tmp_path / "calc.prof")
+    profiler = Profiler()
+    profiler.start()
+    with profiler:
+        parse_input("1 + 1")
+
+    # Act
+    profiler.dump(path)
+
+    # Assert
+    assert any(function[2] == 'parse_input' for function in pstats.Stats(path).stats)
+
+
+def test_profiler_finish(tmp_path, capsys):
+    """
+    Test that finishing a run stops the profiler, reports to stderr and dumps when given a path.
+    """
+    # Arrange
+    path = tmp_path / "run.prof"
+    profiler = Profiler()
+    profiler.start()
+    with profiler:
+        parse_input("1 + 1")
+
+    # Act
+    profiler.finish(str(path))
+    profiler.finish(str(tmp_path / "again.prof"))
+
+    # Assert
+    captured = capsys.readouterr()
+    assert not profiler.enabled
+    assert captured.out == "" and "parse_input" in captured.err
+    assert path.exists() and not (tmp_path / "again.prof").exists()
+
+
+def test_calculator_profile_commands(monkeypatch, capsys, tmp_path):
+    """
+    Test the profile REPL commands.
+    """
+    # Arrange
+    path = tmp_path / "repl.prof"
+    user_input = (f'profile\nprofile on\nprofile on\n10 + 5\nprofile dump {path}\nprofile off\n'
+                  f'profile off\nprofile bogus\nprofile on memory\n2 * 3\nexit\n')
+    monkeypatch.setattr('sys.stdin', StringIO(user_input))
+
+    # Act
+    with pytest.raises(SystemExit):
+        Calculator()
+
+    # Assert
+    captured = capsys.readouterr()
+    assert "No profile data collected." in captured.out
+    assert "Profiling on." in captured.out
+    assert "Profiling is already on." in captured.out
+    assert f"Profile written to '{path}'." in captured.out
+    assert "evaluate_input" in captured.out
+    assert "Profiling is off." in captured.out
+    assert "Usage: profile on [memory]" in captured.out
+    assert "Tracing memory allocations." in captured.out
+    assert "Top allocation sites" in captured.out
+    assert path.exists()
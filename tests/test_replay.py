@@ -0,0 +1,172 @@
+# tests/test_replay.py
+
+"""
+Unit tests for the replay module using pytest.
+
+These tests check that recorded histories are recomputed through the current factory
+and that results outside the tolerance, unknown operations and invalid operands are
+reported as mismatches, both inline and across worker processes.
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+import math
+from app.calculation import AddCalculation, DivCalculation, MulCalculation, PowCalculation
+from app.export import Columns
+from app.replay import ReplayReport, replay
+
+
+def make_columns(rows):
+    columns = Columns(['add', 'sub', 'mul', 'div', 'mod'])
+    for opcode, a, b, result in rows:
+        columns.opcodes.append(opcode)
+        columns.a.append(a)
+        columns.b.append(b)
+        columns.results.append(result)
+    return columns
+
+
+def test_replay_matching_history():
+    """
+    Test that an unchanged history replays without mismatches.
+    """
+    # Arrange
+    columns = Columns.from_history([AddCalculation(1.0, 2.0), MulCalculation(3.0, 4.0), DivCalculation(1.0, 3.0)])
+
+    # Act
+    report = replay(columns)
+
+    # Assert
+    assert report.ok
+    assert report.rows == 3
+    assert str(report) == "Replayed 3 calculations: 0 mismatches."
+
+
+def test_replay_reports_mismatches():
+    """
+    Test that wrong results, unknown operations and invalid operands are reported.
+    """
+    # Arrange
+    columns = make_columns([
+        (0, 1.0, 2.0, 3.0),
+        (2, 3.0, 4.0, 12.5),
+        (4, 5.0, 2.0, 1.0),
+        (3, 1.0, 0.0, math.inf),
+    ])
+
+    # Act
+    report = replay(columns)
+
+    # Assert
+    assert not report.ok
+    assert report.mismatch_count == 3
+    assert report.mismatches[0] == (1, 'mul', 3.0, 4.0, 12.5, 12.0, None)
+    assert report.mismatches[1][6] == "Unsupported calculation type: 'mod'."
+    assert report.mismatches[2][6] == "Division by zero not allowed."
+    assert "#2: mul 3.0 4.0 recorded 12.5, got 12.0" in str(report)
+
+
+def test_replay_tolerance():
+    """
+    Test that differences within the configured tolerance are accepted.
+    """
+    # Arrange
+    columns = make_columns([(0, 0.1, 0.2, 0.3), (0, 1.0, 1.0, 2.001)])
+
+    # Act
+    strict = replay(columns, rel_tol=1e-12)
+    loose = replay(columns, rel_tol=1e-3)
+    absolute = replay(columns, rel_tol=0.0, abs_tol=0.01)
+
+    # Assert
+    assert strict.mismatch_count == 1
+    assert loose.ok
+    assert absolute.ok
+
+
+def test_replay_nan_results_match():
+    """
+    Test that a recorded NaN matches a replayed NaN.
+    """
+    # Arrange
+    columns = make_columns([(0, math.nan, 1.0, math.nan)])
+
+    # Act & Assert
+    assert replay(columns).ok
+
+
+def test_replay_in_worker_processes():
+    """
+    Test that chunks replayed in worker processes give the same report.
+    """
+    # Arrange
+    columns = make_columns([(0, float(i), 1.0, float(i + 1)) for i in range(9)] + [(2, 2.0, 2.0, 5.0)])
+
+    # Act
+    report = replay(columns, workers=2, chunk_size=3)
+
+    # Assert
+    assert report.rows == 10
+    assert report.mismatch_count == 1
+    assert report.mismatches[0][0] == 9
+
+
+def test_replay_report_caps_mismatches():
+    """
+    Test that the report keeps a bounded number of mismatch details.
+    """
+    # Arrange
+    columns = make_columns([(0, 1.0, 1.0, 0.0)] * 5)
+
+    # Act
+    report = replay(columns, chunk_size=2, max_mismatches=3)
+
+    # Assert
+    assert report.mismatch_count == 5
+    assert len(report.mismatches) == 3
+    assert str(report).endswith("... 2 more")
+
+
+def test_replay_report_empty():
+    """
+    Test an empty report.
+    """
+    # Act
+    report = ReplayReport()
+
+    # Assert
+    assert report.ok
+    assert report.rows == 0
+
+
+def test_replay_counts_rows_that_fail_to_compute(monkeypatch):
+    """
+    Test that a row whose calculation raises is reported as a mismatch and the replay goes on.
+    """
+    # Arrange
+    columns = make_columns([(0, 1.0, 2.0, 3.0), (2, 3.0, 4.0, 12.0), (0, 5.0, 5.0, 10.0)])
+    monkeypatch.setattr(MulCalculation, 'exec', lambda self: 2.0 ** 2000.0)
+
+    # Act
+    report = replay(columns)
+
+    # Assert
+    assert report.rows == 3 and report.mismatch_count == 1
+    assert report.mismatches[0][:6] == (1, 'mul', 3.0, 4.0, 12.0, None)
+    assert "Numerical result out of range" in report.mismatches[0][6]
+
+
+def test_replay_exact_powers_exported_from_integer_mode():
+    """
+    Test that exact powers exported as infinity are reported, not raised, when replayed in floats.
+    """
+    # Arrange
+    columns = Columns.from_history([PowCalculation(2, 2000), PowCalculation(3, 4)])
+
+    # Act
+    report = replay(columns)
+
+    # Assert
+    assert report.rows == 2 and report.mismatch_count == 1
+    assert report.mismatches[0][4] == math.inf
+    assert "too large for a float" in report.mismatches[0][6]
@@ -0,0 +1,295 @@
+# tests/test_script.py
+
+"""
+Unit tests for compiled calculation scripts using pytest.
+
+These tests cover compiling a script into one program, variables read from and
+written back to the session, errors reported by script line, the in-process and
+on-disk caches keyed by the script's hash, and the run command in the REPL.
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+import marshal
+import math
+import os
+import pytest
+from io import StringIO
+from app.calculator import Calculator, run_script
+from app.script import CACHE_DIRECTORY, Program, compile_script, load_script
+from app.session import Session
+import app.script as script
+
+
+SCRIPT = """# monthly cost
+rate = 12.5 * 8   # per day
+days = 21
+
+rate * days
+total = rate * (days + extra)
+total
+"""
+
+
+@pytest.fixture(autouse=True)
+def programs(monkeypatch):
+    monkeypatch.setattr(script, '_programs', script.BoundedStore(max_entries=64))
+    return script._programs
+
+
+def run(program, variables=None):
+    outputs = []
+    assigned = program.run(lambda line, calculation, result: outputs.append((line, calculation, result)), variables)
+    return outputs, assigned
+
+
+def test_compile_and_run_script():
+    """
+    Test that outputs are emitted per line and assigned variables are returned.
+    """
+    # Arrange
+    program = compile_script(SCRIPT)
+
+    # Act
+    outputs, assigned = run(program, {'extra': 1.0})
+
+    # Assert
+    assert [(line, result) for line, _, result in outputs] == [(5, 2100.0), (7, 2200.0)]
+    assert str(outputs[0][1]) == "MulCalculation: 100.0 Mul 21.0 = 2100.0"
+    assert outputs[1][1] is None
+    assert assigned == {'rate': 100.0, 'days': 21.0, 'total': 2200.0}
+    assert program.inputs == (('extra', 6),)
+
+
+def test_script_literals_and_reassignment():
+    """
+    Test non-finite literals, negation and reassigning a variable from its previous value.
+    """
+    # Arrange
+    program = compile_script("x = 1e999\ny = -x\nn = 2\nn = n * n\nn = n * n\nn\nz = inf - x\nw = -NaN\n")
+
+    # Act
+    outputs, assigned = run(program)
+
+    # Assert
+    assert outputs == [(6, None, 16.0)]
+    assert assigned['x'] == math.inf and assigned['y'] == -math.inf and assigned['n'] == 16.0
+    assert math.isnan(assigned['z']) and math.isnan(assigned['w'])
+    assert program.inputs == ()
+
+
+def test_script_integer_mode(programs):
+    """
+    Test that integer mode keeps integer literals exact and compiles separately from float mode.
+    """
+    # Arrange
+    source = "big = 2 ** 100 + 1\nbig choose 1\nhalf = 3 / 2\nfive = 5 !\nlow = -big\n"
+
+    # Act
+    exact, exact_assigned = run(compile_script(source, exact=True))
+    floats, float_assigned = run(compile_script(source))
+
+    # Assert
+    assert exact_assigned == {'big': 2 ** 100 + 1, 'half': 1.5, 'five': 120, 'low': -2 ** 100 - 1}
+    assert exact[0][2] == 2 ** 100 + 1 and type(exact_assigned['five']) is int
+    assert float_assigned == {'big': float(2 ** 100), 'half': 1.5, 'five': 120.0, 'low': -float(2 ** 100)}
+    assert len(programs) == 2
+    with pytest.raises(ValueError, match="^Line 1: Integer literal too long at position 1.$"):
+        compile_script("x = " + "9" * 5000, exact=True)
+
+
+@pytest.mark.parametrize("source, message", [
+    ("x = 1 +\n", "Line 1: Unexpected end of expression at position 4."),
+    ("1 + 2\n\n(3\n", "Line 3: Missing closing parenthesis for position 0."),
+    ("x == 2\n", "Line 1: Unexpected token '=' at position 2."),
+])
+def test_script_syntax_errors(source, message):
+    """
+    Test that syntax errors name the script line.
+    """
+    # Act & Assert
+    with pytest.raises(ValueError, match=f"^{message}$"):
+        compile_script(source)
+
+
+def test_script_runtime_errors():
+    """
+    Test that undefined variables and failing calculations name the script line.
+    """
+    # Arrange
+    program = compile_script("a = 1\n# note\nb = a / 0\nb\n")
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="^Line 6: undefined variable 'extra'.$"):
+        run(compile_script(SCRIPT))
+    with pytest.raises(ValueError, match="^Line 3: Division by zero not allowed.$") as error:
+        run(program)
+    assert isinstance(error.value.__cause__, ZeroDivisionError)
+
+
+def test_compiled_programs_are_reused(programs):
+    """
+    Test that an unchanged source is compiled once and a changed one again.
+    """
+    # Act
+    first = compile_script("1 + 1\n")
+    second = compile_script("1 + 1\n")
+    third = compile_script("1 + 2\n")
+
+    # Assert
+    assert first is second and first is not third
+    assert len(programs) == 2
+
+
+def test_load_script_uses_the_disk_cache(tmp_path, programs, monkeypatch):
+    """
+    Test that a fresh process loads the compiled program from the cache directory.
+    """
+    # Arrange
+    path = tmp_path / "cost.calc"
+    path.write_text(SCRIPT)
+    load_script(str(path))
+    cached = list((tmp_path / CACHE_DIRECTORY).iterdir())
+    programs.clear()
+    compiled = []
+    monkeypatch.setattr(script, 'compile_script', lambda source: compiled.append(source))
+
+    # Act
+    program = load_script(str(path))
+
+    # Assert
+    assert len(cached) == 1 and cached[0].name.startswith(program.digest)
+    assert compiled == []
+    assert run(program, {'extra': 0.0})[1]['total'] == 2100.0
+    assert load_script(str(path)) is program
+
+
+@pytest.mark.parametrize("contents", [b'', b'junk', marshal.dumps((1, 2))])
+def test_load_script_ignores_bad_cache_files(tmp_path, programs, contents):
+    """
+    Test that unreadable cache files are replaced by a fresh compilation.
+    """
+    # Arrange
+    path = tmp_path / "a.calc"
+    path.write_text("2 * 3\n")
+    program = load_script(str(path))
+    cache_file = next((tmp_path / CACHE_DIRECTORY).iterdir())
+    cache_file.write_bytes(contents)
+    programs.clear()
+
+    # Act
+    reloaded = load_script(str(path))
+
+    # Assert
+    assert reloaded is not program and run(reloaded)[0][0][2] == 6.0
+    assert cache_file.read_bytes() == reloaded.dumps()
+
+
+def test_load_script_rejects_other_versions_and_hashes(tmp_path, programs, monkeypatch):
+    """
+    Test that cache files from another format version or for other text are not used.
+    """
+    # Arrange
+    path = tmp_path / "a.calc"
+    path.write_text("2 * 3\n")
+    data = load_script(str(path)).dumps()
+    cache_file = next((tmp_path / CACHE_DIRECTORY).iterdir())
+    other = compile_script("2 * 4\n")
+    cache_file.write_bytes(other.dumps())
+    programs.clear()
+
+    # Act
+    reloaded = load_script(str(path))
+    monkeypatch.setattr(script, '_FORMAT', 2)
+
+    # Assert
+    assert run(reloaded)[0][0][2] == 6.0
+    with pytest.raises(ValueError, match="Unsupported compiled script version: 1."):
+        Program.loads(data)
+
+
+def test_load_script_without_a_writable_cache(tmp_path, programs, monkeypatch):
+    """
+    Test that scripts still run when the cache directory cannot be written, or with the cache off.
+    """
+    # Arrange
+    path = tmp_path / "a.calc"
+    path.write_text("2 * 3\n")
+
+    def fail(*args, **kwargs):
+        raise PermissionError("read-only")
+
+    monkeypatch.setattr(os, 'makedirs', fail)
+
+    # Act
+    program = load_script(str(path))
+    uncached = load_script(str(path), use_cache=False)
+
+    # Assert
+    assert run(program)[0][0][2] == 6.0 and uncached is program
+    assert not (tmp_path / CACHE_DIRECTORY).exists()
+
+
+def test_run_script_updates_session(tmp_path, capsys):
+    """
+    Test that running a script prints results, records them and keeps assigned variables.
+    """
+    # Arrange
+    session = Session()
+    session.variables['extra'] = 1.0
+    path = tmp_path / "cost.calc"
+    path.write_text(SCRIPT)
+
+    # Act
+    ok = run_script(str(path), session)
+    failed = run_script(str(tmp_path / "missing.calc"), session)
+
+    # Assert
+    captured = capsys.readouterr()
+    assert ok and not failed
+    assert captured.out.startswith("2100.0\n2200.0\nERROR:  [Errno 2]")
+    assert len(session.history) == 1 and session.history.stats.count == 1
+    assert session.variables['total'] == 2200.0
+
+
+def test_run_script_follows_session_mode(tmp_path, capsys):
+    """
+    Test that a script run in an integer mode session computes exactly, and from the disk cache too.
+    """
+    # Arrange
+    session = Session()
+    session.exact = True
+    path = tmp_path / "exact.calc"
+    path.write_text("2 ** 70\n")
+
+    # Act
+    run_script(str(path), session)
+    script._programs.clear()
+    run_script(str(path), session)
+    session.exact = False
+    run_script(str(path), session)
+
+    # Assert
+    assert capsys.readouterr().out == "1180591620717411303424\n1180591620717411303424\n1.1805916207174113e+21\n"
+    assert len(os.listdir(tmp_path / CACHE_DIRECTORY)) == 2
+
+
+def test_calculator_run(tmp_path, monkeypatch, capsys):
+    """
+    Test the run command in the REPL, including a failing script.
+    """
+    # Arrange
+    (tmp_path / "ok.calc").write_text("x = 6 * 7\nx / 2\n")
+    (tmp_path / "bad.calc").write_text("x / 0\n")
+    monkeypatch.setattr('sys.stdin', StringIO(f"run {tmp_path / 'ok.calc'}\nrun {tmp_path / 'bad.calc'}\n"
+                                              "history\nexit\n"))
+
+    # Act
+    with pytest.raises(SystemExit):
+        Calculator()
+
+    # Assert
+    captured = capsys.readouterr()
+    assert ">>> 21.0\n" in captured.out
+    assert "ERROR:  Line 1: Division by zero not allowed." in captured.out
+    assert "1. DivCalculation: 42.0 Div 2.0 = 21.0" in captured.out
@@ -0,0 +1,211 @@
+# tests/test_server.py
+
+"""
+Unit tests for the HTTP JSON API using pytest.
+
+These tests cover single evaluations by expression and by operands, batches of
+mixed items streamed back in chunks, keep-alive connections reused across
+requests, malformed requests, and the address parsing behind --serve.
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+import http.client
+import json
+import threading
+import pytest
+from app.server import CalculatorServer, Evaluator, parse_address
+import app.server as server_module
+
+
+TOO_LARGE_FOR_FLOAT = "Result is too large for a float; switch to 'mode int' for exact results."
+
+
+@pytest.fixture
+def server():
+    server = CalculatorServer(('127.0.0.1', 0))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def connection(server):
+    connection = http.client.HTTPConnection('127.0.0.1', server.server_port, timeout=5)
+    yield connection
+    connection.close()
+
+
+def post(connection, path, body):
+    data = body if isinstance(body, bytes) else json.dumps(body).encode('utf-8')
+    connection.request('POST', path, body=data, headers={'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    return response, json.loads(response.read())
+
+
+@pytest.mark.parametrize("body, status, outcome", [
+    ({'expression': "2 * 7"}, 200, {'result': 14.0}),
+    ({'a': 7, 'op': '/', 'b': 2}, 200, {'result': 3.5}),
+    ({'a': 5, 'op': 'fact'}, 200, {'result': 120.0}),
+    ({'expression': "2 ** 70", 'exact': True}, 200, {'result': 2 ** 70}),
+    ({'expression': "1e308 * 10"}, 200, {'result': 'inf'}),
+    ({'expression': "1 / 0"}, 422, {'error': "Division by zero not allowed."}),
+    ({'expression': "1e20 ! 2"}, 422, {'error': TOO_LARGE_FOR_FLOAT}),
+    ({'a': 1e308, 'op': 'choose', 'b': 5}, 422, {'error': TOO_LARGE_FOR_FLOAT}),
+    ({'a': 1, 'op': 'nope', 'b': 2}, 422, {'error': "Unsupported calculation type: 'nope'."}),
+    ({'a': '1', 'op': '+', 'b': 2}, 422, {'error': server_module._BAD_ITEM}),
+    ({'a': 10 ** 400, 'op': '+', 'b': 1}, 422, {'error': server_module._TOO_LARGE}),
+    ({'a': 10 ** 400, 'op': '+', 'b': 1, 'exact': True}, 200, {'result': 10 ** 400 + 1}),
+])
+def test_eval(connection, body, status, outcome):
+    """
+    Test evaluating one expression or one set of operands.
+    """
+    # Act
+    response, result = post(connection, '/eval', body)
+
+    # Assert
+    assert response.status == status
+    assert result == outcome
+
+
+def test_batch_streams_mixed_items(connection, monkeypatch):
+    """
+    Test that a batch returns one outcome per item, in order, as a chunked JSON array.
+    """
+    # Arrange
+    monkeypatch.setattr(server_module, 'CHUNK_ROWS', 2)
+    items = ["1 + 2", {'a': 2, 'op': '*', 'b': 4}, "3 ? 4", {'a': 1, 'op': 'div', 'b': 0}, 12,
+             {'a': 1, 'op': '-', 'b': -10 ** 400}, "1e20 ! 2", "1e308 choose 5", "4 / 2"]
+
+    # Act
+    response, results = post(connection, '/batch', items)
+
+    # Assert
+    assert response.status == 200
+    assert response.getheader('Transfer-Encoding') == 'chunked'
+    assert results == [{'result': 3.0}, {'result': 8.0}, {'error': "Unsupported operation."},
+                       {'error': "Division by zero not allowed."}, {'error': server_module._BAD_ITEM},
+                       {'error': server_module._TOO_LARGE}, {'error': TOO_LARGE_FOR_FLOAT},
+                       {'error': TOO_LARGE_FOR_FLOAT}, {'result': 2.0}]
+
+
+def test_keep_alive_reuses_the_connection(server, connection):
+    """
+    Test that many requests, including streamed batches and empty ones, share one connection.
+    """
+    # Arrange
+    opened = []
+    original = server.process_request
+    server.process_request = lambda request, address: (opened.append(address), original(request, address))
+
+    # Act
+    outcomes = [post(connection, '/eval', {'expression': f"{i} + 1"})[1] for i in range(3)]
+    batches = [post(connection, '/batch', [])[1], post(connection, '/batch', ["5 - 3"])[1]]
+
+    # Assert
+    assert [outcome['result'] for outcome in outcomes] == [1.0, 2.0, 3.0]
+    assert batches == [[], [{'result': 2.0}]]
+    assert len(opened) == 1
+
+
+@pytest.mark.parametrize("method, path, body, status, message", [
+    ('POST', '/eval', b'{"expression": ', 400, "Invalid JSON"),
+    ('POST', '/eval', b'[1]', 400, "Expected an object"),
+    ('POST', '/batch', b'{}', 400, "Expected a JSON array"),
+    ('POST', '/other', b'{}', 404, "Unknown path: '/other'"),
+    ('GET', '/eval', None, 404, "Use POST /eval or POST /batch."),
+])
+def test_bad_requests(connection, method, path, body, status, message):
+    """
+    Test that malformed bodies and unknown paths get an error status and message.
+    """
+    # Act
+    connection.request(method, path, body=body)
+    response = connection.getresponse()
+
+    # Assert
+    assert response.status == status
+    assert message in json.loads(response.read())['error']
+
+
+def test_body_limits(connection, monkeypatch):
+    """
+    Test that bodies without a length or over the size limit are refused and the connection closed.
+    """
+    # Arrange
+    monkeypatch.setattr(server_module, 'MAX_BODY_BYTES', 10)
+    connection.putrequest('POST', '/eval')
+    connection.endheaders()
+
+    # Act
+    missing = connection.getresponse()
+    missing_error = json.loads(missing.read())['error']
+    connection.close()
+    oversized, oversized_error = post(connection, '/batch', ["1 + 1"] * 10)
+
+    # Assert
+    assert missing.status == 400 and missing_error == "A Content-Length header is required."
+    assert oversized.status == 400 and oversized_error['error'] == "Request body is larger than 10 bytes."
+    assert missing.getheader('Connection') == 'close'
+
+
+def test_logging_follows_verbose(server, connection, capsys):
+    """
+    Test that requests are only logged when the server is verbose.
+    """
+    # Act
+    post(connection, '/eval', {'expression': "1 + 1"})
+    quiet = capsys.readouterr().err
+    server.verbose = True
+    post(connection, '/eval', {'expression': "1 + 1"})
+
+    # Assert
+    assert quiet == ""
+    assert '"POST /eval HTTP/1.1" 200' in capsys.readouterr().err
+
+
+def test_evaluator_caches_calculation_classes():
+    """
+    Test that each operation is resolved once per evaluator, and operands stay exact in integer mode.
+    """
+    # Arrange
+    evaluator = Evaluator(exact=True)
+
+    # Act
+    outcomes = [evaluator.evaluate({'a': 10, 'op': '**', 'b': 1000}), evaluator.evaluate("3 ** 2"),
+                evaluator.evaluate({'a': 1, 'op': 'fx', 'b': 978}), evaluator.evaluate({'a': 1, 'op': '+', 'b': None}),
+                evaluator.evaluate("2 ** 10000000000")]
+
+    # Assert
+    assert outcomes[0]['result'] == f"1{'0' * 19}...{'0' * 20} (1,001 digits)"
+    assert outcomes[1] == {'result': 9}
+    assert outcomes[2] == {'error': "'fx' needs a 'fx' lookup and cannot run in bulk."}
+    assert outcomes[3] == {'error': server_module._BAD_ITEM}
+    assert outcomes[4]['error'].startswith("Result would have about 3,010,299,957 digits")
+    assert set(evaluator.classes) == {'pow', 'fx'}
+
+
+@pytest.mark.parametrize("text, address", [
+    ("8080", ('127.0.0.1', 8080)),
+    (":8080", ('127.0.0.1', 8080)),
+    ("0.0.0.0:80", ('0.0.0.0', 80)),
+])
+def test_parse_address(text, address):
+    """
+    Test parsing the --serve address.
+    """
+    # Act & Assert
+    assert parse_address(text) == address
+
+
+@pytest.mark.parametrize("text", ["", "host:", "host:http", "70000"])
+def test_parse_address_errors(text):
+    """
+    Test that addresses without a valid port are rejected.
+    """
+    # Act & Assert
+    with pytest.raises(ValueError, match="Expected \\[HOST:\\]PORT"):
+        parse_address(text)
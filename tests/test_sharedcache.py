@@ -0,0 +1,230 @@
+# tests/test_sharedcache.py
+
+"""
+Unit tests for the shared-memory result cache using pytest.
+
+These tests cover storing and finding results by (opcode, a, b), probing and
+overwriting in a full table, slots caught mid-write by the sequence numbers,
+unregistered classes kept out of the table, attaching from another process, and
+the parallel evaluator sharing one cache with its pool workers.
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+import math
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from app.calculation import AddCalculation, Calculation, MulCalculation, PowCalculation
+from app.parallel import ParallelEvaluator, _install_cache
+from app.prepared import prepare
+from app.sharedcache import SLOT_SIZE, SharedResultCache, _HEADER, _SEQUENCE
+import app.parallel as parallel
+import app.sharedcache as sharedcache
+
+
+@pytest.fixture
+def cache():
+    with SharedResultCache(capacity=64) as cache:
+        yield cache
+
+
+def _worker_put(start):
+    for a in range(start, start + 10):
+        parallel._worker_cache.put(AddCalculation.opcode, float(a), 1.0, a + 1.0)
+    return parallel._worker_cache.get(AddCalculation.opcode, float(start), 1.0)
+
+
+def test_put_and_get(cache):
+    """
+    Test that results are found by opcode and bit-exact operands.
+    """
+    # Act
+    cache.put(1, 2.0, 3.0, 5.0)
+    cache.put(1, -0.0, 1.0, 7.0)
+    cache.put(1, math.nan, 1.0, math.nan)
+    cache.put(1, 2.0, 3.0, 6.0)
+
+    # Assert
+    assert cache.get(1, 2.0, 3.0) == 6.0
+    assert cache.get(2, 2.0, 3.0) is None
+    assert cache.get(1, -0.0, 1.0) == 7.0 and cache.get(1, 0.0, 1.0) is None
+    assert math.isnan(cache.get(1, math.nan, 1.0))
+    assert (cache.hits, cache.misses) == (3, 2) and cache.hit_ratio == 0.6
+    assert len(cache) == 3
+
+
+def test_capacity_is_a_power_of_two():
+    """
+    Test the table size rounding and the size check.
+    """
+    # Act
+    with SharedResultCache(capacity=100) as cache, SharedResultCache(capacity=1) as single:
+        capacity, size, smallest = cache.capacity, cache._shared.size, single.capacity
+
+    # Assert
+    assert capacity == 128 and size >= _HEADER.size + 128 * SLOT_SIZE
+    assert smallest == 1
+    with pytest.raises(ValueError, match="Cache sizes must be positive."):
+        SharedResultCache(capacity=0)
+
+
+def test_full_table_overwrites_home_slot(monkeypatch):
+    """
+    Test that keys beyond the probe limit replace older entries instead of growing the table.
+    """
+    # Arrange
+    monkeypatch.setattr(sharedcache, 'MAX_PROBES', 2)
+
+    # Act
+    with SharedResultCache(capacity=4) as cache:
+        for a in range(20):
+            cache.put(0, float(a), 0.0, float(a))
+        found = [cache.get(0, float(a), 0.0) for a in range(20)]
+        entries, overwrites = len(cache), cache.overwrites
+
+    # Assert
+    assert entries == 4 and overwrites > 0
+    assert sum(value is not None for value in found) <= 4
+    assert all(value in (None, float(a)) for a, value in enumerate(found))
+
+
+def test_slots_being_written_are_misses(cache):
+    """
+    Test that an odd sequence number, or one that changed during the read, hides the slot.
+    """
+    # Arrange
+    cache.put(1, 2.0, 3.0, 5.0)
+    offset = next(index * SLOT_SIZE for index in range(cache.capacity)
+                  if _SEQUENCE.unpack_from(cache._slots, index * SLOT_SIZE)[0])
+    _SEQUENCE.pack_into(cache._slots, offset, 3)
+
+    # Act
+    writing = cache.get(1, 2.0, 3.0)
+    _SEQUENCE.pack_into(cache._slots, offset, 0xFFFFFFFE)
+    cache.put(1, 2.0, 3.0, 5.0)
+
+    # Assert
+    assert writing is None
+    assert _SEQUENCE.unpack_from(cache._slots, offset)[0] == 2
+    assert cache.get(1, 2.0, 3.0) == 5.0
+
+
+def test_get_or_compute(cache):
+    """
+    Test that float results are computed once and exact operands bypass the cache.
+    """
+    # Act
+    first = cache.get_or_compute(MulCalculation, 6.0, 7.0)
+    second = cache.get_or_compute(MulCalculation, 6.0, 7.0)
+    exact = cache.get_or_compute(PowCalculation, 2, 100)
+
+    # Assert
+    assert first == second == 42.0 and exact == 2 ** 100
+    assert (cache.hits, cache.misses, len(cache)) == (1, 1, 1)
+
+
+def test_unregistered_classes_bypass_the_cache(cache):
+    """
+    Test that classes without an opcode are computed every time and cannot be stored or looked up.
+    """
+    # Arrange
+    class Twice(Calculation):
+        def exec(self):
+            return 2 * self.a + self.b
+
+    class Thrice(Calculation):
+        def exec(self):
+            return 3 * self.a + self.b
+
+    # Act
+    twice = cache.get_or_compute(Twice, 2.0, 1.0)
+    thrice = cache.get_or_compute(Thrice, 2.0, 1.0)
+
+    # Assert
+    assert Twice.opcode == Thrice.opcode == -1
+    assert (twice, thrice) == (5.0, 7.0)
+    assert (cache.hits, cache.misses, len(cache)) == (0, 0, 0)
+    with pytest.raises(ValueError, match="Invalid opcode: -1."):
+        cache.put(-1, 2.0, 1.0, 5.0)
+    with pytest.raises(ValueError, match="Invalid opcode: -1."):
+        cache.get(-1, 2.0, 1.0)
+
+
+def test_attach_and_close(cache):
+    """
+    Test that another handle sees the same table, and that only the owner removes it.
+    """
+    # Arrange
+    cache.put(1, 1.0, 1.0, 2.0)
+    attach, arguments = cache.__reduce__()
+    other = attach(*arguments)
+    foreign = SharedMemory(create=True, size=64)
+
+    # Act
+    other.put(1, 2.0, 2.0, 4.0)
+    value = cache.get(1, 2.0, 2.0)
+    other.close()
+    other.close()
+
+    # Assert
+    assert value == 4.0 and other.capacity == cache.capacity and not other.owner
+    assert cache.get(1, 1.0, 1.0) == 2.0
+    with pytest.raises(ValueError, match="does not hold a result cache"):
+        SharedResultCache.attach(foreign.name, cache._lock)
+    foreign.close()
+    foreign.unlink()
+    name = cache.name
+    cache.close()
+    with pytest.raises(FileNotFoundError):
+        SharedMemory(name=name)
+
+
+def test_worker_processes_share_results(cache):
+    """
+    Test that results written by pool workers are visible to the other processes.
+    """
+    # Act
+    with ProcessPoolExecutor(max_workers=2, initializer=_install_cache, initargs=(cache,)) as executor:
+        found = list(executor.map(_worker_put, (0, 10, 20)))
+
+    # Assert
+    assert found == [1.0, 11.0, 21.0]
+    assert [cache.get(AddCalculation.opcode, float(a), 1.0) for a in (0, 15, 29)] == [1.0, 16.0, 30.0]
+
+
+def test_worker_apply_uses_installed_cache(cache, monkeypatch):
+    """
+    Test the function pool workers run, before and after a cache is installed.
+    """
+    # Arrange
+    monkeypatch.setattr(parallel, '_worker_cache', None)
+
+    # Act
+    uncached = parallel._apply(MulCalculation, 2.0, 4.0)
+    _install_cache(cache)
+    cached = parallel._apply(MulCalculation, 2.0, 4.0)
+
+    # Assert
+    assert uncached == cached == 8.0
+    assert cache.get(MulCalculation.opcode, 2.0, 4.0) == 8.0 and cache.misses == 1
+
+
+@pytest.mark.parametrize("processes", [False, True])
+def test_parallel_evaluator_uses_shared_cache(cache, processes):
+    """
+    Test that expensive nodes evaluated on threads, processes or inline are stored in the shared cache.
+    """
+    # Arrange
+    prepared = prepare("(a * b) + (a - b)")
+
+    # Act
+    with ParallelEvaluator(workers=2, processes=processes, dispatch_cost=1, shared_cache=cache) as evaluator:
+        first = evaluator.evaluate(prepared, (5.0, 3.0))
+        second = evaluator.evaluate(prepared, (5.0, 3.0))
+
+    # Assert
+    assert first == second == 17.0
+    assert cache.get(MulCalculation.opcode, 5.0, 3.0) == 15.0
+    assert cache.get(AddCalculation.opcode, 15.0, 2.0) == 17.0
+    assert parallel._worker_cache is None
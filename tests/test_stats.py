@@ -0,0 +1,187 @@
+# tests/test_stats.py
+
+"""
+Unit tests for running result statistics using pytest.
+
+These tests cover Welford moments against a full recomputation, P-square quantile
+estimates against exact percentiles, the exact answers for the first few results,
+skipped results, and the statistics kept by the history and shown by the REPL.
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+import math
+import random
+import statistics
+import pytest
+from io import StringIO
+from app.calculation import AddCalculation
+from app.calculator import Calculator, evaluate_input
+from app.history import History
+from app.integers import Mod
+from app.stats import P2Quantile, ResultStats
+from app.units import Quantity
+
+
+@pytest.mark.parametrize("draw", [
+    lambda rng: rng.uniform(-1000, 1000),
+    lambda rng: rng.lognormvariate(0, 2),
+    lambda rng: rng.gauss(5, 3),
+], ids=['uniform', 'lognormal', 'normal'])
+def test_running_stats_match_exact_values(draw):
+    """
+    Test that moments are exact and quantile estimates are within a percent of the true percentiles.
+    """
+    # Arrange
+    rng = random.Random(7)
+    values = [draw(rng) for _ in range(20_000)]
+    stats = ResultStats()
+
+    # Act
+    for value in values:
+        stats.add(value)
+
+    # Assert
+    ordered = sorted(values)
+    assert stats.count == len(values)
+    assert stats.mean == pytest.approx(statistics.fmean(values), rel=1e-9, abs=1e-9)
+    assert stats.variance == pytest.approx(statistics.variance(values), rel=1e-9)
+    assert stats.stddev == pytest.approx(statistics.stdev(values), rel=1e-9)
+    assert (stats.minimum, stats.maximum) == (ordered[0], ordered[-1])
+    spread = ordered[-1] - ordered[0]
+    for p in (0.5, 0.95, 0.99):
+        exact = ordered[math.ceil(p * len(ordered)) - 1]
+        assert abs(stats.quantile(p) - exact) < 0.01 * spread + 0.01 * abs(exact)
+
+
+def test_quantiles_are_exact_for_the_first_results():
+    """
+    Test that quantiles use nearest rank until the estimator has five observations.
+    """
+    # Arrange
+    estimator = P2Quantile(0.5)
+
+    # Act & Assert
+    assert math.isnan(estimator.value)
+    for value, median in ((3.0, 3.0), (1.0, 1.0), (2.0, 2.0), (10.0, 2.0), (0.0, 2.0)):
+        estimator.add(value)
+        assert estimator.value == median
+    for value in (11.0, 12.0, -5.0, 4.0):
+        estimator.add(value)
+    assert estimator.count == 9 and 1.0 <= estimator.value <= 4.0
+
+
+def test_quantile_estimator_on_sorted_input():
+    """
+    Test that estimates track monotonic streams, which move the markers in one direction only.
+    """
+    # Arrange
+    rising, falling = P2Quantile(0.9), P2Quantile(0.9)
+
+    # Act
+    for value in range(1, 10_001):
+        rising.add(float(value))
+        falling.add(float(10_001 - value))
+
+    # Assert
+    assert rising.value == pytest.approx(9000, rel=0.01)
+    assert falling.value == pytest.approx(9000, rel=0.01)
+
+
+def test_stats_skip_values_off_the_number_line():
+    """
+    Test that quantities, moduli, non-finite values and huge integers are counted but not summarized.
+    """
+    # Arrange
+    stats = ResultStats()
+
+    # Act
+    for value in (Quantity(1, 'km'), Mod(3, 7), math.inf, math.nan, 10 ** 400, 4, 6.0):
+        stats.add(value)
+
+    # Assert
+    assert (stats.count, stats.skipped) == (2, 5)
+    assert stats.mean == 5.0 and stats.variance == 2.0
+    assert str(stats).startswith("Results: 2 (5 skipped)\n")
+
+
+def test_stats_report_and_reset():
+    """
+    Test the report text, unknown quantiles and resetting.
+    """
+    # Arrange
+    stats = ResultStats(quantiles=(0.5, 0.999))
+    stats.add(2.0)
+
+    # Act
+    text = str(stats)
+
+    # Assert
+    assert text.splitlines() == ["Results: 1", "    mean     : 2", "    stddev   : 0", "    variance : 0",
+                                 "    min      : 2", "    max      : 2", "    p50      : 2", "    p99.9    : 2"]
+    with pytest.raises(ValueError, match="Quantile 0.95 is not tracked. Tracked: 0.5, 0.999"):
+        stats.quantile(0.95)
+    with pytest.raises(ValueError, match="Quantiles must be between 0 and 1."):
+        P2Quantile(1.0)
+    stats.reset()
+    assert str(stats) == "No results yet." and stats.count == 0 and list(stats.quantiles) == [0.5, 0.999]
+
+
+def test_stats_to_dict_round_trip():
+    """
+    Test that statistics rebuilt from their plain-data form report and update like the original.
+    """
+    # Arrange
+    stats = ResultStats(quantiles=(0.5, 0.9))
+    for value in [float(x) for x in range(1, 40)] + ['skipped']:
+        stats.add(value)
+
+    # Act
+    copy = ResultStats.from_dict(stats.to_dict())
+    for summary in (stats, copy):
+        summary.add(100.0)
+
+    # Assert
+    assert str(copy) == str(stats)
+    assert copy.to_dict() == stats.to_dict() and copy.skipped == 1
+
+
+def test_history_keeps_stats_without_rerunning():
+    """
+    Test that the history only summarizes results it is given, and keeps them after undo.
+    """
+    # Arrange
+    history = History()
+
+    # Act
+    evaluate_input("1 + 2", history)
+    evaluate_input("1 / 0", history)
+    evaluate_input("10 * 2", history)
+    history.append(AddCalculation(1.0, 1.0))
+    history.undo()
+
+    # Assert
+    assert history.stats.count == 2
+    assert history.stats.mean == 11.5
+    assert history.stats.maximum == 20.0
+
+
+def test_calculator_stats(monkeypatch, capsys):
+    """
+    Test the stats commands in the REPL.
+    """
+    # Arrange
+    monkeypatch.setattr('sys.stdin', StringIO('stats\n1 + 1\n2 * 2\nstats results\nstats reset\nstats\nstats x\n'
+                                              'exit\n'))
+
+    # Act
+    with pytest.raises(SystemExit):
+        Calculator()
+
+    # Assert
+    captured = capsys.readouterr()
+    assert captured.out.count("No results yet.") == 2
+    assert "Results: 2\n    mean     : 3\n" in captured.out
+    assert "    p99      : 4\n" in captured.out
+    assert "Statistics reset." in captured.out
+    assert "Usage: stats [results] | stats reset" in captured.out
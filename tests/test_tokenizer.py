@@ -0,0 +1,108 @@
+# tests/test_tokenizer.py
+
+"""
+Unit tests for the single-pass tokenizer using pytest.
+
+These tests cover unspaced input, signed numbers, scientific notation, hexadecimal and
+underscore literals, multi-character operators and the positions reported for tokens.
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+import pytest
+from app.tokenizer import Token, is_number, to_number, tokenize
+
+
+def kinds_and_texts(expression):
+    return [(token.kind, token.text) for token in tokenize(expression)]
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("10+5", [('number', '10'), ('symbol', '+'), ('number', '5')]),
+    ("-3*-2", [('number', '-3'), ('symbol', '*'), ('number', '-2')]),
+    ("10 -5", [('number', '10'), ('symbol', '-'), ('number', '5')]),
+    ("(1)-2", [('symbol', '('), ('number', '1'), ('symbol', ')'), ('symbol', '-'), ('number', '2')]),
+    ("a-1", [('name', 'a'), ('symbol', '-'), ('number', '1')]),
+    ("1.5e-3/+.25", [('number', '1.5e-3'), ('symbol', '/'), ('number', '+.25')]),
+    ("1e+", [('number', '1'), ('name', 'e'), ('symbol', '+')]),
+    ("0x1F*1_000", [('number', '0x1F'), ('symbol', '*'), ('number', '1_000')]),
+    ("0x+1", [('number', '0'), ('name', 'x'), ('symbol', '+'), ('number', '1')]),
+    ("1__0", [('number', '1'), ('name', '__0')]),
+    ("2**10", [('number', '2'), ('symbol', '**'), ('number', '10')]),
+    ("-.", [('symbol', '-'), ('symbol', '.')]),
+    ("x_1 ^ y", [('name', 'x_1'), ('symbol', '^'), ('name', 'y')]),
+    ("  \t", []),
+    ("1._5", [('number', '1.'), ('name', '_5')]),
+    ("0x1_f_", [('number', '0x1_f'), ('name', '_')]),
+    ("1 \t\n  +   2", [('number', '1'), ('symbol', '+'), ('number', '2')]),
+    ("-inf*-NaN", [('name', '-inf'), ('symbol', '*'), ('name', '-NaN')]),
+    ("1-inf", [('number', '1'), ('symbol', '-'), ('name', 'inf')]),
+    ("-info", [('symbol', '-'), ('name', 'info')]),
+])
+def test_tokenize(expression, expected):
+    """
+    Test that the scanner splits expressions into the expected tokens.
+    """
+    # Act
+    tokens = kinds_and_texts(expression)
+
+    # Assert
+    assert tokens == expected
+
+
+def test_tokenize_positions():
+    """
+    Test that every token records the offset it starts at.
+    """
+    # Act
+    tokens = tokenize("  12 *  -4")
+
+    # Assert
+    assert tokens == [Token('number', '12', 2), Token('symbol', '*', 5), Token('number', '-4', 8)]
+
+
+def test_tokenize_limit():
+    """
+    Test that scanning stops once the requested number of tokens is found.
+    """
+    # Act
+    tokens = tokenize("1 + 2 " + "+" * 10_000, limit=4)
+
+    # Assert
+    assert tokens == [Token('number', '1', 0), Token('symbol', '+', 2), Token('number', '2', 4),
+                      Token('symbol', '+', 6)]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("10", 10.0),
+    ("-2.5", -2.5),
+    ("1e3", 1000.0),
+    ("1_000.5", 1000.5),
+    ("0x10", 16.0),
+    ("-0X1_0", -16.0),
+    ("+0xff", 255.0),
+    ("0x" + "f" * 300, float('inf')),
+    ("-0x" + "f" * 300, float('-inf')),
+])
+def test_to_number(text, expected):
+    """
+    Test converting number lexemes into floats.
+    """
+    # Act & Assert
+    assert to_number(text) == expected
+
+
+@pytest.mark.parametrize("token, expected", [
+    (Token('number', '1', 0), True),
+    (Token('name', 'inf', 0), True),
+    (Token('name', 'NaN', 0), True),
+    (Token('name', '-Infinity', 0), True),
+    (Token('name', 'x', 0), False),
+    (Token('symbol', '+', 0), False),
+])
+def test_is_number(token, expected):
+    """
+    Test which tokens can stand for a number.
+    """
+    # Act & Assert
+    assert is_number(token) is expected
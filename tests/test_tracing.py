@@ -0,0 +1,185 @@
+# tests/test_tracing.py
+
+"""
+Unit tests for sampled evaluation tracing using pytest.
+
+These tests cover the spans recorded for each stage of an evaluation, failures
+recorded on the trace, head-based sampling, the Chrome trace file, and the trace
+command in the REPL.
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+import json
+import pytest
+from io import StringIO
+from app.calculator import Calculator, evaluate_input
+from app.history import History
+from app.session import Session
+from app.tracing import Tracer
+import app.tracing as tracing
+
+
+def spans(tracer):
+    # Events of each traced evaluation, grouped under their "evaluate" span.
+    traces = []
+    for event in tracer.events:
+        if event['name'] == 'evaluate':
+            traces.append((event, []))
+        else:
+            traces[-1][1].append(event['name'])
+    return traces
+
+
+@pytest.fixture
+def tracer():
+    tracer = Tracer(seed=1)
+    tracer.start(1.0)
+    return tracer
+
+
+def test_spans_cover_each_stage(tracer, capsys):
+    """
+    Test that a traced evaluation has one span per stage, inside its evaluate span.
+    """
+    # Act
+    evaluate_input("6 * 7", History(), tracer=tracer)
+
+    # Assert
+    [(parent, names)] = spans(tracer)
+    children = list(tracer.events)[1:]
+    assert names == ['parse_input', 'create_calculation', 'exec', 'history.append']
+    assert parent['args'] == {'input': "6 * 7"} and parent['ph'] == 'X'
+    # Times are microseconds as floats; ts + dur may round a nanosecond past the next span's start.
+    slack = 1e-3
+    assert all(parent['ts'] <= child['ts'] and child['ts'] + child['dur'] <= parent['ts'] + parent['dur'] + slack
+               for child in children)
+    assert all(earlier['ts'] + earlier['dur'] <= later['ts'] + slack for earlier, later in zip(children, children[1:]))
+    assert capsys.readouterr().out == "42.0\n"
+
+
+@pytest.mark.parametrize("expression, names, error", [
+    ("1 ? 2", ['parse_input'], "Unsupported operation."),
+    ("1 / 0", ['parse_input', 'create_calculation', 'exec'], "Cannot divide by zero."),
+    ("10 ** 1000", ['parse_input', 'create_calculation', 'exec'], "10.0 ** 1000.0 is too large for a float"),
+    ("1 fx 978", ['parse_input', 'create_calculation', 'lookup'], "No rate source named 'fx' is configured."),
+])
+def test_failures_are_recorded(tracer, expression, names, error):
+    """
+    Test that an evaluation ending in an error keeps its spans and the message.
+    """
+    # Act
+    evaluate_input(expression, History(), tracer=tracer)
+
+    # Assert
+    [(parent, recorded)] = spans(tracer)
+    assert recorded == names
+    assert parent['args']['error'].startswith(error)
+
+
+def test_lookup_span(tracer, capsys):
+    """
+    Test that resolving a looked-up value gets its own span.
+    """
+    # Arrange
+    class Rates:
+        def resolve(self, calculations):
+            for calculation in calculations:
+                calculation.value = 0.5
+
+    # Act
+    evaluate_input("10 fx 978", History(), lookups=Rates(), tracer=tracer)
+
+    # Assert
+    assert spans(tracer)[0][1] == ['parse_input', 'create_calculation', 'lookup', 'exec', 'history.append']
+    assert capsys.readouterr().out == "5.0\n"
+
+
+def test_head_based_sampling(monkeypatch, capsys):
+    """
+    Test that only the sampled share of evaluations is traced, and nothing while tracing is off.
+    """
+    # Arrange
+    tracer = Tracer(seed=7)
+    history = History()
+    monkeypatch.setattr(tracing, 'MAX_INPUT_LENGTH', 3)
+
+    # Act
+    evaluate_input("1 + 1", history, tracer=tracer)
+    off = tracer.traces
+    tracer.start(0.25)
+    for _ in range(400):
+        evaluate_input("1 + 1", history, tracer=tracer)
+
+    # Assert
+    assert off == 0
+    assert 60 < tracer.traces < 140
+    assert len(tracer.events) == 5 * tracer.traces
+    assert spans(tracer)[0][0]['args'] == {'input': "1 +"}
+    with pytest.raises(ValueError, match="Sample rate must be above 0 and at most 1."):
+        tracer.start(0.0)
+
+
+def test_event_buffer_is_bounded(capsys):
+    """
+    Test that the oldest events are dropped once the buffer is full.
+    """
+    # Arrange
+    tracer = Tracer(max_events=12)
+    tracer.start(1.0)
+
+    # Act
+    for i in range(5):
+        evaluate_input(f"{i} + 1", History(), tracer=tracer)
+
+    # Assert
+    assert tracer.traces == 5 and len(tracer.events) == 12
+    assert tracer.events[-5]['args'] == {'input': "4 + 1"}
+
+
+def test_export_writes_chrome_trace_json(tracer, tmp_path, capsys):
+    """
+    Test that the exported file is Chrome trace JSON with complete events and a process name.
+    """
+    # Arrange
+    evaluate_input("2 + 3", History(), tracer=tracer)
+    path = tmp_path / "trace.json"
+
+    # Act
+    traces = tracer.export(str(path))
+
+    # Assert
+    data = json.loads(path.read_text())
+    metadata, *events = data['traceEvents']
+    assert traces == 1 and data['displayTimeUnit'] == 'ns'
+    assert metadata['ph'] == 'M' and metadata['args'] == {'name': 'calculator'}
+    assert len(events) == 5 and all(event['ph'] == 'X' and event['dur'] >= 0 for event in events)
+    assert all(set(event) >= {'name', 'cat', 'ts', 'dur', 'pid', 'tid'} for event in events)
+
+
+def test_calculator_trace(tmp_path, monkeypatch, capsys):
+    """
+    Test the trace commands in the REPL and the export on exit.
+    """
+    # Arrange
+    session = Session()
+    session.tracer.path = str(tmp_path / "exit.json")
+    dump = tmp_path / "dump.json"
+    monkeypatch.setattr('sys.stdin', StringIO(f"trace\ntrace on 1\n5 - 2\ntrace dump {dump}\ntrace clear\n"
+                                              f"trace off\n5 - 2\ntrace on 2\ntrace dump\n"
+                                              f"trace dump {tmp_path / 'missing' / 'x.json'}\nexit\n"))
+
+    # Act
+    with pytest.raises(SystemExit):
+        Calculator(session=session)
+
+    # Assert
+    captured = capsys.readouterr()
+    assert "Tracing off; 0 evaluations traced, 0 events buffered." in captured.out
+    assert "Tracing on, sampling 100.00%; 0 evaluations traced" in captured.out
+    assert f"Wrote 1 traces to '{dump}'." in captured.out
+    assert "ERROR:  Sample rate must be above 0 and at most 1." in captured.out
+    assert "Usage: trace on [rate] | trace off | trace dump <file> | trace clear" in captured.out
+    assert "ERROR:  [Errno 2]" in captured.out
+    assert len(json.loads(dump.read_text())['traceEvents']) == 6
+    assert len(json.loads((tmp_path / "exit.json").read_text())['traceEvents']) == 1
@@ -0,0 +1,256 @@
+# tests/test_units.py
+
+"""
+Unit tests for unit-aware quantities using pytest.
+
+These tests cover the precomputed unit table, compound units and their interning,
+quantity arithmetic with conversions and incompatible units, display-time
+simplification, and quantities in parse_input, evaluate_input and the REPL.
+
+Tests are organized following the AAA (Arrange, Act, Assert) pattern.
+"""
+
+import pytest
+from io import StringIO
+from app.cache import ResultCache
+from app.calculator import Calculator, evaluate_input, parse_input
+from app.history import History
+from app.units import UNITS, Quantity, find_unit, get_unit
+import app.units as units
+
+
+@pytest.mark.parametrize("name, scale, dims", [
+    ('km', 1e3, (1, 0, 0, 0)),
+    ('mg', 1e-6, (0, 1, 0, 0)),
+    ('h', 3600.0, (0, 0, 1, 0)),
+    ('MiB', 2 ** 20, (0, 0, 0, 1)),
+    ('kbit', 125.0, (0, 0, 0, 1)),
+    ('mi', 1609.344, (1, 0, 0, 0)),
+])
+def test_unit_table(name, scale, dims):
+    """
+    Test that unit names resolve to their SI scale and dimensions.
+    """
+    # Act
+    unit = UNITS[name]
+
+    # Assert
+    assert unit.scale == pytest.approx(scale)
+    assert unit.dims == dims
+    assert str(unit) == name and repr(unit) == f"Unit({name!r})"
+
+
+def test_compound_units_are_interned():
+    """
+    Test that compound units are parsed once and that equal combinations are the same object.
+    """
+    # Act
+    speed = get_unit('MB/s')
+    force = get_unit('kg*m/s^2')
+
+    # Assert
+    assert speed is find_unit('MB/s') is UNITS['MB'] / UNITS['s']
+    assert speed.scale == 1e6 and speed.dims == (0, 0, -1, 1)
+    assert force is UNITS['kg'] * UNITS['m'] / UNITS['s'] / UNITS['s']
+    assert str(force) == 'kg*m/s^2'
+    assert str(get_unit('s/s^-1')) == 's^2'
+    assert str(get_unit('m/s/kg')) == 'm/kg*s'
+    assert str(UNITS['s'] / UNITS['m']) == 's/m'
+    assert str(find_unit('m') / UNITS['m'] / UNITS['s']) == '1/s'
+
+
+@pytest.mark.parametrize("text", ['xx', 'km/xx', 'm^13', 'm/s^-20', 'km//s', ''])
+def test_unknown_units(text):
+    """
+    Test that unknown names and oversized exponents are not units.
+    """
+    # Act & Assert
+    assert find_unit(text) is None
+    with pytest.raises(ValueError, match="Unknown unit"):
+        get_unit(text)
+
+
+def test_compound_cache_is_bounded(monkeypatch):
+    """
+    Test that compound spellings are only memoized up to the cap.
+    """
+    # Arrange
+    monkeypatch.setattr(units, '_compound', {})
+    monkeypatch.setattr(units, '_MAX_COMPOUND', 1)
+
+    # Act
+    find_unit('km/h')
+    find_unit('mi/h')
+
+    # Assert
+    assert list(units._compound) == ['km/h']
+    assert find_unit('mi/h') is get_unit('mi') / get_unit('h')
+
+
+def test_add_and_subtract_convert_to_the_left_unit():
+    """
+    Test that sums keep the left operand's unit and same-unit sums are not scaled.
+    """
+    # Act
+    total = Quantity(5, 'km') + Quantity(300, 'm')
+    difference = Quantity(1, 'h') - Quantity(30, 'min')
+    same = Quantity(2, 'GB') - Quantity(0.5, 'GB')
+
+    # Assert
+    assert (total.value, str(total.unit)) == (pytest.approx(5.3), 'km')
+    assert str(difference) == '0.5 h'
+    assert str(same) == '1.5 GB'
+    assert str(Quantity(1, 'B') + Quantity(1, 'B')) == '2 B'
+
+
+@pytest.mark.parametrize("operation, message", [
+    (lambda: Quantity(1, 'km') + Quantity(1, 's'), "cannot add km and s."),
+    (lambda: Quantity(1, 'km') - Quantity(1, 's'), "cannot subtract km and s."),
+    (lambda: Quantity(1, 'km') + 1, "cannot add km and a plain number."),
+    (lambda: 1 + Quantity(1, 'km'), "cannot add km and a plain number."),
+    (lambda: Quantity(1, 'km') - 1, "cannot subtract km and a plain number."),
+    (lambda: 1 - Quantity(1, 'km'), "cannot subtract km and a plain number."),
+    (lambda: Quantity(1, 'km').to('kg'), "cannot convert km to kg."),
+])
+def test_incompatible_units(operation, message):
+    """
+    Test that mixing dimensions raises a ValueError naming both units.
+    """
+    # Act & Assert
+    with pytest.raises(ValueError, match=f"Incompatible units: {message}"):
+        operation()
+
+
+def test_multiply_and_divide_combine_units():
+    """
+    Test that products and quotients combine units and collapse to numbers when dimensionless.
+    """
+    # Act
+    rate = Quantity(10, 'MB') / Quantity(2, 's')
+    ratio = Quantity(1, 'km') / Quantity(250, 'm')
+    scaled = Quantity(3, 'm') * 2
+    area = 2 * Quantity(3, 'm') * Quantity(4, 'm')
+    halved = Quantity(3, 'm') / 2
+    inverse = 2 / Quantity(4, 's')
+
+    # Assert
+    assert str(rate) == '5.0 MB/s'
+    assert ratio == 4.0 and type(ratio) is float
+    assert str(scaled) == '6 m' and str(area) == '24 m^2' and str(halved) == '1.5 m'
+    assert str(inverse) == '0.5 1/s'
+    assert str(-Quantity(3, 'm')) == '-3 m'
+
+
+def test_results_are_simplified_for_display():
+    """
+    Test that names measuring the same dimension are merged only when a result is shown.
+    """
+    # Act
+    transferred = Quantity(10, 'MB/s') * Quantity(2, 'min')
+    mixed = Quantity(2, 'km*m')
+    distance = Quantity(3, 'm*min/s')
+
+    # Assert
+    assert str(transferred.unit) == 'MB*min/s'
+    assert str(transferred) == '1200.0 MB'
+    assert str(mixed) == '0.002 km^2'
+    assert str(distance) == '180.0 m'
+    assert transferred.unit.simplified() is transferred.unit.simplified()
+    assert UNITS['m'].simplified() == (UNITS['m'], 1.0)
+
+
+def test_conversion_and_comparison():
+    """
+    Test conversion, SI values, equality across units and hashing.
+    """
+    # Arrange
+    distance = Quantity(1.5, 'km')
+
+    # Act
+    converted = distance.to('m')
+
+    # Assert
+    assert str(converted) == '1500.0 m' and converted.to(UNITS['km']).value == 1.5
+    assert float(Quantity(2, 'KiB')) == 2048.0
+    assert converted == distance and hash(converted) == hash(distance)
+    assert Quantity(1000, 'm') != Quantity(1000, 'g')
+    assert Quantity(0, 's') == 0 and Quantity(1, 's') != 1 and Quantity(0, 's') != 'x'
+    assert repr(distance) == "Quantity(1.5, 'km')"
+
+
+@pytest.mark.parametrize("expression, expected", [
+    ("5 km + 300 m", ('add', Quantity(5, 'km'), Quantity(300, 'm'))),
+    ("10 MB / 2 s", ('div', Quantity(10, 'MB'), Quantity(2, 's'))),
+    ("9.8 m/s^2 * 3 kg", ('mul', Quantity(9.8, 'm/s^2'), Quantity(3, 'kg'))),
+    ("2 km/m * 3", ('mul', 2000.0, 3.0)),
+    ("1e3 mi add 1 km", ('add', Quantity(1e3, 'mi'), Quantity(1, 'km'))),
+])
+def test_parse_input_with_units(expression, expected):
+    """
+    Test that numbers followed by units parse into quantities.
+    """
+    # Act
+    parsed = parse_input(expression)
+
+    # Assert
+    assert parsed == expected
+    assert [type(value) for value in parsed] == [type(value) for value in expected]
+
+
+@pytest.mark.parametrize("expression, message", [
+    ("5 km/xx + 1 m", "Wrong expression format: unknown unit 'km/xx' at position 2."),
+    ("5 km + 1 m/xx", "Wrong expression format: unknown unit 'm/xx' at position 9."),
+    ("5 xx + 1", "Wrong expression format: expected an operation at position 2."),
+    ("5 km", "Wrong expression format: incomplete expression at position 4."),
+    ("5 m/s", "Wrong expression format: incomplete expression at position 5."),
+    ("5 km +", "Wrong expression format: incomplete expression at position 6."),
+    ("5 km + 1 m 2", "Wrong expression format: unexpected '2' at position 11."),
+    ("5 km + 1 m / s", "Wrong expression format: unexpected '/' at position 11."),
+    ("5 km + m", "Wrong expression format: expected a number at position 7."),
+])
+def test_parse_input_unit_errors(expression, message):
+    """
+    Test the errors for unknown units and misplaced tokens around units.
+    """
+    # Act & Assert
+    with pytest.raises(ValueError, match=message):
+        parse_input(expression)
+
+
+def test_evaluate_input_with_units_bypasses_cache(capsys):
+    """
+    Test that quantities are evaluated, shown with their unit, and never stored in the result cache.
+    """
+    # Arrange
+    history = History()
+    cache = ResultCache()
+
+    # Act
+    evaluate_input("5 km + 300 m", history, cache)
+    evaluate_input("1 m / 0 s", history, cache)
+    evaluate_input("1 km + 1 s", history, cache)
+
+    # Assert
+    captured = capsys.readouterr()
+    assert captured.out.splitlines() == [
+        "5.3 km", "Cannot divide by zero.",
+        "An error occurred during calculation: Incompatible units: cannot add km and s.", "Please try again.", "",
+    ]
+    assert len(history) == 1
+    assert len(cache) == 0 and cache.stats.lookups == 0
+
+
+def test_calculator_units(monkeypatch, capsys):
+    """
+    Test quantities in the REPL and their history entries.
+    """
+    # Arrange
+    monkeypatch.setattr('sys.stdin', StringIO('10 MB / 2 s\n10 MB/s * 2 min\nhistory\nexit\n'))
+
+    # Act
+    with pytest.raises(SystemExit):
+        Calculator()
+
+    # Assert
+    captured = capsys.readouterr()
+    assert ">>> 5.0 MB/s\n>>> 1200.0 MB\n" in captured.out